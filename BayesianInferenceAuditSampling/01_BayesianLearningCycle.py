@@ -1,10 +1,15 @@
 from manim import *
 from manim_voiceover import VoiceoverScene
-from manim_voiceover.services.coqui import CoquiService
+
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+import stataud.bootstrap
+from stataud.tts.service import DaemonService
 
 class BayesianLearningCycle(VoiceoverScene):
 	def construct(self):
-		self.set_speech_service(CoquiService(transcription_model = 'base', model_name = "tts_models/multilingual/multi-dataset/xtts_v2"))
+		self.set_speech_service(DaemonService(transcription_model = 'base', model_name = "tts_models/multilingual/multi-dataset/xtts_v2"))
 
 		# Title
 		title = Text("The Bayesian Learning Cycle", font_size = 40)
@@ -1,38 +1,57 @@
 from manim import *
 from manim_voiceover import VoiceoverScene
-from manim_voiceover.services.coqui import CoquiService
 
 import numpy as np
 import scipy.stats as stats
 
-def prior_to_posterior(self, n, k, prior_a, prior_b, axes, subtitle, distribution, line_ub, text_ub, area, label, run_time = 0.25):
-	post_a = prior_a + k
-	post_b = prior_b + n - k
-	new_distribution = axes.plot(lambda x: stats.beta.pdf(x, post_a, post_b), x_range = (0, 1, 0.001))
-	ub = stats.beta.ppf(0.95, post_a, post_b)
-	point_ub = axes.coords_to_point(ub, 30)
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+import stataud.bootstrap
+from stataud.curves import beta_curve, density_curve
+from stataud.glyphs import TexCounter
+from stataud.planning import bayesian_sample_size
+from stataud.sweep import Sweep
+from stataud.trajectory import PosteriorTrajectory
+from stataud.tts.service import DaemonService
+
+def posterior_mobjects(step, axes):
+	new_distribution = density_curve(axes, step.x, step.density)
+	point_ub = axes.coords_to_point(step.upper_bound, 30)
 	new_line_ub = axes.get_vertical_line(point_ub, line_config = {"dashed_ratio": 0.85}, color = BLUE)
-	new_text_ub = Tex("$\\theta_{95}$ = " + str(round(ub, 3)), font_size = 35, color = BLUE)
-	new_text_ub.next_to(new_line_ub, RIGHT)
-	new_area = axes.get_area(new_distribution, x_range = (0, ub), color = BLUE, opacity = 0.25)
-	new_subtitle = Tex("Sample size ($n$) = " + str(n) + "\\hspace{0.35cm}Misstatements ($k$) = " + str(k), font_size = 40)
-	new_subtitle.move_to(subtitle)
-	new_label = Tex("beta($\\alpha$ = " + str(post_a) + ", $\\beta$ = " + str(post_b) + ")", font_size = 35)
-	new_label.move_to(label)
+	new_area = axes.get_area(new_distribution, x_range = step.area, color = BLUE, opacity = 0.25)
+	return new_distribution, new_line_ub, new_area
+
+def set_labels(step, subtitle, text_ub, label):
+	# The numbers in the labels are swapped in place instead of typesetting new labels
+	subtitle.set_values(n = step.n, k = step.k)
+	label.set_values(a = step.alpha, b = step.beta)
+	text_ub.set_values(ub = round(step.upper_bound, 3))
+
+def prior_to_posterior(self, step, axes, subtitle, distribution, line_ub, text_ub, area, label, run_time = 0.25):
+	new_distribution, new_line_ub, new_area = posterior_mobjects(step, axes)
+	set_labels(step, subtitle, text_ub, label)
 
 	self.play(
-		Transform(subtitle, new_subtitle),
 		Transform(distribution, new_distribution),
 		Transform(line_ub, new_line_ub),
-		Transform(text_ub, new_text_ub),
+		text_ub.animate.next_to(new_line_ub, RIGHT),
 		Transform(area, new_area),
-		Transform(label, new_label),
 		run_time = run_time
 	)
 
+def show_posterior(step, axes, subtitle, distribution, line_ub, text_ub, area, label):
+	# One step of a sweep: the posterior is shown right away instead of morphing into it
+	new_distribution, new_line_ub, new_area = posterior_mobjects(step, axes)
+	set_labels(step, subtitle, text_ub, label)
+	distribution.become(new_distribution)
+	line_ub.become(new_line_ub)
+	area.become(new_area)
+	text_ub.next_to(line_ub, RIGHT)
+
 class UniformPrior(VoiceoverScene):
 	def construct(self):
-		self.set_speech_service(CoquiService(transcription_model = 'base', model_name = "tts_models/multilingual/multi-dataset/xtts_v2"))
+		self.set_speech_service(DaemonService(transcription_model = 'base', model_name = "tts_models/multilingual/multi-dataset/xtts_v2"))
 
 		# Title
 		title = Text("The Uniform Prior Distribution", font_size = 40)
@@ -52,13 +71,13 @@ class UniformPrior(VoiceoverScene):
 
 		# Prior distribution
 		prior_a, prior_b = 1, 1
-		distribution = axes.plot(lambda x: stats.beta.pdf(x, prior_a, prior_b), x_range = (0, 1, 0.001))
+		distribution = beta_curve(axes, prior_a, prior_b)
 
 		with self.voiceover("Here you can see the uniform prior as a solid line. Since it has equal density at all values, it represents the prior information that every value of the population misstatement is equally plausible before seeing any data.") as tracker:
 			self.play(Create(distribution))
 
 		# Label
-		label = Tex("beta($\\alpha$ = 1, $\\beta$ = 1)", font_size = 35)
+		label = TexCounter("beta($\\alpha$ = {a}, $\\beta$ = {b})", {"a": 1, "b": 1}, font_size = 35)
 		label.next_to(distribution, UP)
 
 		with self.voiceover("Specifically, this prior distribution is a beta distribution with both parameters set to 1.") as tracker:
@@ -111,7 +130,7 @@ class UniformPrior(VoiceoverScene):
 		line_ub = axes.get_vertical_line(point_ub, line_config = {"dashed_ratio": 0.85}, color = BLUE)
 
 		# Upper bound text
-		text_ub = Tex("$\\theta_{95}$ = " + str(round(ub, 3)), font_size = 35, color = BLUE)
+		text_ub = TexCounter("$\\theta_{95}$ = {ub}", {"ub": round(ub, 3)}, font_size = 35, color = BLUE)
 		text_ub.next_to(line_ub, RIGHT)
 
 		with self.voiceover("I will indicate this 95 percent upper bound with <bookmark mark='A'/>this blue line.") as tracker:
@@ -129,9 +148,7 @@ class UniformPrior(VoiceoverScene):
 		# Extend the y-axis
 		new_axes = Axes(x_range = [0, 1, 0.1], y_range = [0, 40, 10], axis_config = {"color": YELLOW, "include_ticks": True, "include_numbers": True}, tips = False)
 		new_axes.scale(0.9)
-		new_distribution = new_axes.plot(lambda x: stats.beta.pdf(x, prior_a, prior_b), x_range = (0, 1, 0.001))
-		new_label = Tex("beta($\\alpha$ = 1, $\\beta$ = 1)", font_size = 35)
-		new_label.next_to(new_distribution, UP)
+		new_distribution = beta_curve(new_axes, prior_a, prior_b)
 		new_area = new_axes.get_area(new_distribution, x_range = (0, ub), color = BLUE, opacity = 0.25)
 
 		with self.voiceover("To see how the prior is updated to a posterior, we need to zoom out by extending the <bookmark mark='A'/>vertical axis.") as tracker:
@@ -139,7 +156,7 @@ class UniformPrior(VoiceoverScene):
 			self.play(
 				ReplacementTransform(axes, new_axes),
 				Transform(distribution, new_distribution),
-				Transform(label, new_label),
+				label.animate.next_to(new_distribution, UP),
 				Transform(area, new_area)
 			)
 		axes = new_axes
@@ -175,7 +192,7 @@ class UniformPrior(VoiceoverScene):
 		with self.voiceover("Now, I will visualize how the uniform prior is updated to a posterior.") as tracker:
 			self.play(Transform(title, new_title))
 
-		subtitle = Tex("Sample size ($n$) = 0\\hspace{0.35cm}Misstatements ($k$) = 0", font_size = 40)
+		subtitle = TexCounter("Sample size ($n$) = {n}\\hspace{0.35cm}Misstatements ($k$) = {k}", {"n": 0, "k": 0}, font_size = 40)
 		subtitle.next_to(title, DOWN)
 
 		with self.voiceover("For this, we need some data in the form of the sample size and the number of misstatements.") as tracker:
@@ -184,26 +201,32 @@ class UniformPrior(VoiceoverScene):
 		# Update the prior to a posterior
 		n, k = 1, 0
 
+		# Sample size at which the upper bound drops below the materiality of 5 percent with 1 misstatement
+		n_post = bayesian_sample_size(0.05, k = 1, confidence = 0.95, prior_a = prior_a, prior_b = prior_b)
+
+		# Every posterior shown below: 9 correct items, 1 misstatement, then more correct items up to n_post
+		observations = [(i, 0) for i in range(1, 10)] + [(i, 1) for i in range(9, n_post + 1)]
+		trajectory = PosteriorTrajectory(prior_a, prior_b, observations)
+
 		with self.voiceover("We first observe a single correct item<bookmark mark='A'/>. You can see that this shifts the upper bound to the left, relative to the prior.") as tracker:
 			self.wait_until_bookmark("A")
-			prior_to_posterior(self, n, k, prior_a, prior_b, axes, subtitle, distribution, line_ub, text_ub, area, label)
+			prior_to_posterior(self, trajectory.step(n, k), axes, subtitle, distribution, line_ub, text_ub, area, label)
 
 		with self.voiceover("I will show you what happends to the upper bound if you observe 8 more correct items in the sample<bookmark mark='A'/>. As you can see, it gets increasingly lower.") as tracker:
 			self.wait_until_bookmark("A")
 			for i in range(8):
 				n = n + 1
-				prior_to_posterior(self, n, k, prior_a, prior_b, axes, subtitle, distribution, line_ub, text_ub, area, label)	
+				prior_to_posterior(self, trajectory.step(n, k), axes, subtitle, distribution, line_ub, text_ub, area, label)	
 		
 		k = k + 1
 		with self.voiceover("However, watch what happends if you observe a single misstated item instead of a <bookmark mark='A'/>correct item. Now the upper bound moves to the right.") as tracker:
 			self.wait_until_bookmark("A")
-			prior_to_posterior(self, n, k, prior_a, prior_b, axes, subtitle, distribution, line_ub, text_ub, area, label)
+			prior_to_posterior(self, trajectory.step(n, k), axes, subtitle, distribution, line_ub, text_ub, area, label)
 	
 		with self.voiceover("You might be wondering how many more correct items you must see before the upper bound is below the performance materiality? I will increase the sample size all the way up <bookmark mark='A'/>until this happends.") as tracker:
 			self.wait_until_bookmark("A")
-			for i in range(83):
-				n = n + 1
-				prior_to_posterior(self, n, k, prior_a, prior_b, axes, subtitle, distribution, line_ub, text_ub, area, label, run_time = 0.05)
+			self.play(Sweep(lambda size: show_posterior(trajectory.step(size, k), axes, subtitle, distribution, line_ub, text_ub, area, label), n + 1, n_post, subtitle, distribution, line_ub, text_ub, area, label, step = 1, run_time = 0.05 * (n_post - n)))
+			n = n_post
 
 		rectangle = SurroundingRectangle(label, color = YELLOW, buff = 0.1)
 		
@@ -217,15 +240,13 @@ class UniformPrior(VoiceoverScene):
 		# Zoom in on the posterior distribution
 		post_a = prior_a + k
 		post_b = prior_b + n - k
-		ub = stats.beta.ppf(0.95, post_a, post_b)
+		ub = trajectory.step(n, k).upper_bound
 		new_axes = Axes(x_range = [0, 0.1, 0.01], y_range = [0, 40, 10], axis_config = {"color": YELLOW, "include_ticks": True, "include_numbers": True}, tips = False)
 		new_axes.scale(0.9)
-		new_distribution = new_axes.plot(lambda x: stats.beta.pdf(x, post_a, post_b), x_range = (0, 0.1, 0.001))
+		new_distribution = beta_curve(new_axes, post_a, post_b, x_range = (0, 0.1, 0.001))
 		new_area = new_axes.get_area(new_distribution, x_range = (0, ub), color = BLUE, opacity = 0.25)
 		new_point_ub = new_axes.coords_to_point(ub, 30)
 		new_line_ub = new_axes.get_vertical_line(new_point_ub, line_config = {"dashed_ratio": 0.85}, color = BLUE)
-		new_text_ub = Tex("$\\theta_{95}$ = " + str(round(ub, 3)), font_size = 35, color = BLUE)
-		new_text_ub.next_to(new_line_ub, RIGHT)
 		new_point_mat = new_axes.coords_to_point(0.05, 35)
 		new_line_mat = new_axes.get_vertical_line(new_point_mat, line_config = {"dashed_ratio": 0.85}, color = RED)
 		new_text_mat = Tex("$\\theta_{max}$ = 0.05", font_size = 35, color = RED)
@@ -237,7 +258,7 @@ class UniformPrior(VoiceoverScene):
 				Transform(distribution, new_distribution),
 				Transform(area, new_area),
 				Transform(line_ub, new_line_ub),
-				Transform(text_ub, new_text_ub),
+				text_ub.animate.next_to(new_line_ub, RIGHT),
 				Transform(line_mat, new_line_mat),
 				Transform(text_mat, new_text_mat)
 			)
@@ -259,7 +280,7 @@ class UniformPrior(VoiceoverScene):
 			)
 
 		# Add rectangle around minimum saple size
-		rectangle = SurroundingRectangle(subtitle[0][0:16], color = YELLOW, buff = 0.1)
+		rectangle = SurroundingRectangle(VGroup(subtitle.parts[0], subtitle.slot("n")), color = YELLOW, buff = 0.1)
 
 		with self.voiceover("This means that a sample of 92 items with 1 misstatement provides sufficient evidence to conclude that the misstatement is lower than the performance materiality of 5 percent.") as tracker:
 			self.play(Create(rectangle))
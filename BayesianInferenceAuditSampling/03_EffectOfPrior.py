@@ -1,13 +1,31 @@
 from manim import *
 from manim_voiceover import VoiceoverScene
-from manim_voiceover.services.coqui import CoquiService
 
 import numpy as np
-import scipy.stats as stats
+
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+import stataud.bootstrap
+from stataud.curves import beta_curve, density_curve
+from stataud.glyphs import TexCounter
+from stataud.params import load
+from stataud.planning import bayesian_sample_size
+from stataud.scripts import script
+from stataud.trajectory import PosteriorTrajectory
+from stataud.tts.service import DaemonService
 
 class EffectOfPrior(VoiceoverScene):
 	def construct(self):
-		self.set_speech_service(CoquiService(transcription_model = 'base', model_name = "tts_models/multilingual/multi-dataset/xtts_v2"))
+		self.set_speech_service(DaemonService(transcription_model = 'base', model_name = "tts_models/multilingual/multi-dataset/xtts_v2"))
+
+		# Parameters from params.toml, or from the variant file in STATAUD_PARAMS
+		params = load("EffectOfPrior")
+		(a_ul, b_ul), (a_ur, b_ur), (a_dl, b_dl), (a_dr, b_dr) = params["priors"]
+		materiality, confidence, sample = params["materiality"], params["confidence"], params["n"]
+
+		# Voiceover texts that say the parameters, see stataud/scripts.py
+		narration = script("EffectOfPrior", params)
 
 		# Data
 		n, k = 0, 0
@@ -20,7 +38,7 @@ class EffectOfPrior(VoiceoverScene):
 			self.play(Write(title))
 
 		# Subtitle
-		subtitle = Tex("Sample size ($n$) = " + str(n) + "\\hspace{0.35cm}Misstatements ($k$) = " + str(k), font_size = 40)
+		subtitle = TexCounter("Sample size ($n$) = {n}\\hspace{0.35cm}Misstatements ($k$) = {k}", {"n": n, "k": k}, font_size = 40)
 		subtitle.next_to(title, DOWN)
 
 		with self.voiceover("Let's reset the data.") as tracker:
@@ -54,50 +72,50 @@ class EffectOfPrior(VoiceoverScene):
 			)
 
 		# Distribution top left
-		dist_ul = axes_ul.plot(lambda x: stats.beta.pdf(x, 1, 1), x_range = (0, 1, 0.001))
+		dist_ul = beta_curve(axes_ul, a_ul, b_ul)
 
 		# Label top left
-		label_ul = Tex("beta($\\alpha$ = 1, $\\beta$ = 1)", font_size = 20)
+		label_ul = Tex("beta($\\alpha$ = " + str(a_ul) + ", $\\beta$ = " + str(b_ul) + ")", font_size = 20)
 		label_ul.next_to(dist_ul, DOWN)
 		label_ul.shift(UP * 0.6)
 
-		with self.voiceover("In the top left you see the uniform prior distribution.") as tracker:
+		with self.voiceover(narration["top_left"]) as tracker:
 			self.play(Create(dist_ul))
 			self.play(Write(label_ul))
 
 		# Distribution top right
-		dist_ur = axes_ur.plot(lambda x: stats.beta.pdf(x, 1, 20), x_range = (0, 1, 0.001))
+		dist_ur = beta_curve(axes_ur, a_ur, b_ur)
 
 		# Label top right
-		label_ur = Tex("beta($\\alpha$ = 1, $\\beta$ = 20)", font_size = 20)
+		label_ur = Tex("beta($\\alpha$ = " + str(a_ur) + ", $\\beta$ = " + str(b_ur) + ")", font_size = 20)
 		label_ur.next_to(dist_ur, DOWN)
 		label_ur.shift(UP * 0.6)
 
-		with self.voiceover("In the top right you see the beta distribution with parameters 1 and 20.") as tracker:
+		with self.voiceover(narration["top_right"]) as tracker:
 			self.play(Create(dist_ur))
 			self.play(Write(label_ur))
 
 		# Distribution bottom left
-		dist_dl = axes_dl.plot(lambda x: stats.beta.pdf(x, 2, 20), x_range = (0, 1, 0.001))
+		dist_dl = beta_curve(axes_dl, a_dl, b_dl)
 
 		# Label bottom left
-		label_dl = Tex("beta($\\alpha$ = 2, $\\beta$ = 20)", font_size = 20)
+		label_dl = Tex("beta($\\alpha$ = " + str(a_dl) + ", $\\beta$ = " + str(b_dl) + ")", font_size = 20)
 		label_dl.next_to(dist_dl, DOWN)
 		label_dl.shift(UP * 0.6)
 
-		with self.voiceover("In the bottom left you see a third beta distribution. However, this one has parameters 2 and 20.") as tracker:
+		with self.voiceover(narration["bottom_left"]) as tracker:
 			self.play(Create(dist_dl))
 			self.play(Write(label_dl))
 
 		# Distribution bottom right
-		dist_dr = axes_dr.plot(lambda x: stats.beta.pdf(x, 2, 35), x_range = (0, 1, 0.001))
+		dist_dr = beta_curve(axes_dr, a_dr, b_dr)
 
 		# Label bottom right
-		label_dr = Tex("beta($\\alpha$ = 2, $\\beta$ = 35)", font_size = 20)
+		label_dr = Tex("beta($\\alpha$ = " + str(a_dr) + ", $\\beta$ = " + str(b_dr) + ")", font_size = 20)
 		label_dr.next_to(dist_dr, DOWN)
 		label_dr.shift(UP * 0.6)
 
-		with self.voiceover("Finally, in the bottom right you see the beta distribution with parameters 2 and 35.") as tracker:
+		with self.voiceover(narration["bottom_right"]) as tracker:
 			self.play(Create(dist_dr))
 			self.play(Write(label_dr))
 
@@ -108,32 +126,39 @@ class EffectOfPrior(VoiceoverScene):
 			FadeOut(label_dr)
 		)
 
+		# Posteriors of the four priors after each of the correct items below, computed up front
+		observations = [(i, 0) for i in range(sample + 1)]
+		trajectory_ul = PosteriorTrajectory(a_ul, b_ul, observations, confidence = confidence)
+		trajectory_ur = PosteriorTrajectory(a_ur, b_ur, observations, confidence = confidence)
+		trajectory_dl = PosteriorTrajectory(a_dl, b_dl, observations, confidence = confidence)
+		trajectory_dr = PosteriorTrajectory(a_dr, b_dr, observations, confidence = confidence)
+
 		# Lines for materiality and upper bounds (top left, top right, bottom left, bottom right)
-		point_mat_ul = axes_ul.coords_to_point(0.05, 50)
+		point_mat_ul = axes_ul.coords_to_point(materiality, 50)
 		line_mat_ul = axes_ul.get_vertical_line(point_mat_ul, line_config = {"dashed_ratio": 0.85}, color = RED)
 
-		point_ub_ul = axes_ul.coords_to_point(stats.beta.ppf(0.95, 1, 1), 50)
+		point_ub_ul = axes_ul.coords_to_point(trajectory_ul[0].upper_bound, 50)
 		line_ub_ul = axes_ul.get_vertical_line(point_ub_ul, line_config = {"dashed_ratio": 0.85}, color = BLUE)
 
-		point_mat_ur = axes_ur.coords_to_point(0.05, 50)
+		point_mat_ur = axes_ur.coords_to_point(materiality, 50)
 		line_mat_ur = axes_ur.get_vertical_line(point_mat_ur, line_config = {"dashed_ratio": 0.85}, color = RED)
 
-		point_ub_ur = axes_ur.coords_to_point(stats.beta.ppf(0.95, 1, 20), 50)
+		point_ub_ur = axes_ur.coords_to_point(trajectory_ur[0].upper_bound, 50)
 		line_ub_ur = axes_ur.get_vertical_line(point_ub_ur, line_config = {"dashed_ratio": 0.85}, color = BLUE)
 
-		point_mat_dl = axes_dl.coords_to_point(0.05, 50)
+		point_mat_dl = axes_dl.coords_to_point(materiality, 50)
 		line_mat_dl = axes_dl.get_vertical_line(point_mat_dl, line_config = {"dashed_ratio": 0.85}, color = RED)
 
-		point_ub_dl = axes_dl.coords_to_point(stats.beta.ppf(0.95, 2, 20), 50)
+		point_ub_dl = axes_dl.coords_to_point(trajectory_dl[0].upper_bound, 50)
 		line_ub_dl = axes_dl.get_vertical_line(point_ub_dl, line_config = {"dashed_ratio": 0.85}, color = BLUE)
 
-		point_mat_dr = axes_dr.coords_to_point(0.05, 50)
+		point_mat_dr = axes_dr.coords_to_point(materiality, 50)
 		line_mat_dr = axes_dr.get_vertical_line(point_mat_dr, line_config = {"dashed_ratio": 0.85}, color = RED)
 
-		point_ub_dr = axes_dr.coords_to_point(stats.beta.ppf(0.95, 2, 35), 50)
+		point_ub_dr = axes_dr.coords_to_point(trajectory_dr[0].upper_bound, 50)
 		line_ub_dr = axes_dr.get_vertical_line(point_ub_dr, line_config = {"dashed_ratio": 0.85}, color = BLUE)
 
-		with self.voiceover("I will again indicate the 95 percent upper bound and the performance materiality of 5 percent as separate lines.") as tracker:
+		with self.voiceover(narration["lines"]) as tracker:
 			self.play(
 				Create(line_mat_ul),
 				Create(line_mat_ur),
@@ -145,35 +170,33 @@ class EffectOfPrior(VoiceoverScene):
 				Create(line_ub_dr)
 			)
 
-		with self.voiceover("Now, I will pretend as if a sample of 30 items is observed sequentially.") as tracker:
-			for i in range(30):
+		with self.voiceover(narration["sample"]) as tracker:
+			for i in range(sample):
 				n = n + 1
 
-				new_subtitle = Tex("Sample size ($n$) = " + str(n) + "\\hspace{0.35cm}Misstatements ($k$) = " + str(k), font_size = 40)
-				new_subtitle.move_to(subtitle)
+				subtitle.set_values(n = n, k = trajectory_ul.k[n])
 
-				new_dist_ul = axes_ul.plot(lambda x: stats.beta.pdf(x, 1, 1 + n), x_range = (0, 1, 0.001))
+				new_dist_ul = density_curve(axes_ul, trajectory_ul.x, trajectory_ul.density[n])
 
-				point_ub_ul = axes_ul.coords_to_point(stats.beta.ppf(0.95, 1, 1 + n), 50)
+				point_ub_ul = axes_ul.coords_to_point(trajectory_ul.upper_bound[n], 50)
 				new_line_ub_ul = axes_ul.get_vertical_line(point_ub_ul, line_config = {"dashed_ratio": 0.85}, color = BLUE)
 
-				new_dist_ur = axes_ur.plot(lambda x: stats.beta.pdf(x, 1, 20 + n), x_range = (0, 1, 0.001))
+				new_dist_ur = density_curve(axes_ur, trajectory_ur.x, trajectory_ur.density[n])
 
-				point_ub_ur = axes_ur.coords_to_point(stats.beta.ppf(0.95, 1, 20 + n), 50)
+				point_ub_ur = axes_ur.coords_to_point(trajectory_ur.upper_bound[n], 50)
 				new_line_ub_ur = axes_ur.get_vertical_line(point_ub_ur, line_config = {"dashed_ratio": 0.85}, color = BLUE)
 
-				point_ub_dl = axes_dl.coords_to_point(stats.beta.ppf(0.95, 2, 20 + n), 50)
+				point_ub_dl = axes_dl.coords_to_point(trajectory_dl.upper_bound[n], 50)
 				new_line_ub_dl = axes_dl.get_vertical_line(point_ub_dl, line_config = {"dashed_ratio": 0.85}, color = BLUE)
 
-				new_dist_dl = axes_dl.plot(lambda x: stats.beta.pdf(x, 2, 20 + n), x_range = (0, 1, 0.001))
+				new_dist_dl = density_curve(axes_dl, trajectory_dl.x, trajectory_dl.density[n])
 
-				point_ub_dr = axes_dr.coords_to_point(stats.beta.ppf(0.95, 2, 35 + n), 50)
+				point_ub_dr = axes_dr.coords_to_point(trajectory_dr.upper_bound[n], 50)
 				new_line_ub_dr = axes_dr.get_vertical_line(point_ub_dr, line_config = {"dashed_ratio": 0.85}, color = BLUE)
 
-				new_dist_dr = axes_dr.plot(lambda x: stats.beta.pdf(x, 2, 35 + n), x_range = (0, 1, 0.001))
+				new_dist_dr = density_curve(axes_dr, trajectory_dr.x, trajectory_dr.density[n])
 
 				self.play(
-					Transform(subtitle, new_subtitle),
 					Transform(dist_ul, new_dist_ul),
 					Transform(dist_ur, new_dist_ur),
 					Transform(dist_dl, new_dist_dl),
@@ -185,7 +208,9 @@ class EffectOfPrior(VoiceoverScene):
 					run_time = 0.25
 				)
 
-		rectangle = SurroundingRectangle(axes_ur, color = GREEN, buff = 0.1)
+		# Highlight the prior that needs the fewest correct items to get below the materiality
+		sizes = bayesian_sample_size(materiality, k = 0, confidence = confidence, prior_a = [a_ul, a_ur, a_dl, a_dr], prior_b = [b_ul, b_ur, b_dl, b_dr])
+		rectangle = SurroundingRectangle([axes_ul, axes_ur, axes_dl, axes_dr][np.argmin(sizes)], color = GREEN, buff = 0.1)
 		
 		with self.voiceover("As you can see, the upper bound for priors that initially allocate more mass to lower values of the misstatement, such as <bookmark mark='A'/>this one, is lower than that of the uniform prior.") as tracker:
 			self.wait_until_bookmark("A")
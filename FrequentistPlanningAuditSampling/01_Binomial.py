@@ -1,70 +1,63 @@
 from manim import *
 from manim_voiceover import VoiceoverScene
-from manim_voiceover.services.coqui import CoquiService
 
 import numpy as np
-import scipy.stats as stats
+
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+import stataud.bootstrap
+from stataud.barchart import ChangeBarValues, LabeledBarChart, bar_range
+from stataud.distributions import CountDistribution
+from stataud.formula import SlotFormula, slot
+from stataud.params import load
+from stataud.planning import sample_size
+from stataud.scripts import script
+from stataud.sweep import Sweep
+from stataud.tts.service import DaemonService
+
+# Formulas with colored slots, compiled once per layout of the digits
+binomial_formula = SlotFormula("<p>(X = <k>) = \\binom{<n>}{<k>} <theta>^{<k>} (1 - <theta>)^{<n> - <k>}", colors = {"p": BLUE, "k": RED, "n": GREEN, "theta": YELLOW}, values = {"theta": "\\theta"}, font_size = 40)
+evaluated_formula = SlotFormula("<p>(X = <k>) = \\binom{<n>}{<k>} <theta>^{<k>} (1 - <theta>)^{<n> - <k>} = <result>", colors = {"p": BLUE, "k": RED, "n": GREEN, "theta": YELLOW}, values = {"theta": "\\theta"}, font_size = 40)
+cumulative_formula = SlotFormula("<p>(X \\leq <k>) = \\sum_{i = 0}^{<k>} \\binom{<n>}{i} <theta>^{i} (1 - <theta>)^{<n> - i}", colors = {"p": BLUE, "k": RED, "n": GREEN, "theta": YELLOW}, values = {"theta": "\\theta"}, font_size = 40)
 
 def create_formula(n, k, theta):
-	formula = MathTex("p(X = " + str(k) + ") = \\binom{" + str(n) + "}{" + str(k) + "} " + str(theta) + "^{" + str(k) + "} (1 - " + str(theta) + ")^{" + str(n) + " - " + str(k) + "}", font_size = 40)
+	formula = binomial_formula.build(n = n, k = k, theta = theta)
 	formula.scale(0.75)
 	formula.to_edge(RIGHT)
-	formula[0][0].set_color(BLUE)
-	formula[0][4].set_color(RED)
-	formula[0][10].set_color(RED)
-	formula[0][16].set_color(RED)
-	formula[0][28].set_color(RED)
-	formula[0][8:10].set_color(GREEN)
-	formula[0][25:27].set_color(GREEN)
-	formula[0][12:16].set_color(YELLOW)
-	formula[0][20:24].set_color(YELLOW)
 	return formula
 
 def create_cumulative_formula(n, k, theta):
-	formula = MathTex("p(X \\leq " + str(k) + ") = \\sum_{i = 0}^{" + str(k) + "} \\binom{" + str(n) + "}{i} " + str(theta) + "^{i} (1 - " + str(theta) + ")^{" + str(n) + " - i}", font_size = 40)
+	formula = cumulative_formula.build(n = n, k = k, theta = theta)
 	formula.scale(0.75)
 	formula.to_edge(RIGHT)
 	formula.shift(LEFT)
-	formula[0][0].set_color(BLUE)
-	formula[0][4].set_color(RED)
-	formula[0][7].set_color(RED)
-	formula[0][13:15].set_color(GREEN)
-	formula[0][30:32].set_color(GREEN)
-	formula[0][17:21].set_color(YELLOW)
-	formula[0][25:29].set_color(YELLOW)
 	return formula
 
-def create_cumulative_formula_three(n, k, theta):
-	formula = MathTex("p(X \\leq " + str(k) + ") = \\sum_{i = 0}^{" + str(k) + "} \\binom{" + str(n) + "}{i} " + str(theta) + "^{i} (1 - " + str(theta) + ")^{" + str(n) + " - i}", font_size = 40)
-	formula.scale(0.75)
-	formula.to_edge(RIGHT)
-	formula.shift(LEFT)
-	formula[0][0].set_color(BLUE)
-	formula[0][4].set_color(RED)
-	formula[0][7].set_color(RED)
-	formula[0][13:16].set_color(GREEN)
-	formula[0][31:34].set_color(GREEN)
-	formula[0][18:22].set_color(YELLOW)
-	formula[0][26:30].set_color(YELLOW)
-	return formula
-
-def create_cumulative_formula_three_two(n, k, theta):
-	formula = MathTex("p(X \\leq " + str(k) + ") = \\sum_{i = 0}^{" + str(k) + "} \\binom{" + str(n) + "}{i} " + str(theta) + "^{i} (1 - " + str(theta) + ")^{" + str(n) + " - i}", font_size = 40)
-	formula.scale(0.75)
-	formula.to_edge(RIGHT)
-	formula.shift(LEFT)
-	formula[0][0].set_color(BLUE)
-	formula[0][4].set_color(RED)
-	formula[0][7].set_color(RED)
-	formula[0][13:16].set_color(GREEN)
-	formula[0][33:36].set_color(GREEN)
-	formula[0][18:23].set_color(YELLOW)
-	formula[0][27:32].set_color(YELLOW)
-	return formula
+def show_probabilities(formula, plot, new_formula, probabilities):
+	# One step of a sweep: the formula and the bars for the next sample size or misstatement rate
+	formula.become(new_formula)
+	plot.change_bar_values([round(p, 3) for p in probabilities])
 
 class Binomial(VoiceoverScene):
 	def construct(self):
-		self.set_speech_service(CoquiService(transcription_model = 'base', model_name = "tts_models/multilingual/multi-dataset/xtts_v2"))
+		self.set_speech_service(DaemonService(transcription_model = 'base', model_name = "tts_models/multilingual/multi-dataset/xtts_v2"))
+
+		# Parameters from params.toml, or from the variant file in STATAUD_PARAMS
+		params = load("Binomial")
+		n_start, theta, low_theta, alpha = params["n"], params["theta"], params["low_theta"], params["alpha"]
+
+		# Voiceover texts that say the parameters, see stataud/scripts.py
+		narration = script("Binomial", params)
+
+		# Sufficient sample sizes for 0 misstatements at theta, 1 misstatement at theta and 0 misstatements at low_theta
+		n_zero, n_one, n_rate = sample_size([theta, theta, low_theta], k = [0, 1, 0], alpha = alpha)
+
+		# Probabilities of 0 to 4 misstatements, moved along with the sweeps below
+		binomial = CountDistribution("binomial", n_start, theta)
+
+		# The highest bars of the sweeps are at their smallest sample sizes
+		y_range = bar_range(binomial.pmf(n_start, theta), binomial.pmf(n_one, theta), binomial.pmf(n_one, low_theta))
 
 		# Title
 		title = Text("The Binomial Distribution", font_size = 40)
@@ -73,7 +66,7 @@ class Binomial(VoiceoverScene):
 		with self.voiceover("We will compute the sample size using the binomial distribution, but this is a matter of preference.") as tracker:
 			self.play(Write(title))
 
-		formula = MathTex(r"p(X = k) = \binom{n}{k} \theta^{k} (1 - \theta)^{n - k}", font_size = 40)
+		formula = binomial_formula.build(color = False)
 
 		with self.voiceover("Let me show you the formula to compute a binomial probability.") as tracker:
 			self.play(Write(formula))
@@ -101,22 +94,22 @@ class Binomial(VoiceoverScene):
 		with self.voiceover("Although this formula may seem complicated, it simply states that the <bookmark mark='A'/>probability of discovering a certain <bookmark mark='B'/>number of misstatements in the sample can be computed using the <bookmark mark='C'/>sample size and the <bookmark mark='D'/>true misstatement rate.") as tracker:
 			self.wait_until_bookmark("A")
 			self.play(
-				formula[0][0].animate.set_color(BLUE),
+				slot(formula, "p").animate.set_color(BLUE),
 				Write(text_p)
 			)
 			self.wait_until_bookmark("B")
 			self.play(
-				*[formula[0][i].animate.set_color(RED) for i in [4, 9, 12, 20]],
+				slot(formula, "k").animate.set_color(RED),
 				Write(text_k)
 			)
 			self.wait_until_bookmark("C")
 			self.play(
-				*[formula[0][i].animate.set_color(GREEN) for i in [8, 18]],
+				slot(formula, "n").animate.set_color(GREEN),
 				Write(text_n)
 			)
 			self.wait_until_bookmark("D")
 			self.play(
-				*[formula[0][i].animate.set_color(YELLOW) for i in [11, 16]],
+				slot(formula, "theta").animate.set_color(YELLOW),
 				Write(text_theta)
 			)
 
@@ -129,25 +122,16 @@ class Binomial(VoiceoverScene):
 			FadeOut(text_theta)
 		)
 
-		prob = stats.binom.pmf(0, 60, 0.03)
-		new_formula = MathTex(r"p(X = 0) = \binom{60}{0} 0.03^{0} (1 - 0.03)^{60 - 0} = " + str(round(prob, 3)), font_size = 40)
-		new_formula[0][0].set_color(BLUE)
-		new_formula[0][4].set_color(RED)
-		new_formula[0][10].set_color(RED)
-		new_formula[0][16].set_color(RED)
-		new_formula[0][28].set_color(RED)
-		new_formula[0][8:10].set_color(GREEN)
-		new_formula[0][25:27].set_color(GREEN)
-		new_formula[0][20:24].set_color(YELLOW)
-		new_formula[0][12:16].set_color(YELLOW)
-
-		with self.voiceover("For example, the probability of discovering 0 misstatements in a sample of 60 items, assuming a true misstatement rate of 3 percent, is around " + str(round(prob * 100, 1)) + " percent.") as tracker:
+		prob = binomial.pmf(n_start, theta)[0]
+		new_formula = evaluated_formula.build(n = n_start, k = 0, theta = theta, result = round(prob, 3))
+
+		with self.voiceover(narration["example"]) as tracker:
 			self.play(Transform(formula, new_formula))
 
-		new_formula = new_formula = create_formula(60, 0, 0.03)
+		new_formula = new_formula = create_formula(n_start, 0, theta)
 
-		bar_values = [round(stats.binom.pmf(0, 60, 0.03), 3), 0, 0, 0, 0]
-		plot = BarChart(values = [0, 0, 0, 0, 0], y_range = [0, 0.4, 0.1], bar_names = [str(i) for i in range(5)], bar_colors = [BLUE])
+		bar_values = [round(prob, 3), 0, 0, 0, 0]
+		plot = LabeledBarChart(values = [0, 0, 0, 0, 0], y_range = y_range, bar_names = [str(i) for i in range(5)], bar_colors = [BLUE])
 		plot.to_edge(LEFT)
 		plot.shift(RIGHT * 0.5)
 
@@ -166,45 +150,45 @@ class Binomial(VoiceoverScene):
 				Write(xlab),
 				Write(ylab)
 			)
-			self.play(plot.animate.change_bar_values(bar_values))
+			self.play(ChangeBarValues(plot, bar_values))
 
 		with self.voiceover("Next to the probability of 0 misstatements, we can also visualize the probability of discovering <bookmark mark='A'/>1 misstatement, <bookmark mark='B'/>2 misstatements, <bookmark mark='C'/>3 misstatements, and <bookmark mark='D'/>4 misstatements.") as tracker:
 			self.wait_until_bookmark("A")
-			bar_values[1] = round(stats.binom.pmf(1, 60, 0.03), 3)
+			bar_values[1] = round(binomial.pmf(n_start, theta)[1], 3)
 			self.play(
-				Transform(formula, create_formula(60, 1, 0.03)),
-				plot.animate.change_bar_values(bar_values)
+				Transform(formula, create_formula(n_start, 1, theta)),
+				ChangeBarValues(plot, bar_values)
 			)
 			self.wait_until_bookmark("B")
-			bar_values[2] = round(stats.binom.pmf(2, 60, 0.03), 3)
+			bar_values[2] = round(binomial.pmf(n_start, theta)[2], 3)
 			self.play(
-				Transform(formula, create_formula(60, 2, 0.03)),
-				plot.animate.change_bar_values(bar_values)
+				Transform(formula, create_formula(n_start, 2, theta)),
+				ChangeBarValues(plot, bar_values)
 			)
 			self.wait_until_bookmark("C")
-			bar_values[3] = round(stats.binom.pmf(3, 60, 0.03), 3)
+			bar_values[3] = round(binomial.pmf(n_start, theta)[3], 3)
 			self.play(
-				Transform(formula, create_formula(60, 3, 0.03)),
-				plot.animate.change_bar_values(bar_values)
+				Transform(formula, create_formula(n_start, 3, theta)),
+				ChangeBarValues(plot, bar_values)
 			)
 			self.wait_until_bookmark("D")
-			bar_values[4] = round(stats.binom.pmf(4, 60, 0.03), 3)
+			bar_values[4] = round(binomial.pmf(n_start, theta)[4], 3)
 			self.play(
-				Transform(formula, create_formula(60, 4, 0.03)),
-				plot.animate.change_bar_values(bar_values)
+				Transform(formula, create_formula(n_start, 4, theta)),
+				ChangeBarValues(plot, bar_values)
 			)
 		
-		new_plot = BarChart(values = [stats.binom.pmf(i, 60, 0.03) for i in range(61)], y_range = [0, 0.4, 0.1], bar_colors = [BLUE])
+		new_plot = BarChart(values = list(CountDistribution("binomial", n_start, theta, size = n_start + 1).pmf()), y_range = y_range, bar_colors = [BLUE])
 		new_plot.to_edge(RIGHT)
 
 		with self.voiceover("As you might have noticed, these probabilities do not sum to 1. That is because I have hidden many of the probabilities, either because they are too small or not relevant for this explanation. <bookmark mark='A'/>Here you can see the full barplot.") as tracker:
-			self.play(Transform(formula, create_formula(60, "k", 0.03)))
+			self.play(Transform(formula, create_formula(n_start, "k", theta)))
 			self.wait_until_bookmark("A")
 			self.play(ReplacementTransform(plot, new_plot))
 
 		self.wait()
 
-		plot = BarChart(values = [round(stats.binom.pmf(i, 60, 0.03), 3) for i in range(5)], y_range = [0, 0.4, 0.1], bar_names = [str(i) for i in range(5)], bar_colors = [BLUE])
+		plot = LabeledBarChart(values = [round(p, 3) for p in binomial.pmf(n_start, theta)], y_range = y_range, bar_names = [str(i) for i in range(5)], bar_colors = [BLUE])
 		plot.to_edge(LEFT)
 		plot.shift(RIGHT * 0.5)
 
@@ -217,31 +201,20 @@ class Binomial(VoiceoverScene):
 		with self.voiceover("For clarity, I will show the relevant probabilities on top of the bars.") as tracker:
 			self.play(Write(bar_labels), run_time = 1)
 
-		with self.voiceover("You have seen earlier that these probabilities depend on the sample size. To illustrate this dependency, I will <bookmark mark='A'/>increase the sample size from 60 to 99.") as tracker:
+		with self.voiceover(narration["increase"]) as tracker:
 			self.wait_until_bookmark("A")
-			for i in range(61, 100):
-				bar_values = [round(stats.binom.pmf(j, i, 0.03), 3) for j in range(5)]
-				self.play(
-					Transform(formula, create_formula(i, "k", 0.03)),
-					plot.animate.change_bar_values(bar_values),
-					run_time = 0.025
-				)
-				new_bar_labels = plot.get_bar_labels(color = WHITE)
-				self.play(Transform(bar_labels, new_bar_labels), run_time = 0.025)
-
-		new_plot = BarChart(values = bar_values, y_range = [0, 0.4, 0.1], bar_names = [str(i) for i in range(5)], bar_colors = [RED, BLUE, BLUE, BLUE, BLUE])
-		new_plot.move_to(plot)
-
-		with self.voiceover("You can see that if the true misstatement rate is 3 percent, the probability of discovering <bookmark mark='A'/>0 misstatements in a sample of 99 items is equal to " + str(round(stats.binom.pmf(0, i, 0.03) * 100, 1)) + " percent.") as tracker:
+			self.play(Sweep(lambda n: show_probabilities(formula, plot, create_formula(n, "k", theta), binomial.pmf(n, theta)), n_start + 1, n_zero, formula, plot, step = 1, run_time = 0.05 * (n_zero - n_start)))
+
+		with self.voiceover(narration["zero"]) as tracker:
 			self.wait_until_bookmark("A")
 			self.play(
-				Transform(plot, new_plot),
-				Transform(formula, create_formula(99, 0, 0.03))
+				plot.animate.set_bar_colors([RED, BLUE, BLUE, BLUE, BLUE]),
+				Transform(formula, create_formula(n_zero, 0, theta))
 			)
 
 		self.wait()
 
-		new_formula = create_cumulative_formula(99, 0, 0.03)
+		new_formula = create_cumulative_formula(n_zero, 0, theta)
 		
 		risk_text = MathTex(r"< \alpha", font_size = 30)
 		risk_text.next_to(new_formula, RIGHT)
@@ -252,90 +225,60 @@ class Binomial(VoiceoverScene):
 				Write(risk_text)
 			)
 
-		new_risk_text = MathTex("< 0.05", font_size = 30)
+		new_risk_text = MathTex("< " + "{:g}".format(alpha), font_size = 30)
 		new_risk_text.move_to(risk_text)
 
-		with self.voiceover("For example, planning a sample with 95 percent confidence means that the sampling risk is 5 percent. Since the probability of observing no misstatements is lower than this sampling risk, a sample size of 99 is sufficient, but only if you tolerate no misstatements in the sample.") as tracker:
+		with self.voiceover(narration["risk"]) as tracker:
 			self.play(Transform(risk_text, new_risk_text))
 
-		new_risk_text = MathTex("> 0.05", font_size = 30)
+		new_risk_text = MathTex("> " + "{:g}".format(alpha), font_size = 30)
 		new_risk_text.move_to(risk_text)
 
-		new_plot = BarChart(values = bar_values, y_range = [0, 0.4, 0.1], bar_names = ["0", "1", "2", "3", "4"], bar_colors = [RED, RED, BLUE, BLUE, BLUE])
-		new_plot.move_to(plot)
-
-		with self.voiceover("However, when you tolerate <bookmark mark='A'/>1 misstatement in the sample you need to consider the probability of finding 0 misstatements, or <bookmark mark='B'/>1 misstatement. This cumulative probability is higher than the sampling risk of 5 percent, which means that a sample size of 99 is insufficient.") as tracker:
+		with self.voiceover(narration["tolerate"]) as tracker:
 			self.wait_until_bookmark("A")
-			self.play(Transform(formula, create_cumulative_formula(99, 1, 0.03)),)
+			self.play(Transform(formula, create_cumulative_formula(n_zero, 1, theta)),)
 			self.wait_until_bookmark("B")
 			self.play(
-				ReplacementTransform(plot, new_plot),
+				plot.animate.set_bar_colors([RED, RED, BLUE, BLUE, BLUE]),
 				Transform(risk_text, new_risk_text)
 			)
 
-		with self.voiceover("To bring this cumulative probability below 5 percent, we will need to increase the sample size further. Let's do that <bookmark mark='A'/>now. Pay attention to what effect this has on the probabilities.") as tracker:
+		with self.voiceover(narration["increase_one"]) as tracker:
 			self.wait_until_bookmark("A")
-			for i in range(100, 158):
-				bar_values = [round(stats.binom.pmf(0, i, 0.03), 3), round(stats.binom.pmf(1, i, 0.03), 3), round(stats.binom.pmf(2, i, 0.03), 3), round(stats.binom.pmf(3, i, 0.03), 3), round(stats.binom.pmf(4, i, 0.03), 3)]
-				self.play(
-					Transform(formula, create_cumulative_formula_three(i, 1, 0.03)),
-					new_plot.animate.change_bar_values(bar_values),
-					run_time = 0.025
-				)
-				new_bar_labels = new_plot.get_bar_labels(color = WHITE)
-				self.play(Transform(bar_labels, new_bar_labels), run_time = 0.025)
-
-		new_risk_text = MathTex(" < 0.05", font_size = 30)
+			self.play(Sweep(lambda n: show_probabilities(formula, plot, create_cumulative_formula(n, 1, theta), binomial.pmf(n, theta)), n_zero + 1, n_one, formula, plot, step = 1, run_time = 0.05 * (n_one - n_zero)))
+
+		new_risk_text = MathTex(" < " + "{:g}".format(alpha), font_size = 30)
 		new_risk_text.move_to(risk_text)
 
-		with self.voiceover("Only at a sample size of 157 the cumulative probability is 4.9 percent, which is lower than the sampling risk. This means that a sample size of 157 is sufficient when tolerating 1 misstatement in the sample and assuming a true misstatement rate of 3 percent.") as tracker:
+		with self.voiceover(narration["sufficient_one"]) as tracker:
 			self.play(Transform(risk_text, new_risk_text))
 
-		plot = BarChart(values = bar_values, y_range = [0, 0.4, 0.1], bar_names = ["0", "1", "2", "3", "4"], bar_colors = [RED, BLUE, BLUE, BLUE, BLUE])
-		plot.move_to(new_plot)
-
 		with self.voiceover("Besides depending on the sample size, the binomial probabilities also depend on the true misstatement rate. To illustrate this, we will go back to the situation where we do not tolerate any misstatements in the <bookmark mark='A'/>sample.") as tracker:
 			self.wait_until_bookmark("A")
 			self.play(
-				ReplacementTransform(new_plot, plot),
-				Transform(formula, create_cumulative_formula_three(157, 0, 0.03))
+				plot.animate.set_bar_colors([RED, BLUE, BLUE, BLUE, BLUE]),
+				Transform(formula, create_cumulative_formula(n_one, 0, theta))
 			)
 
-		with self.voiceover("Watch what happends to the probabilities if I gradually lower the value of the true misstatement <bookmark mark='A'/>rate from 3 percent to 1 percent.") as tracker:
+		with self.voiceover(narration["lower_rate"]) as tracker:
 			self.wait_until_bookmark("A")
-			for i in np.arange(0.03, 0.009, -0.001):
-				bar_values = [round(stats.binom.pmf(0, 157, i), 3), round(stats.binom.pmf(1, 157, i), 3), round(stats.binom.pmf(2, 157, i), 3), round(stats.binom.pmf(3, 157, i), 3), round(stats.binom.pmf(4, 157, i), 3)]
-				self.play(
-					Transform(formula, create_cumulative_formula_three_two(157, 0, "{:.3f}".format(i))),
-					plot.animate.change_bar_values(bar_values),
-					run_time = 0.15
-				)
-				new_bar_labels = plot.get_bar_labels(color = WHITE)
-				self.play(Transform(bar_labels, new_bar_labels), run_time = 0.025)
-
-		new_risk_text = MathTex("> 0.05", font_size = 30)
+			self.play(Sweep(lambda rate: show_probabilities(formula, plot, create_cumulative_formula(n_one, 0, "{:.3f}".format(rate)), binomial.pmf(n_one, rate)), theta, low_theta, formula, plot, step = -0.001, run_time = 0.175 * (round((theta - low_theta) / 0.001) + 1)))
+
+		new_risk_text = MathTex("> " + "{:g}".format(alpha), font_size = 30)
 		new_risk_text.move_to(risk_text)
 
-		with self.voiceover("As you can see, the probability of 0 misstatements in a sample of 157 items assuming a true misstatement rate of 1 percent is once again <bookmark mark='A'/>higher than the sampling risk.") as tracker:
+		with self.voiceover(narration["higher"]) as tracker:
 			self.wait_until_bookmark("A")
 			self.play(Transform(risk_text, new_risk_text))
 
-		with self.voiceover("To bring this probability below 5 percent, <bookmark mark='A'/>we will once more need to increase the sample size.") as tracker:
+		with self.voiceover(narration["increase_rate"]) as tracker:
 			self.wait_until_bookmark("A")
-			for i in range(157, 300):
-				bar_values = [round(stats.binom.pmf(0, i, 0.01), 3), round(stats.binom.pmf(1, i, 0.01), 3), round(stats.binom.pmf(2, i, 0.01), 3), round(stats.binom.pmf(3, i, 0.01), 3), round(stats.binom.pmf(4, i, 0.01), 3)]
-				self.play(
-					Transform(formula, create_cumulative_formula_three_two(i, 0, "{:.3f}".format(0.01))),
-					plot.animate.change_bar_values(bar_values),
-					run_time = 0.005
-				)
-				new_bar_labels = plot.get_bar_labels(color = WHITE)
-				self.play(Transform(bar_labels, new_bar_labels), run_time = 0.025)
-
-		new_risk_text = MathTex(" < 0.05", font_size = 30)
+			self.play(Sweep(lambda n: show_probabilities(formula, plot, create_cumulative_formula(n, 0, "{:.3f}".format(low_theta)), binomial.pmf(n, low_theta)), n_one, n_rate, formula, plot, step = 1, run_time = 0.03 * (n_rate - n_one + 1)))
+
+		new_risk_text = MathTex(" < " + "{:g}".format(alpha), font_size = 30)
 		new_risk_text.move_to(risk_text)
 
-		with self.voiceover("Now you see that you need a sample size of 299 to bring the probability of 0 misstatements below the sampling risk. This means that a sample size of 299 is sufficient when tolerating 0 misstatements in the sample and assuming a true misstatement rate of 1 percent.") as tracker:
+		with self.voiceover(narration["sufficient_rate"]) as tracker:
 			self.play(Transform(risk_text, new_risk_text))
 
 		self.play(
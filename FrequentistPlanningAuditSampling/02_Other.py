@@ -1,24 +1,52 @@
 from manim import *
 from manim_voiceover import VoiceoverScene
-from manim_voiceover.services.coqui import CoquiService
 
 import numpy as np
-import scipy.stats as stats
+
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+import stataud.bootstrap
+from stataud.barchart import ChangeBarValues, LabeledBarChart, bar_range
+from stataud.distributions import CountDistribution
+from stataud.glyphs import TexCounter
+from stataud.params import load
+from stataud.planning import sample_size
+from stataud.scripts import script
+from stataud.tts.service import DaemonService
 
 class Other(VoiceoverScene):
 	def construct(self):
-		self.set_speech_service(CoquiService(transcription_model = 'base', model_name = "tts_models/multilingual/multi-dataset/xtts_v2"))
+		self.set_speech_service(DaemonService(transcription_model = 'base', model_name = "tts_models/multilingual/multi-dataset/xtts_v2"))
 
 		# scene title
 		title = Text("Exploring Other Distributions", font_size = 40)
 		title.to_edge(UP)
+
+		# Parameters from params.toml, or from the variant file in STATAUD_PARAMS
+		params = load("Other")
+		theta, alpha, population = params["theta"], params["alpha"], params["N"]
+
+		# Voiceover texts that say the parameters, see stataud/scripts.py
+		narration = script("Other", params)
+
+		# Sufficient sample sizes for 0 misstatements under each distribution
+		n_binom = sample_size(theta, alpha = alpha, distribution = "binomial")
+		n_pois = sample_size(theta, alpha = alpha, distribution = "poisson")
+		n_hyper = sample_size(theta, alpha = alpha, distribution = "hypergeometric", N = population)
+
+		# Probabilities of 0 to 4 misstatements under each distribution, moved along with the sample size
+		binomial = CountDistribution("binomial", n_binom, theta)
+		poisson = CountDistribution("poisson", n_binom, theta)
+		hypergeometric = CountDistribution("hypergeometric", n_binom, theta, N = population)
+		y_range = bar_range(binomial.pmf(), poisson.pmf(), hypergeometric.pmf(n_hyper))
 		
 		with self.voiceover("As I mentioned at the beginning, the choice of distribution is a matter of preference. Let's explore two other distributions that can be used in addition to the binomial distribution.") as tracker:
 			self.play(Write(title))
 
 		# binomial distribution
-		bar_values_binom = [round(stats.binom.pmf(i, 59, 0.05), 3) for i in range(5)]
-		plot_binom = BarChart(values = [0, 0, 0, 0, 0], y_range = [0, 0.4, 0.1], bar_names = [str(i) for i in range(5)], bar_colors = [BLUE])
+		bar_values_binom = [round(p, 3) for p in binomial.pmf(n_binom)]
+		plot_binom = LabeledBarChart(values = [0, 0, 0, 0, 0], y_range = y_range, bar_names = [str(i) for i in range(5)], bar_colors = [BLUE])
 		plot_binom.to_edge(LEFT)
 		plot_binom.shift(UP * 0.5)
 		plot_binom.shift(LEFT * 0.9)
@@ -32,7 +60,7 @@ class Other(VoiceoverScene):
 		ylab_text_binom[0][11].set_color(BLUE)
 		ylab_binom = plot_binom.get_y_axis_label(ylab_text_binom, edge = LEFT, direction = LEFT, buff = 0.3)
 		
-		title_binom = Tex("Binomial ($n$ = 59)", font_size = 25)
+		title_binom = Tex("Binomial ($n$ = " + str(n_binom) + ")", font_size = 25)
 		title_binom.next_to(plot_binom, UP)
 		title_binom[0][9].set_color(GREEN)
 		
@@ -49,7 +77,7 @@ class Other(VoiceoverScene):
 		formula_binom[0][11].set_color(YELLOW)
 		formula_binom[0][16].set_color(YELLOW)
 
-		with self.voiceover("For comparison, the barplot on the left visualizes the binomial probabilities for a sample of 59 items assuming a true misstatement rate of 5 percent.") as tracker:
+		with self.voiceover(narration["binomial"]) as tracker:
 			self.play(
 				Write(title_binom),
 				Create(plot_binom),
@@ -57,20 +85,16 @@ class Other(VoiceoverScene):
 				Write(ylab_binom),
 				Write(formula_binom)
 			)
-			self.play(plot_binom.animate.change_bar_values(bar_values_binom))
+			self.play(ChangeBarValues(plot_binom, bar_values_binom))
 			bar_labels_binom = plot_binom.get_bar_labels(color = WHITE, font_size = 19)
 			self.play(Write(bar_labels_binom))
 			
-		new_plot_binom = BarChart(values = bar_values_binom, y_range = [0, 0.4, 0.1], bar_names = [str(i) for i in range(5)], bar_colors = [RED, BLUE, BLUE, BLUE, BLUE])
-		new_plot_binom.move_to(plot_binom)
-		new_plot_binom.scale(0.6)
-
-		with self.voiceover("The probability of 0 misstatements is lower than the sampling risk of 5 percent, which means that this sample size is sufficient.") as tracker:
-			self.play(Transform(plot_binom, new_plot_binom))
+		with self.voiceover(narration["risk"]) as tracker:
+			self.play(plot_binom.animate.set_bar_colors([RED, BLUE, BLUE, BLUE, BLUE]))
 
 		# poisson distribution
-		bar_values_pois = [round(stats.poisson.pmf(i, 59 * 0.05), 3) for i in range(5)]
-		plot_pois = BarChart(values = [0, 0, 0, 0, 0], y_range = [0, 0.4, 0.1], bar_names = [str(i) for i in range(5)], bar_colors = [BLUE])
+		bar_values_pois = [round(p, 3) for p in poisson.pmf(n_binom)]
+		plot_pois = LabeledBarChart(values = [0, 0, 0, 0, 0], y_range = y_range, bar_names = [str(i) for i in range(5)], bar_colors = [BLUE])
 		plot_pois.shift(RIGHT * 0.5)
 		plot_pois.shift(UP * 0.5)
 		plot_pois.scale(0.6)
@@ -83,9 +107,9 @@ class Other(VoiceoverScene):
 		ylab_text_pois[0][11].set_color(BLUE)
 		ylab_pois = plot_pois.get_y_axis_label(ylab_text_pois, edge = LEFT, direction = LEFT, buff = 0.2)
 
-		title_pois = Tex("Poisson ($n$ = 59)", font_size = 25)
+		title_pois = TexCounter("Poisson ($n$ = {n})", {"n": n_binom}, font_size = 25)
 		title_pois.next_to(plot_pois, UP)
-		title_pois[0][8].set_color(GREEN)
+		title_pois.parts[0][8].set_color(GREEN)
 
 		formula_pois = MathTex("p(X = k) = \\frac{(\\theta n)^k e^{-\\theta n}}{k!}", font_size = 25)
 		formula_pois.next_to(xlab_pois, DOWN)
@@ -108,37 +132,28 @@ class Other(VoiceoverScene):
 				Write(formula_pois)
 			)
 			self.wait_until_bookmark("A")
-			self.play(plot_pois.animate.change_bar_values(bar_values_pois))
+			self.play(ChangeBarValues(plot_pois, bar_values_pois))
 
 		bar_labels_pois = plot_pois.get_bar_labels(color = WHITE, font_size = 19)
-		
-		new_plot_pois = BarChart(values = [round(stats.poisson.pmf(i, 59 * 0.05), 3) for i in range(5)], y_range = [0, 0.4, 0.1], bar_names = [str(i) for i in range(5)], bar_colors = [RED, BLUE, BLUE, BLUE, BLUE])
-		new_plot_pois.move_to(plot_pois)
-		new_plot_pois.scale(0.6)
 
 		with self.voiceover("If we look at the probabilities on the bars, we see that the probability of <bookmark mark='A'/>0 misstatements is higher than under the binomial distribution.") as tracker:
 			self.play(Write(bar_labels_pois))
 			self.wait_until_bookmark("A")
-			self.play(ReplacementTransform(plot_pois, new_plot_pois))
+			self.play(plot_pois.animate.set_bar_colors([RED, BLUE, BLUE, BLUE, BLUE]))
 
-		with self.voiceover("This means that the Poisson distribution requires a slightly larger sample size to reduce this probability below 5 percent. <bookmark mark='A'/>In this case, a sufficient sample size is 60 items, an increase of 1.") as tracker:
+		with self.voiceover(narration["poisson"]) as tracker:
 			self.wait_until_bookmark("A")
-			for i in range(60, 61):
-				bar_values_pois = [round(stats.poisson.pmf(j, i * 0.05), 3) for j in range(5)]
-				new_title_pois = Tex("Poisson ($n$ = " + str(i) + ")", font_size = 25)
-				new_title_pois[0][8].set_color(GREEN)
-				new_title_pois.move_to(title_pois)
+			for i in range(n_binom + 1, n_pois + 1):
+				bar_values_pois = [round(p, 3) for p in poisson.pmf(i)]
+				title_pois.set_values(n = i)
 				self.play(
-					Transform(title_pois, new_title_pois),
-					new_plot_pois.animate.change_bar_values(bar_values_pois),
-					run_time = 0.25
+					ChangeBarValues(plot_pois, bar_values_pois),
+					run_time = 0.5
 				)
-				new_bar_labels_pois = new_plot_pois.get_bar_labels(color = WHITE, font_size = 19)
-				self.play(Transform(bar_labels_pois, new_bar_labels_pois), run_time = 0.25)
 
 		# hypergeometric distribution
-		bar_values_hyper = [round(stats.hypergeom.pmf(i, 500, 25, 59), 3) for i in range(5)]
-		plot_hyper = BarChart(values = [0, 0, 0, 0, 0], y_range = [0, 0.4, 0.1], bar_names = [str(i) for i in range(5)], bar_colors = [BLUE])
+		bar_values_hyper = [round(p, 3) for p in hypergeometric.pmf(n_binom)]
+		plot_hyper = LabeledBarChart(values = [0, 0, 0, 0, 0], y_range = y_range, bar_names = [str(i) for i in range(5)], bar_colors = [BLUE])
 		plot_hyper.to_edge(RIGHT)
 		plot_hyper.shift(RIGHT)
 		plot_hyper.shift(UP * 0.5)
@@ -152,9 +167,9 @@ class Other(VoiceoverScene):
 		ylab_text_hyper[0][11].set_color(BLUE)
 		ylab_hyper = plot_hyper.get_y_axis_label(ylab_text_hyper, edge = LEFT, direction = LEFT, buff = 0.2)
 		
-		title_hyper = Tex("Hypergeometric ($n$ = 59, $N$ = 400)", font_size = 25)
+		title_hyper = TexCounter("Hypergeometric ($n$ = {n}, $N$ = " + str(population) + ")", {"n": n_binom}, font_size = 25)
 		title_hyper.next_to(plot_hyper, UP)
-		title_hyper[0][15].set_color(GREEN)
+		title_hyper.parts[0][15].set_color(GREEN)
 
 		formula_hyper = MathTex("p(X = k) = \\frac{\\binom{\\theta N}{k} \\binom{N - \\theta N}{n - k}}{\\binom{N}{n}}", font_size = 25)
 		formula_hyper.next_to(xlab_hyper, DOWN)
@@ -168,7 +183,7 @@ class Other(VoiceoverScene):
 		formula_hyper[0][8].set_color(YELLOW)
 		formula_hyper[0][15].set_color(YELLOW)
 
-		with self.voiceover("Lastly, we examine the hypergeometric distribution. <bookmark mark='A'/>On the right you see the probabilities for this distribution, which is used to take into account the population size. In this case, the population consists of <bookmark mark='B'/>400 items.") as tracker:
+		with self.voiceover(narration["population"]) as tracker:
 			self.play(
 				Write(title_hyper),
 				Create(plot_hyper),
@@ -177,35 +192,26 @@ class Other(VoiceoverScene):
 				Write(formula_hyper)
 			)
 			self.wait_until_bookmark("A")
-			self.play(plot_hyper.animate.change_bar_values(bar_values_hyper))
+			self.play(ChangeBarValues(plot_hyper, bar_values_hyper))
 			self.wait_until_bookmark("B")
-			self.play(Indicate(title_hyper[0][20:25]), run_time = tracker.get_remaining_duration())
+			self.play(Indicate(title_hyper.parts[1][1:3 + len(str(population))]), run_time = tracker.get_remaining_duration())
 
 		bar_labels_hyper = plot_hyper.get_bar_labels(color = WHITE, font_size = 19)
-
-		new_plot_hyper = BarChart(values = [round(stats.hypergeom.pmf(i, 500, 25, 59), 3) for i in range(5)], y_range = [0, 0.4, 0.1], bar_names = [str(i) for i in range(5)], bar_colors = [RED, BLUE, BLUE, BLUE, BLUE])
-		new_plot_hyper.move_to(plot_hyper)
-		new_plot_hyper.scale(0.6)
 		
 		with self.voiceover("The probability of <bookmark mark='A'/>0 misstatements under this distribution is smaller than under the binomial distribution.") as tracker:
 			self.play(Write(bar_labels_hyper))
 			self.wait_until_bookmark("A")
-			self.play(ReplacementTransform(plot_hyper, new_plot_hyper))
+			self.play(plot_hyper.animate.set_bar_colors([RED, BLUE, BLUE, BLUE, BLUE]))
 
-		with self.voiceover("This means that the hypergeometric distribution requires a slightly smaller sample size. <bookmark mark='A'/>In this case, a sufficient sample size is 55 items, a reduction of 4 items. However, this reduction in sample size gets smaller when the population size increases.") as tracker:
+		with self.voiceover(narration["hypergeometric"]) as tracker:
 			self.wait_until_bookmark("A")
-			for i in range(59, 54, -1):
-				bar_values_hyper = [round(stats.hypergeom.pmf(j, 500, 25, i), 3) for j in range(5)]
-				new_title_hyper = Tex("Hypergeometric ($n$ = " + str(i) + ", $N$ = 400)", font_size = 25)
-				new_title_hyper[0][15].set_color(GREEN)
-				new_title_hyper.move_to(title_hyper)
+			for i in range(n_binom - 1, n_hyper - 1, -1):
+				bar_values_hyper = [round(p, 3) for p in hypergeometric.pmf(i)]
+				title_hyper.set_values(n = i)
 				self.play(
-					Transform(title_hyper, new_title_hyper),
-					new_plot_hyper.animate.change_bar_values(bar_values_hyper),
-					run_time = 0.25
+					ChangeBarValues(plot_hyper, bar_values_hyper),
+					run_time = 0.5
 				)
-				new_bar_labels_hyper = new_plot_hyper.get_bar_labels(color = WHITE, font_size = 19)
-				self.play(Transform(bar_labels_hyper, new_bar_labels_hyper), run_time = 0.25)
 
 		# clear scene
 		self.play(
@@ -217,13 +223,13 @@ class Other(VoiceoverScene):
 			FadeOut(bar_labels_binom),
 			FadeOut(formula_binom),
 			FadeOut(title_pois),
-			FadeOut(new_plot_pois),
+			FadeOut(plot_pois),
 			FadeOut(xlab_pois),
 			FadeOut(ylab_pois),
 			FadeOut(bar_labels_pois),
 			FadeOut(formula_pois),
 			FadeOut(title_hyper),
-			FadeOut(new_plot_hyper),
+			FadeOut(plot_hyper),
 			FadeOut(xlab_hyper),
 			FadeOut(ylab_hyper),
 			FadeOut(bar_labels_hyper),
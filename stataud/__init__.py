@@ -0,0 +1,7 @@
+import os
+
+# Root of the repository (the folder containing both video folders)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Shared cache folder for both videos, can be moved with STATAUD_CACHE_DIR
+CACHE_DIR = os.environ.get("STATAUD_CACHE_DIR", os.path.join(ROOT, ".cache"))
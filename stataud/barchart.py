@@ -0,0 +1,72 @@
+import math
+
+from manim import DOWN, MED_SMALL_BUFF, UP, Animation, BarChart, VGroup
+
+from stataud.glyphs import TexCounter
+
+def bar_range(*values, top = 0.4, step = 0.1):
+    # y_range of a probability barplot: 0 to top, raised in whole steps when a value does not fit
+    highest = max(max(group) for group in values)
+    return [0, round(max(top, math.ceil(highest / step - 1e-9) * step), 10), step]
+
+class LabeledBarChart(BarChart):
+    # BarChart whose value labels are bound to the bars: changing the values rewrites the labels
+    # in place and an updater keeps them next to the bars, so a sweep creates no new mobjects
+    def __init__(self, values, **kwargs):
+        super().__init__(values, **kwargs)
+        self.bar_labels = None
+        self.label_buff = MED_SMALL_BUFF
+
+    def get_bar_labels(self, color = None, font_size = 24, buff = MED_SMALL_BUFF, max_length = 6):
+        # The labels are made on the first call, later calls return the same labels
+        if self.bar_labels is None:
+            self.label_buff = buff
+            self.bar_labels = VGroup(*[TexCounter("{value}", {"value": value}, font_size = font_size, max_length = max_length) for value in self.values])
+            if color is not None:
+                self.bar_labels.set_color(color)
+            self.place_bar_labels()
+            self.bar_labels.add_updater(lambda labels: self.place_bar_labels())
+        return self.bar_labels
+
+    def place_bar_labels(self):
+        for bar, label, value in zip(self.bars, self.bar_labels, self.values):
+            label.next_to(bar, UP if value >= 0 else DOWN, buff = self.label_buff)
+
+    def update_bar_labels(self, values = None):
+        if self.bar_labels is None:
+            return
+        for label, value in zip(self.bar_labels, self.values if values is None else values):
+            label.set_values(value = value)
+        self.place_bar_labels()
+
+    def change_bar_values(self, values, update_colors = True, update_labels = True):
+        super().change_bar_values(values, update_colors)
+        if update_labels:
+            self.update_bar_labels()
+        return self
+
+    def set_bar_colors(self, bar_colors):
+        # Recolor the bars without building a new chart, e.g. to highlight the first bar
+        self.bar_colors = bar_colors
+        self._update_colors()
+        return self
+
+class ChangeBarValues(Animation):
+    # Grows or shrinks the bars of a LabeledBarChart in place; the labels show the new values
+    # right away and follow the bars while they move
+    def __init__(self, chart, values, **kwargs):
+        super().__init__(chart, **kwargs)
+        self.values = list(values)
+
+    def create_starting_mobject(self):
+        # The bars are stretched in place, so no copy of the chart is needed
+        return self.mobject
+
+    def begin(self):
+        self.start_values = list(self.mobject.values)
+        super().begin()
+        self.mobject.update_bar_labels(self.values)
+
+    def interpolate_mobject(self, alpha):
+        t = self.rate_func(alpha)
+        self.mobject.change_bar_values([a * (1 - t) + b * t for a, b in zip(self.start_values, self.values)], update_labels = False)
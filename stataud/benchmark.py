@@ -0,0 +1,336 @@
+import argparse
+import contextlib
+import datetime
+import functools
+import json
+import os
+import sys
+import time
+
+from stataud import CACHE_DIR, ROOT, forkserver, hooks
+from stataud.montage import QUALITIES, Renderer, RenderError, find_scenes, report, select_scenes
+from stataud.tts import client
+
+# Reports of the benchmark runs, named by the time they were started
+BENCHMARK_DIR = os.path.join(CACHE_DIR, "benchmarks")
+
+# Video folders benchmarked when none are given
+VIDEO_DIRS = ["BayesianInferenceAuditSampling", "FrequentistPlanningAuditSampling"]
+
+# Phases of a render, in the order they are printed. startup is the time before the scene file
+# imported stataud.bootstrap (mostly importing manim) and scene everything not in another phase, i.e.
+# construct() itself, updaters and the interpolation of the animations
+PHASES = ["startup", "tts_wait", "synthesis", "alignment", "latex", "text", "curves", "rasterize", "encode", "audio", "combine", "scene"]
+
+class Recorder:
+    # Time spent in each phase of the render process. Phases nest, e.g. rasterizing the frames
+    # inside the encoding of a partial movie, and each one only counts the time that was not
+    # spent in the phases nested in it, so the phases add up to the whole render
+    def __init__(self, path):
+        self.path = path
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.counts = {}
+        # Time of the phases nested in each phase that is running
+        self.stack = []
+        self.complete = False
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        self.stack.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            nested = self.stack.pop()
+            self.add(name, elapsed - nested)
+            if self.stack:
+                self.stack[-1] += elapsed
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def count(self, name, number = 1):
+        self.counts[name] = self.counts.get(name, 0) + number
+
+    def write(self):
+        elapsed = time.perf_counter() - self.started
+        phases = dict(self.phases, scene = elapsed - sum(self.phases.values()))
+        with open(self.path, "w") as file:
+            json.dump({"elapsed": elapsed, "complete": self.complete, "phases": phases, "counts": self.counts}, file, indent = 2)
+
+    def wrap(self, owner, attribute, phase = None, count = None):
+        # Replace owner.attribute by a version that runs in the phase and counts its calls,
+        # skipping methods that the installed manim does not have
+        original = getattr(owner, attribute, None)
+        if original is None:
+            return
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            if count is not None:
+                self.count(count)
+            if phase is None:
+                return original(*args, **kwargs)
+            with self.phase(phase):
+                return original(*args, **kwargs)
+        setattr(owner, attribute, wrapper)
+
+recorder = None
+
+def record(path):
+    # Runs in the render process: time the phases of the render and write them to path when
+    # the scene is finished
+    global recorder
+    if recorder is not None:
+        return recorder
+    import manim
+    import manimpango
+    from manim.camera.camera import Camera
+    from manim.mobject.text import tex_mobject, text_mobject
+    from manim.scene.scene_file_writer import SceneFileWriter
+    from manim.utils import tex_file_writing
+
+    from stataud.tts.service import DaemonService
+
+    recorder = Recorder(path)
+    recorder.wrap(manim.Scene, "play", count = "plays")
+    recorder.wrap(Camera, "capture_mobjects", "rasterize")
+    recorder.wrap(manim.ParametricFunction, "generate_points", "curves")
+    # tex_to_svg_file only compiles the expressions that are not in the cache yet
+    recorder.wrap(tex_mobject, "tex_to_svg_file", count = "latex")
+    recorder.wrap(tex_file_writing, "compile_tex", "latex", count = "latex_compiles")
+    recorder.wrap(tex_file_writing, "convert_to_svg", "latex")
+    recorder.wrap(text_mobject.Text, "_text2svg", count = "text")
+    recorder.wrap(manimpango, "text2svg", "text", count = "text_compiles")
+    recorder.wrap(SceneFileWriter, "close_partial_movie_stream", "encode")
+    recorder.wrap(SceneFileWriter, "add_audio_segment", "audio")
+    recorder.wrap(SceneFileWriter, "combine_to_movie", "combine")
+    recorder.wrap(SceneFileWriter, "combine_to_section_videos", "combine")
+
+    write_frame = SceneFileWriter.write_frame
+    def timed_write_frame(self, frame_or_renderer, num_frames = 1):
+        recorder.count("frames", num_frames)
+        with recorder.phase("encode"):
+            if num_frames == 1:
+                return write_frame(self, frame_or_renderer)
+            return write_frame(self, frame_or_renderer, num_frames = num_frames)
+    SceneFileWriter.write_frame = timed_write_frame
+
+    generate_batch = DaemonService.generate_batch
+    def counted_generate_batch(self, texts):
+        recorder.count("voiceovers", len(texts))
+        return generate_batch(self, texts)
+    DaemonService.generate_batch = counted_generate_batch
+
+    synthesize = client.synthesize
+    def timed_synthesize(request, *args, **kwargs):
+        # The daemon reports how long it synthesized and aligned each text, the rest of the
+        # wait is queueing behind other renders and loading the models
+        with recorder.phase("tts_wait"):
+            reply = synthesize(request, *args, **kwargs)
+            for result in reply["results"]:
+                timings = result.get("timings", {})
+                for name in ["synthesis", "alignment"]:
+                    recorder.add(name, timings.get(name, 0.0))
+                    recorder.add("tts_wait", -timings.get(name, 0.0))
+        recorder.count("voiceover_syntheses", len(request["items"]))
+        return reply
+    client.synthesize = timed_synthesize
+
+    finish = SceneFileWriter.finish
+    def recorded_finish(self):
+        result = finish(self)
+        recorder.count("partial_movie_files", len([file for file in getattr(self, "partial_movie_files", []) if file is not None]))
+        recorder.complete = True
+        recorder.write()
+        return result
+    SceneFileWriter.finish = recorded_finish
+    # Failed renders still leave a report of how far they got
+    hooks.register(lambda: recorder.complete or recorder.write())
+    return recorder
+
+def scene_report(counts, phases, wall):
+    # Counts of the render process as they are reported, with the cache hits derived from them
+    return {
+        "wall": wall,
+        "phases": phases,
+        "plays": counts.get("plays", 0),
+        "frames": counts.get("frames", 0),
+        "partial_movie_files": counts.get("partial_movie_files", 0),
+        "latex": {"compiles": counts.get("latex_compiles", 0), "cache_hits": counts.get("latex", 0) - counts.get("latex_compiles", 0)},
+        "text": {"compiles": counts.get("text_compiles", 0), "cache_hits": counts.get("text", 0) - counts.get("text_compiles", 0)},
+        "voiceovers": {"synthesized": counts.get("voiceover_syntheses", 0), "cache_hits": counts.get("voiceovers", 0) - counts.get("voiceover_syntheses", 0)},
+    }
+
+class BenchmarkRenderer(Renderer):
+    # Renders every scene, since a cached video says nothing about the render time, and
+    # collects the report that the render process writes next to its log
+    def __init__(self, quality, jobs, fork = False):
+        super().__init__(quality, jobs, None, fork)
+        self.reports = {}
+
+    def report_path(self, scene):
+        return os.path.splitext(scene.log())[0] + ".benchmark.json"
+
+    def environment(self, scene):
+        return dict(os.environ, STATAUD_BENCHMARK = self.report_path(scene))
+
+    def checkpoint_dir(self, scene):
+        # A render resumed from a checkpoint would not be timed in full
+        return None
+
+    def render(self, scene):
+        path = self.report_path(scene)
+        if os.path.exists(path):
+            os.remove(path)
+        started = time.perf_counter()
+        output = super().render(scene)
+        wall = time.perf_counter() - started
+        if not os.path.exists(path):
+            raise RenderError(scene.filename + " did not write a benchmark report, does it import stataud.bootstrap?")
+        with open(path) as file:
+            recorded = json.load(file)
+        phases = dict(recorded["phases"], startup = max(wall - recorded["elapsed"], 0.0))
+        self.reports[scene] = scene_report(recorded["counts"], phases, wall)
+        return output
+
+def scene_id(scene):
+    return os.path.basename(scene.directory) + "/" + scene.filename
+
+def regressions(baseline, current, threshold = 0.2, min_seconds = 1.0):
+    # Wall times and phases that got slower than the baseline by more than threshold (a
+    # fraction) and min_seconds, the latter so that noise in short phases is not flagged
+    found = []
+    for scene, result in current["scenes"].items():
+        if scene not in baseline["scenes"]:
+            continue
+        before = baseline["scenes"][scene]
+        metrics = [("wall", before["wall"], result["wall"])]
+        metrics.extend((phase, before["phases"].get(phase, 0.0), seconds) for phase, seconds in result["phases"].items())
+        for name, old, new in metrics:
+            if new - old > min_seconds and new > old * (1 + threshold):
+                found.append((scene, name, old, new))
+    return found
+
+def count_changes(baseline, current):
+    # Changed amounts of work, which explain a change in time (or show that the scene changed)
+    changes = []
+    for scene, result in current["scenes"].items():
+        before = baseline["scenes"].get(scene)
+        if before is None:
+            continue
+        for name in ["plays", "frames", "partial_movie_files"]:
+            if before.get(name) != result.get(name):
+                changes.append((scene, name, before.get(name), result.get(name)))
+        for name in ["latex", "text", "voiceovers"]:
+            for key in result[name]:
+                if before.get(name, {}).get(key) != result[name][key]:
+                    changes.append((scene, name + " " + key, before.get(name, {}).get(key), result[name][key]))
+    return changes
+
+def seconds(value):
+    return "{:.1f} s".format(value)
+
+def summary(scene, result):
+    phases = [(result["phases"][phase], phase) for phase in PHASES if result["phases"].get(phase, 0.0) >= 0.05]
+    lines = [
+        scene + ": " + seconds(result["wall"]) + ", " + str(result["plays"]) + " play calls, " + str(result["frames"]) + " frames, " + str(result["partial_movie_files"]) + " partial movie files",
+        "  " + ", ".join(phase + " " + seconds(value) for value, phase in phases),
+        "  LaTeX " + str(result["latex"]["compiles"]) + " compiled / " + str(result["latex"]["cache_hits"]) + " cached, Text " + str(result["text"]["compiles"]) + " / " + str(result["text"]["cache_hits"]) + ", voiceovers " + str(result["voiceovers"]["synthesized"]) + " / " + str(result["voiceovers"]["cache_hits"]),
+    ]
+    return "\n".join(lines)
+
+def run(scenes, args):
+    renderer = BenchmarkRenderer(args.quality, args.jobs, fork = not args.no_forkserver)
+    steps = {}
+    started = time.perf_counter()
+    by_directory = {}
+    for scene in scenes:
+        by_directory.setdefault(scene.directory, []).append(scene.filename)
+    if not args.no_prefetch:
+        from stataud.tts.prefetch import prefetch
+
+        step = time.perf_counter()
+        for directory, filenames in by_directory.items():
+            prefetch(directory, filenames, args.jobs)
+        steps["prefetch"] = time.perf_counter() - step
+    if not args.no_warmup:
+        from stataud.texcache import warm_up
+
+        step = time.perf_counter()
+        warm_up([os.path.join(directory, filename) for directory, filenames in by_directory.items() for filename in filenames], args.jobs)
+        steps["warmup"] = time.perf_counter() - step
+    if not args.no_forkserver:
+        step = time.perf_counter()
+        forkserver.ensure_server()
+        steps["forkserver"] = time.perf_counter() - step
+    step = time.perf_counter()
+    renderer.render_all(scenes)
+    steps["render"] = time.perf_counter() - step
+    steps["wall"] = time.perf_counter() - started
+    return {
+        "created": datetime.datetime.now().isoformat(timespec = "seconds"),
+        "quality": args.quality,
+        "jobs": args.jobs,
+        "forkserver": not args.no_forkserver,
+        "run": steps,
+        "scenes": {scene_id(scene): renderer.reports[scene] for scene in scenes},
+    }
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description = "Render scenes and report where the time of each render goes, optionally compared to an earlier report.")
+    parser.add_argument("directories", nargs = "*", metavar = "directory", help = "video folders to benchmark (default: both)")
+    parser.add_argument("--only", nargs = "+", metavar = "SCENE", help = "benchmark only these scenes, given by number (02), name (UniformPrior) or file name")
+    parser.add_argument("-j", "--jobs", type = int, default = 1, help = "number of scenes rendered at the same time (default: 1, so that they do not slow each other down)")
+    parser.add_argument("-q", "--quality", choices = sorted(QUALITIES), default = "l", help = "manim render quality (default: l, 480p15)")
+    parser.add_argument("-o", "--output", help = "report file (default: .cache/benchmarks/[time].json)")
+    parser.add_argument("--baseline", help = "earlier report to compare with; the exit code is 1 if a scene got slower")
+    parser.add_argument("--threshold", type = float, default = 0.2, help = "relative slowdown of a scene or phase that counts as a regression (default: 0.2)")
+    parser.add_argument("--min-seconds", type = float, default = 1.0, help = "smallest slowdown in seconds that counts as a regression (default: 1)")
+    parser.add_argument("--no-prefetch", action = "store_true", help = "synthesize voiceovers while rendering, so that the report includes them")
+    parser.add_argument("--no-warmup", action = "store_true", help = "compile LaTeX and Text strings while rendering, so that the report includes them")
+    parser.add_argument("--no-forkserver", action = "store_true", help = "start a new manim process for every scene, so that startup includes importing manim")
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    return args
+
+def main(argv = None):
+    args = parse_args(argv)
+    directories = [os.path.abspath(directory) for directory in args.directories] or [os.path.join(ROOT, directory) for directory in VIDEO_DIRS]
+    try:
+        baseline = None
+        if args.baseline:
+            with open(args.baseline) as file:
+                baseline = json.load(file)
+        scenes = select_scenes([scene for directory in directories for scene in find_scenes(directory)], args.only)
+        if not scenes:
+            raise RenderError("No scene files found in " + ", ".join(directories))
+        result = run(scenes, args)
+    except (RenderError, client.DaemonError, forkserver.ForkServerError, ValueError, OSError) as error:
+        print("Error: " + str(error), file = sys.stderr)
+        return 1
+
+    output = args.output or os.path.join(BENCHMARK_DIR, result["created"].replace(":", "-") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok = True)
+    with open(output, "w") as file:
+        json.dump(result, file, indent = 2)
+    for scene, scene_result in result["scenes"].items():
+        report(summary(scene, scene_result))
+    report("Wrote " + os.path.relpath(output))
+    if baseline is None:
+        return 0
+
+    for scene, name, old, new in count_changes(baseline, result):
+        report("Changed " + scene + " " + name + ": " + str(old) + " -> " + str(new))
+    found = regressions(baseline, result, args.threshold, args.min_seconds)
+    for scene, name, old, new in found:
+        report("Regression " + scene + " " + name + ": " + seconds(old) + " -> " + seconds(new) + " (+" + "{:.0%}".format(new / old - 1 if old > 0 else 1) + ")")
+    if found:
+        return 1
+    report("No regressions against " + os.path.relpath(args.baseline))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+# Imported by every scene file before the rest of stataud, for its side effects: LaTeX and Text
+# are compiled into a cache shared by all scenes and runs, and the benchmark, profile and
+# checkpoint hooks of the render process are installed
+from stataud.texcache import install
+
+install()
@@ -0,0 +1,142 @@
+import ast
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from importlib import metadata
+
+from stataud import CACHE_DIR, ROOT
+
+# Packages whose version changes the rendered output
+VERSIONED_PACKAGES = ["manim", "manim-voiceover"]
+
+def package_version(name):
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "missing"
+
+def resolve_module(module, search_dirs):
+    # Map a dotted module name onto the local .py files that define it
+    parts = module.split(".")
+    for directory in search_dirs:
+        base = os.path.join(directory, *parts)
+        files = []
+        for i in range(1, len(parts)):
+            init = os.path.join(directory, *parts[:i], "__init__.py")
+            if os.path.isfile(init):
+                files.append(init)
+        if os.path.isfile(base + ".py"):
+            return files + [base + ".py"]
+        if os.path.isfile(os.path.join(base, "__init__.py")):
+            return files + [os.path.join(base, "__init__.py")]
+    return []
+
+def module_level(body):
+    # Statements that run when the module is imported, including those in top-level if and try
+    # blocks. Imports inside functions are left out: they load tools such as the montage on
+    # demand, which do not change how a scene renders
+    for node in body:
+        yield node
+        if isinstance(node, ast.If):
+            yield from module_level(node.body)
+            yield from module_level(node.orelse)
+        elif isinstance(node, ast.Try):
+            for block in [node.body, node.orelse, node.finalbody] + [handler.body for handler in node.handlers]:
+                yield from module_level(block)
+
+def imported_modules(path, tree):
+    modules = []
+    package = os.path.dirname(path)
+    for node in module_level(tree.body):
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                # Relative imports are resolved against the importing file's folder
+                directory = package
+                for _ in range(node.level - 1):
+                    directory = os.path.dirname(directory)
+                prefix = os.path.relpath(directory, ROOT).replace(os.sep, ".")
+                base = prefix + "." + node.module if node.module else prefix
+            else:
+                base = node.module
+            modules.append(base)
+            modules.extend(base + "." + alias.name for alias in node.names)
+    return modules
+
+def local_sources(path):
+    # The scene file plus every local helper module it imports at module level, recursively
+    search_dirs = [os.path.dirname(os.path.abspath(path)), ROOT]
+    seen = []
+    pending = [os.path.abspath(path)]
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.append(current)
+        with open(current, "rb") as file:
+            tree = ast.parse(file.read(), filename = current)
+        for module in imported_modules(current, tree):
+            pending.extend(resolve_module(module, search_dirs))
+    return seen
+
+def tts_models(paths):
+    # Literal model_name arguments, e.g. CoquiService(model_name = "tts_models/...")
+    models = set()
+    for path in paths:
+        with open(path, "rb") as file:
+            tree = ast.parse(file.read(), filename = path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.keyword) and node.arg == "model_name" and isinstance(node.value, ast.Constant):
+                models.add(str(node.value.value))
+    return sorted(models)
+
+class SceneCache:
+    def __init__(self, directory = None):
+        self.directory = directory or os.path.join(CACHE_DIR, "scenes")
+
+    def key(self, path, quality, params = None):
+        # params is the variant file of the render, by default the one in STATAUD_PARAMS
+        sources = local_sources(path)
+        digest = hashlib.sha256()
+        for source in sources:
+            digest.update(os.path.relpath(source, ROOT).encode())
+            with open(source, "rb") as file:
+                digest.update(hashlib.sha256(file.read()).digest())
+        description = {
+            "quality": quality,
+            "versions": {name: package_version(name) for name in VERSIONED_PACKAGES},
+            "tts_models": tts_models(sources),
+        }
+        if os.path.join(ROOT, "stataud", "params.py") in sources:
+            # Scenes that read params.toml are rendered again when their parameters change
+            from stataud.params import load_all
+
+            scene = os.path.splitext(os.path.basename(path))[0].split("_", 1)[-1]
+            description["params"] = load_all(params).get(scene, {})
+        digest.update(json.dumps(description, sort_keys = True).encode())
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".mp4")
+
+    def get(self, key):
+        path = self.path(key)
+        return path if os.path.exists(path) else None
+
+    def put(self, key, video, **info):
+        # Copy into the cache under a temporary name, then move it in place atomically
+        os.makedirs(self.directory, exist_ok = True)
+        descriptor, temporary = tempfile.mkstemp(dir = self.directory, suffix = ".tmp")
+        os.close(descriptor)
+        try:
+            shutil.copyfile(video, temporary)
+            os.replace(temporary, self.path(key))
+        except BaseException:
+            os.remove(temporary)
+            raise
+        with open(os.path.join(self.directory, key + ".json"), "w") as file:
+            json.dump(info, file, indent = 2)
+        return self.path(key)
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import shutil
+
+from stataud import CACHE_DIR
+
+# Checkpoints of renders that did not finish, by the scene, quality and media folder of the render
+CHECKPOINT_DIR = os.path.join(CACHE_DIR, "checkpoints")
+
+# Partial movie files of a checkpoint are given to manim under this prefix, so that the
+# partial movie files it writes itself can never overwrite them
+RESUMED_PREFIX = "resumed_"
+
+class CheckpointMismatch(Exception):
+    pass
+
+def directory(path, quality, media_dir):
+    # Runs that render the same scene file in the same quality into the same media folder would
+    # overwrite each other's output anyway, all others get checkpoints of their own. Whether the
+    # scene still matches its checkpoint is told by the fingerprint
+    description = json.dumps([os.path.abspath(path), quality, os.path.abspath(media_dir)])
+    return os.path.join(CHECKPOINT_DIR, hashlib.sha256(description.encode()).hexdigest()[:16])
+
+def load(path):
+    # The last checkpoint in the folder, None if there is none
+    try:
+        with open(os.path.join(path, "checkpoint.json")) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+def link(source, target):
+    # Hard link where possible, the partial movie files can be large
+    temporary = target + ".tmp"
+    if os.path.exists(temporary):
+        os.remove(temporary)
+    try:
+        os.link(source, temporary)
+    except OSError:
+        shutil.copyfile(source, temporary)
+    os.replace(temporary, target)
+
+def fingerprint(scene):
+    # Hash of the shapes and colors of the mobjects in the scene, to check that skipping the plays
+    # before a checkpoint leads to the same scene as rendering them did
+    import numpy as np
+
+    digest = hashlib.sha256()
+    for mobject in scene.mobjects:
+        for part in mobject.get_family():
+            digest.update(type(part).__name__.encode())
+            for values in [part.points, getattr(part, "fill_rgbas", None), getattr(part, "stroke_rgbas", None)]:
+                if values is not None:
+                    digest.update(np.round(np.asarray(values, dtype = float), 6).tobytes())
+    return digest.hexdigest()
+
+class Checkpoints:
+    # Runs in the render process. At the start of every voiceover block, the partial movie files
+    # of the plays so far are linked into the checkpoint folder and the movie time, the sounds
+    # and a fingerprint of the scene are written next to them. A render of the same scene that
+    # is started with manim -n [plays] skips the plays before the checkpoint, uses the stored
+    # partial movie files for them and continues from the checkpoint
+    def __init__(self, path):
+        self.path = path
+        self.resume = load(path)
+        # Partial movie file of every play so far (None for plays without one) and the movie
+        # time at which each play started
+        self.files = []
+        self.starts = []
+        self.sounds = []
+        self.blocks = 0
+        self.linked = 0 if self.resume is None else self.resume["plays"]
+
+    def resuming(self):
+        return self.resume is not None and self.blocks <= self.resume["block"]
+
+    def add_partial_movie_file(self, writer, hash_animation, original):
+        index = len(self.files)
+        if self.resuming() and index < self.resume["plays"]:
+            if index == 0:
+                self.restore(writer)
+            name = self.resume["files"][index]
+            hash_animation = None if name is None else RESUMED_PREFIX + os.path.splitext(name)[0]
+            # A skipped play advances the movie time by its run time, a rendered one by
+            # whole frames; the time of the render that made the checkpoint is kept, so that
+            # the waits of the voiceovers come out the same
+            starts = self.resume["starts"] + [self.resume["time"]]
+            self.starts.append(starts[index])
+            writer.renderer.time = starts[index + 1]
+        else:
+            self.starts.append(writer.renderer.time)
+        original(writer, hash_animation)
+        if hash_animation is None:
+            self.files.append(None)
+        else:
+            from manim import config
+
+            self.files.append(os.path.join(str(writer.partial_movie_directory), hash_animation + config["movie_file_extension"]))
+
+    def restore(self, writer):
+        for name in self.resume["files"]:
+            if name is not None:
+                link(os.path.join(self.path, name), os.path.join(str(writer.partial_movie_directory), RESUMED_PREFIX + name))
+
+    def voiceover(self, scene):
+        # Called when a voiceover block starts, all plays before it are finished
+        block = self.blocks
+        self.blocks += 1
+        if self.resume is not None and block == self.resume["block"]:
+            if fingerprint(scene) != self.resume["fingerprint"]:
+                # The render has to start from the beginning
+                shutil.rmtree(self.path, ignore_errors = True)
+                raise CheckpointMismatch("The scene differs from its checkpoint at play " + str(self.resume["plays"]))
+            for sound_file, time, gain, kwargs in self.resume["sounds"]:
+                scene.renderer.file_writer.add_sound(sound_file, time, gain, **kwargs)
+            # The skipped play before it left skipping on, which would drop this block's sound
+            scene.renderer.skip_animations = False
+            return
+        if not self.resuming():
+            self.save(block, scene)
+
+    def save(self, block, scene):
+        os.makedirs(self.path, exist_ok = True)
+        for file in self.files[self.linked:]:
+            if file is not None:
+                link(file, os.path.join(self.path, os.path.basename(file)))
+        self.linked = len(self.files)
+        checkpoint = {
+            "block": block,
+            "plays": len(self.files),
+            "files": [None if file is None else os.path.basename(file) for file in self.files],
+            "starts": self.starts,
+            "time": scene.renderer.time,
+            "sounds": self.sounds,
+            "fingerprint": fingerprint(scene),
+        }
+        temporary = os.path.join(self.path, "checkpoint.json.tmp")
+        with open(temporary, "w") as file:
+            json.dump(checkpoint, file)
+        os.replace(temporary, os.path.join(self.path, "checkpoint.json"))
+
+checkpoints = None
+
+def record(path):
+    # Runs in the render process: write checkpoints to path and resume from the one in it
+    global checkpoints
+    if checkpoints is not None:
+        return checkpoints
+    import contextlib
+
+    from manim.scene.scene_file_writer import SceneFileWriter
+    from manim_voiceover import VoiceoverScene
+
+    checkpoints = Checkpoints(path)
+
+    add_partial_movie_file = SceneFileWriter.add_partial_movie_file
+    def checkpointed_add_partial_movie_file(self, hash_animation):
+        checkpoints.add_partial_movie_file(self, hash_animation, add_partial_movie_file)
+    SceneFileWriter.add_partial_movie_file = checkpointed_add_partial_movie_file
+
+    add_sound = SceneFileWriter.add_sound
+    def recorded_add_sound(self, sound_file, time = None, gain = None, **kwargs):
+        checkpoints.sounds.append([str(sound_file), time, gain, kwargs])
+        return add_sound(self, sound_file, time, gain, **kwargs)
+    SceneFileWriter.add_sound = recorded_add_sound
+
+    voiceover = VoiceoverScene.voiceover
+    @contextlib.contextmanager
+    def checkpointed_voiceover(self, *args, **kwargs):
+        checkpoints.voiceover(self)
+        with voiceover(self, *args, **kwargs) as tracker:
+            yield tracker
+    VoiceoverScene.voiceover = checkpointed_voiceover
+    return checkpoints
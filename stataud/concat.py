@@ -0,0 +1,268 @@
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+# ffmpeg encoders used to bring a mismatching scene in line with the others
+ENCODERS = {
+    "h264": "libx264",
+    "hevc": "libx265",
+    "av1": "libsvtav1",
+    "vp9": "libvpx-vp9",
+    "mpeg4": "mpeg4",
+    "aac": "aac",
+    "mp3": "libmp3lame",
+    "opus": "libopus",
+}
+
+# Software encoders of --concat encode. The default CRF of each aims at about the same quality
+PRESETS = {
+    "h264": {"encoder": "libx264", "preset": "medium", "crf": 20, "options": ["-profile:v", "high"]},
+    "h265": {"encoder": "libx265", "preset": "medium", "crf": 24, "options": ["-tag:v", "hvc1"]},
+    "av1": {"encoder": "libsvtav1", "preset": "8", "crf": 32, "options": []},
+}
+
+# Audio of the final encode, the chunks are encoded with the audio layout of the scenes
+AUDIO_OPTIONS = ["-b:a", "192k"]
+
+class ConcatError(Exception):
+    pass
+
+def run(command):
+    try:
+        result = subprocess.run(command, stdout = subprocess.PIPE, stderr = subprocess.PIPE, text = True)
+    except FileNotFoundError:
+        raise ConcatError(command[0] + " was not found, make sure that ffmpeg is installed")
+    if result.returncode != 0:
+        raise ConcatError(" ".join(command[:1]) + " failed:\n" + result.stderr[-2000:])
+    return result.stdout
+
+def inspect(path):
+    # Stream parameters that must be identical for a lossless concatenation, and the duration
+    output = run(["ffprobe", "-v", "error", "-show_streams", "-show_format", "-of", "json", path])
+    description = json.loads(output)
+    streams = description["streams"]
+    video = next((stream for stream in streams if stream["codec_type"] == "video"), None)
+    audio = next((stream for stream in streams if stream["codec_type"] == "audio"), None)
+    if video is None:
+        raise ConcatError(path + " has no video stream")
+    video = (
+        video["codec_name"],
+        video.get("profile"),
+        video["width"],
+        video["height"],
+        video.get("pix_fmt"),
+        video["r_frame_rate"],
+        video.get("time_base"),
+    )
+    if audio is not None:
+        audio = (
+            audio["codec_name"],
+            int(audio["sample_rate"]),
+            audio["channels"],
+            audio.get("channel_layout"),
+        )
+    return (video, audio), float(description.get("format", {}).get("duration", 0))
+
+def probe(path):
+    return inspect(path)[0]
+
+def transcode(path, reference, output, video_options = None, audio_options = None):
+    # Re-encode a single scene with the codec, resolution, frame rate and audio layout of the
+    # reference, or with the given encoder options in place of the codec of the reference
+    (codec, _, width, height, pix_fmt, frame_rate, time_base), audio = reference
+    command = ["ffmpeg", "-y", "-v", "error", "-i", path]
+    has_audio = probe(path)[1] is not None
+    if audio is not None and not has_audio:
+        # Scenes without sound get a silent track so that all segments have the same streams
+        layout = audio[3] or ("stereo" if audio[2] == 2 else "mono")
+        command += ["-f", "lavfi", "-i", "anullsrc=r=" + str(audio[1]) + ":cl=" + layout, "-shortest"]
+    command += ["-map", "0:v:0"]
+    if audio is not None:
+        command += ["-map", "0:a:0" if has_audio else "1:a:0"]
+    command += video_options or ["-c:v", ENCODERS.get(codec, codec)]
+    command += ["-vf", "scale=" + str(width) + ":" + str(height) + ",fps=" + frame_rate]
+    if pix_fmt:
+        command += ["-pix_fmt", pix_fmt]
+    if time_base:
+        command += ["-video_track_timescale", time_base.split("/")[1]]
+    if audio is not None:
+        command += ["-c:a", ENCODERS.get(audio[0], audio[0]), "-ar", str(audio[1]), "-ac", str(audio[2])] + (audio_options or [])
+    run(command + [output])
+    return output
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def identity(path):
+    # Cheap check whether a file is still the one that was hashed
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+def known_pixel_format(signature):
+    # ffprobe does not report the pixel format of every stream. Such a scene cannot be assumed to
+    # match the others, so it is always transcoded
+    return signature[0][4] is not None
+
+def signature_from_json(value):
+    video, audio = value
+    return tuple(video), None if audio is None else tuple(audio)
+
+class Manifest:
+    # The scenes that the last build of a video was made of, with their content hashes, stream
+    # layouts, durations and offsets, so that the next build only looks at the scenes that changed
+    def __init__(self, output):
+        self.output = os.path.abspath(output)
+        self.directory = os.path.join(os.path.dirname(self.output), "media", "montage")
+        self.path = os.path.join(self.directory, os.path.basename(output) + ".json")
+        # Scenes transcoded to match the others, shared by all videos in this folder
+        self.segment_dir = os.path.join(self.directory, "segments")
+        self.segments = []
+        self.reference = None
+        self.valid = False
+        if os.path.exists(self.path):
+            with open(self.path) as file:
+                data = json.load(file)
+            self.segments = data["segments"]
+            self.reference = data["reference"]
+            # A video that was changed or removed since cannot be kept as it is
+            self.valid = os.path.exists(self.output) and identity(self.output) == data["output"]
+        self.known = {segment["source"]: segment for segment in self.segments}
+
+    def describe(self, path):
+        # Hash, stream layout and duration of a scene, from the last build if the file is the same
+        path = os.path.abspath(path)
+        known = self.known.get(path)
+        if known is not None and known["identity"] == identity(path):
+            return dict(known)
+        signature, duration = inspect(path)
+        return {"source": path, "identity": identity(path), "hash": file_hash(path), "signature": [list(part) if part else None for part in signature], "duration": duration}
+
+    def conformed(self, segment, reference):
+        # Path of the scene transcoded to the reference layout, named by its content and that layout
+        layout = hashlib.sha256(json.dumps(reference).encode()).hexdigest()[:12]
+        return os.path.join(self.segment_dir, segment["hash"][:24] + "-" + layout + ".mp4")
+
+    def referenced(self):
+        # Files of the scenes that the videos in this folder are made of, by their manifests
+        files = set()
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                with open(os.path.join(self.directory, name)) as file:
+                    files.update(segment["file"] for segment in json.load(file)["segments"])
+        return files
+
+    def save(self, segments, reference):
+        offset = 0.0
+        for segment in segments:
+            segment["offset"] = offset
+            offset += segment["duration"]
+        os.makedirs(self.directory, exist_ok = True)
+        with open(self.path, "w") as file:
+            json.dump({"output": identity(self.output), "reference": reference, "segments": segments}, file, indent = 2)
+        # Transcoded scenes that the new build no longer uses, unless another video in this folder
+        # (such as the preview of a progressive montage) still does
+        used = self.referenced()
+        for segment in self.segments:
+            if segment["file"] not in used and os.path.dirname(segment["file"]) == self.segment_dir and os.path.exists(segment["file"]):
+                os.remove(segment["file"])
+
+def join(files, output):
+    # Concatenate files with identical streams without re-encoding them, replacing the output in one step
+    directory = os.path.dirname(os.path.abspath(output))
+    with tempfile.TemporaryDirectory(dir = directory) as workdir:
+        listing = os.path.join(workdir, "segments.txt")
+        with open(listing, "w") as file:
+            for path in files:
+                file.write("file '" + os.path.abspath(path).replace("'", "'\\''") + "'\n")
+        temporary = os.path.join(workdir, "output.mp4")
+        run(["ffmpeg", "-y", "-v", "error", "-f", "concat", "-safe", "0", "-i", listing, "-map", "0", "-c", "copy", "-movflags", "+faststart", temporary])
+        os.replace(temporary, output)
+
+def concatenate_copy(paths, output, reference = None):
+    # Copy the streams of the scenes into one video. The most common stream layout (or that of
+    # the reference file) is kept, the other scenes are transcoded to match it. Transcoded scenes
+    # are kept, so a scene that did not change is never transcoded twice, and nothing is written
+    # when the video already consists of exactly these scenes. Otherwise the whole video is
+    # written again with stream copy, it is not patched where the scenes changed
+    manifest = Manifest(output)
+    segments = [manifest.describe(path) for path in paths]
+    if reference is not None:
+        layout = manifest.describe(reference)["signature"]
+    else:
+        known = [segment for segment in segments if known_pixel_format(segment["signature"])] or segments
+        layout = Counter(json.dumps(segment["signature"]) for segment in known).most_common(1)[0][0]
+        layout = json.loads(layout)
+    if manifest.valid and manifest.reference == layout and [segment["hash"] for segment in segments] == [segment["hash"] for segment in manifest.segments]:
+        print(os.path.basename(output) + " is up to date")
+        return
+
+    previous = {segment["hash"] for segment in manifest.segments}
+    changed = 0
+    for segment in segments:
+        segment["file"] = segment["source"]
+        if segment["hash"] not in previous:
+            changed += 1
+        if segment["signature"] != layout or not known_pixel_format(segment["signature"]):
+            segment["file"] = manifest.conformed(segment, layout)
+            if not os.path.exists(segment["file"]):
+                print("Transcoding " + segment["source"] + " to match the other scenes")
+                os.makedirs(manifest.segment_dir, exist_ok = True)
+                temporary = segment["file"] + ".tmp.mp4"
+                transcode(segment["source"], signature_from_json(layout), temporary)
+                os.replace(temporary, segment["file"])
+
+    join([segment["file"] for segment in segments], output)
+    manifest.save(segments, layout)
+    if manifest.segments:
+        print("Updated " + os.path.basename(output) + ": " + str(changed) + " of " + str(len(segments)) + " scene(s) changed, the others were copied as they are")
+
+def encoder_options(preset = "h264", crf = None, bitrate = None, threads = None):
+    settings = PRESETS[preset]
+    options = ["-c:v", settings["encoder"], "-preset", settings["preset"]]
+    if bitrate:
+        options += ["-b:v", bitrate]
+    else:
+        options += ["-crf", str(settings["crf"] if crf is None else crf)]
+    if threads:
+        options += ["-threads", str(threads)]
+    return options + settings["options"]
+
+def concatenate_encode(paths, output, preset = "h264", crf = None, bitrate = None, threads = None, jobs = 1):
+    # Encode the video again for delivery. Every scene is a chunk of its own: the chunks are
+    # encoded at the same time by separate ffmpeg processes with the same settings, so that they
+    # can be joined without another encode, and each process gets its share of the threads
+    signatures = [probe(path) for path in paths]
+    known = [signature for signature in signatures if known_pixel_format(signature)] or signatures
+    reference = Counter(known).most_common(1)[0][0]
+    jobs = max(min(jobs, len(paths)), 1)
+    threads = threads or max((os.cpu_count() or 1) // jobs, 1)
+    options = encoder_options(preset, crf, bitrate, threads)
+    directory = os.path.dirname(os.path.abspath(output))
+    with tempfile.TemporaryDirectory(dir = directory) as workdir:
+        chunks = [os.path.join(workdir, str(i) + ".mp4") for i in range(len(paths))]
+        with ThreadPoolExecutor(max_workers = jobs) as executor:
+            list(executor.map(lambda path, chunk: transcode(path, reference, chunk, options, AUDIO_OPTIONS), paths, chunks))
+        join(chunks, output)
+    print("Encoded " + os.path.basename(output) + " with " + PRESETS[preset]["encoder"] + " in " + str(jobs) + " chunk(s) at a time")
+
+def concatenate_moviepy(paths, output):
+    from moviepy.editor import VideoFileClip, concatenate_videoclips
+
+    scenelist = [VideoFileClip(path) for path in paths]
+    final_clip = concatenate_videoclips(scenelist, method = "chain")
+    final_clip.write_videofile(output, codec = "mpeg4", audio_codec = 'aac')
+
+# Ways to concatenate the scenes, selectable with --concat
+METHODS = {
+    "copy": concatenate_copy,
+    "encode": concatenate_encode,
+    "moviepy": concatenate_moviepy,
+}
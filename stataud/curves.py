@@ -0,0 +1,29 @@
+import functools
+
+import numpy as np
+from scipy import special
+
+@functools.lru_cache(maxsize = None)
+def log_beta(a, b):
+    # Log of the normalizing constant B(a, b), computed once per pair of parameters
+    return special.betaln(a, b)
+
+def beta_pdf(x, a, b):
+    # Beta density for a whole array of x at once, evaluated in log space so that
+    # large parameters such as beta(2, 300) neither overflow nor underflow
+    x = np.asarray(x, dtype = float)
+    inside = (x >= 0) & (x <= 1)
+    clipped = np.clip(x, 0, 1)
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        log_density = special.xlogy(a - 1, clipped) + special.xlog1py(b - 1, -clipped) - log_beta(float(a), float(b))
+        return np.where(inside, np.exp(log_density), 0.0)
+
+def beta_curve(axes, a, b, x_range = (0, 1, 0.001), **kwargs):
+    # Graph of the beta density on the axes, built from a single array evaluation over the x grid
+    return axes.plot(lambda x: beta_pdf(x, a, b), x_range = x_range, use_vectorized = True, **kwargs)
+
+def density_curve(axes, x, y, x_range = None, **kwargs):
+    # Graph of precomputed density values, e.g. one step of a PosteriorTrajectory
+    if x_range is None:
+        x_range = (x[0], x[-1], x[1] - x[0])
+    return axes.plot(lambda t: np.interp(t, x, y), x_range = x_range, use_vectorized = True, **kwargs)
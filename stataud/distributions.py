@@ -0,0 +1,129 @@
+import numpy as np
+from scipy import special
+
+from stataud.planning import DISTRIBUTIONS, population_misstatements
+
+# Moves of the sample size or population misstatements longer than this are computed directly
+# instead of one step at a time
+MAX_STEPS = 64
+
+def log_comb(a, b):
+    # Logarithm of the binomial coefficient, -inf where it is zero. Written with betaln, which
+    # keeps its precision for large a where differences of gammaln values would cancel
+    a, b = np.broadcast_arrays(np.asarray(a, dtype = float), np.asarray(b, dtype = float))
+    with np.errstate(invalid = "ignore", divide = "ignore"):
+        value = -np.log(a + 1) - special.betaln(b + 1, a - b + 1)
+    return np.where((b >= 0) & (b <= a), value, -np.inf)
+
+def log_pmf(distribution, j, n, theta, N = None):
+    # Logarithm of P(X = j) computed from scratch, without overflow for populations of millions
+    j = np.asarray(j, dtype = float)
+    if distribution == "binomial":
+        return log_comb(n, j) + special.xlogy(j, theta) + special.xlog1py(n - j, -theta)
+    if distribution == "poisson":
+        rate = n * theta
+        return special.xlogy(j, rate) - rate - special.gammaln(j + 1)
+    if distribution == "hypergeometric":
+        K = population_misstatements(theta, N)
+        return log_comb(K, j) + log_comb(N - K, n - j) - log_comb(N, n)
+    raise ValueError("Unknown distribution " + repr(distribution) + ", choose from " + ", ".join(DISTRIBUTIONS))
+
+class CountDistribution:
+    # Probabilities of 0, 1, ..., size - 1 misstatements in a sample of n items. Moving n by one or
+    # changing theta updates the log probabilities with the exact ratio of consecutive pmfs instead
+    # of evaluating them again, so a sweep that asks for n, n + 1, n + 2, ... costs a few vector
+    # operations per step
+    def __init__(self, distribution, n, theta, size = 5, N = None):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError("Unknown distribution " + repr(distribution) + ", choose from " + ", ".join(DISTRIBUTIONS))
+        if distribution == "hypergeometric" and N is None:
+            raise ValueError("The hypergeometric distribution needs the population size N")
+        self.distribution = distribution
+        self.N = N
+        self.j = np.arange(size, dtype = float)
+        self.reset(n, theta)
+
+    def reset(self, n, theta):
+        self.n = int(n)
+        self.theta = float(theta)
+        self.log_pmf = log_pmf(self.distribution, self.j, self.n, self.theta, self.N)
+
+    def misstatements(self, theta):
+        return population_misstatements(theta, self.N)
+
+    def refresh(self, ratio):
+        # Adds the log ratio to the finite probabilities; those that were zero before the step are
+        # computed from scratch, since their ratio is undefined
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            updated = self.log_pmf + ratio
+        stale = ~np.isfinite(self.log_pmf) | np.isnan(updated)
+        if stale.any():
+            updated[stale] = log_pmf(self.distribution, self.j[stale], self.n, self.theta, self.N)
+        self.log_pmf = updated
+
+    def step(self, direction):
+        # From n to n + 1 (direction 1) or n - 1 (direction -1)
+        n, j, theta = self.n, self.j, self.theta
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            if self.distribution == "binomial":
+                ratio = np.log(n + 1) - np.log(n + 1 - j) + np.log1p(-theta) if direction > 0 else np.log(n - j) - np.log(n) - np.log1p(-theta)
+            elif self.distribution == "poisson":
+                ratio = special.xlogy(j, (n + direction) / n) - direction * theta if n > 0 else np.full(j.shape, np.nan)
+            else:
+                K, N = self.misstatements(theta), self.N
+                ratio = np.log(N - K - n + j) + np.log(n + 1) - np.log(n + 1 - j) - np.log(N - n) if direction > 0 else np.log(n - j) + np.log(N - n + 1) - np.log(N - K - n + 1 + j) - np.log(n)
+        self.n = n + direction
+        self.refresh(ratio)
+
+    def step_misstatements(self, direction):
+        # Hypergeometric only: from K to K + 1 or K - 1 misstated items in the population
+        n, j, N = self.n, self.j, self.N
+        K = self.misstatements(self.theta)
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            if direction > 0:
+                return np.log(K + 1) - np.log(K + 1 - j) + np.log(N - K - n + j) - np.log(N - K)
+            return np.log(K - j) - np.log(K) + np.log(N - K + 1) - np.log(N - K - n + j + 1)
+
+    def move(self, n = None, theta = None):
+        n = self.n if n is None else int(n)
+        theta = self.theta if theta is None else float(theta)
+        if abs(n - self.n) > MAX_STEPS:
+            self.reset(n, theta)
+            return self
+        while self.n != n:
+            self.step(1 if n > self.n else -1)
+
+        if theta != self.theta:
+            old, j, n = self.theta, self.j, self.n
+            with np.errstate(divide = "ignore", invalid = "ignore"):
+                if self.distribution == "binomial":
+                    ratio = special.xlogy(j, theta / old) + special.xlog1py(n - j, (old - theta) / (1 - old))
+                    self.theta = theta
+                    self.refresh(ratio)
+                elif self.distribution == "poisson":
+                    ratio = special.xlogy(j, theta / old) - n * (theta - old)
+                    self.theta = theta
+                    self.refresh(ratio)
+                else:
+                    # The pmf only depends on theta through the number of misstated items
+                    old_K, K = self.misstatements(old), self.misstatements(theta)
+                    if abs(K - old_K) > MAX_STEPS:
+                        self.reset(n, theta)
+                        return self
+                    while old_K != K:
+                        direction = 1 if K > old_K else -1
+                        ratio = self.step_misstatements(direction)
+                        old_K += direction
+                        # Any theta that rounds up to old_K gives the same pmf
+                        self.theta = old_K / self.N
+                        self.refresh(ratio)
+                    self.theta = theta
+        return self
+
+    def pmf(self, n = None, theta = None):
+        self.move(n, theta)
+        return np.exp(self.log_pmf)
+
+    def cdf(self, n = None, theta = None):
+        # X is never negative, so P(X <= j) is the sum of the probabilities up to j
+        return np.cumsum(self.pmf(n, theta))
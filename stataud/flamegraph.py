@@ -0,0 +1,139 @@
+import contextlib
+import functools
+import os
+import sys
+import time
+
+from stataud import CACHE_DIR, hooks
+
+# Profiles of the renders started with STATAUD_PROFILE=1
+PROFILE_DIR = os.path.join(CACHE_DIR, "profiles")
+
+class Profiler:
+    # Time and allocated memory blocks of play calls, voiceover blocks, bookmarks and expensive
+    # mobjects, by the stack of those events they happened in. Each event only counts what was
+    # not spent in the events nested in it, as in the folded stacks read by flamegraph tools
+    def __init__(self, directory, skipped):
+        self.directory = directory
+        # Folders of the code between a scene file and the events, e.g. manim itself
+        self.skipped = tuple(skipped)
+        self.scene = None
+        self.started = time.perf_counter()
+        self.start_blocks = sys.getallocatedblocks()
+        self.times = {}
+        self.blocks = {}
+        self.stack = []
+        self.written = False
+
+    def location(self):
+        # "01_Binomial.py construct:205 > show_probabilities:50" for an event in
+        # show_probabilities, called from line 205 of construct
+        frame = sys._getframe(1)
+        while frame is not None and frame.f_code.co_filename.startswith(self.skipped):
+            frame = frame.f_back
+        if frame is None:
+            return "?"
+        filename = frame.f_code.co_filename
+        calls = []
+        while frame is not None and frame.f_code.co_filename == filename:
+            calls.append(frame.f_code.co_name + ":" + str(frame.f_lineno))
+            frame = frame.f_back
+        return os.path.basename(filename) + " " + " > ".join(reversed(calls))
+
+    @contextlib.contextmanager
+    def event(self, kind, owner = None):
+        # A constructor that calls the constructor of its base class, such as Tex and MathTex,
+        # is one event
+        if owner is not None and self.stack and self.stack[-1]["owner"] is owner:
+            yield
+            return
+        entry = {"label": kind + " " + self.location(), "owner": owner, "time": 0.0, "blocks": 0}
+        self.stack.append(entry)
+        started = time.perf_counter()
+        blocks = sys.getallocatedblocks()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            allocated = sys.getallocatedblocks() - blocks
+            self.stack.pop()
+            key = tuple(parent["label"] for parent in self.stack) + (entry["label"],)
+            self.times[key] = self.times.get(key, 0.0) + elapsed - entry["time"]
+            self.blocks[key] = self.blocks.get(key, 0) + allocated - entry["blocks"]
+            if self.stack:
+                self.stack[-1]["time"] += elapsed
+                self.stack[-1]["blocks"] += allocated
+
+    def wrap(self, owner, attribute, kind = None):
+        # Run owner.attribute as an event, named after the class of the object for constructors
+        original = getattr(owner, attribute)
+        @functools.wraps(original)
+        def wrapper(obj, *args, **kwargs):
+            with self.event(kind or type(obj).__name__, None if kind else obj):
+                return original(obj, *args, **kwargs)
+        setattr(owner, attribute, wrapper)
+
+    def write(self):
+        # <scene>.folded in microseconds and <scene>.blocks.folded in memory blocks that were
+        # allocated and not freed again, one "frame;frame;frame value" line per stack
+        root = self.scene or "scene"
+        times = dict(self.times)
+        times[()] = time.perf_counter() - self.started - sum(self.times.values())
+        blocks = dict(self.blocks)
+        blocks[()] = sys.getallocatedblocks() - self.start_blocks - sum(self.blocks.values())
+        os.makedirs(self.directory, exist_ok = True)
+        for suffix, values, scale in [(".folded", times, 1e6), (".blocks.folded", blocks, 1)]:
+            with open(os.path.join(self.directory, root + suffix), "w") as file:
+                for stack, value in sorted(values.items()):
+                    # Memory freed in an event is charged to whatever allocated it
+                    value = max(int(round(value * scale)), 0)
+                    if value:
+                        file.write(";".join((root,) + stack) + " " + str(value) + "\n")
+        self.written = True
+
+profiler = None
+
+def record(directory):
+    # Runs in the render process: profile the scene and write the profile when it is finished
+    global profiler
+    if profiler is not None:
+        return profiler
+    import manim
+    import manim_voiceover
+    from manim.mobject.graphing.coordinate_systems import CoordinateSystem
+    from manim.scene.scene_file_writer import SceneFileWriter
+    from manim_voiceover import VoiceoverScene
+
+    skipped = [os.path.dirname(module.__file__) for module in [manim, manim_voiceover, sys.modules["stataud"]]]
+    profiler = Profiler(directory, skipped + [contextlib.__file__])
+
+    play = manim.Scene.play
+    def profiled_play(self, *args, **kwargs):
+        profiler.scene = profiler.scene or type(self).__name__
+        with profiler.event("play"):
+            return play(self, *args, **kwargs)
+    manim.Scene.play = profiled_play
+
+    voiceover = VoiceoverScene.voiceover
+    @contextlib.contextmanager
+    def profiled_voiceover(self, *args, **kwargs):
+        profiler.scene = profiler.scene or type(self).__name__
+        with profiler.event("voiceover"):
+            with voiceover(self, *args, **kwargs) as tracker:
+                yield tracker
+    VoiceoverScene.voiceover = profiled_voiceover
+
+    profiler.wrap(VoiceoverScene, "wait_until_bookmark", "wait_until_bookmark")
+    profiler.wrap(CoordinateSystem, "plot", "plot")
+    for cls in [manim.MathTex, manim.Tex, manim.BarChart]:
+        profiler.wrap(cls, "__init__")
+
+    finish = SceneFileWriter.finish
+    def profiled_finish(self):
+        result = finish(self)
+        profiler.write()
+        return result
+    SceneFileWriter.finish = profiled_finish
+    # A failed render still leaves the profile up to the failure
+    hooks.register(lambda: profiler.written or profiler.write())
+    return profiler
@@ -0,0 +1,247 @@
+import argparse
+import fcntl
+import json
+import os
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+
+from stataud import CACHE_DIR, ROOT
+from stataud.cache import VERSIONED_PACKAGES, package_version
+
+# Unix socket of the render fork server, shared by all montage and variant runs of this user
+SOCKET_PATH = os.environ.get("STATAUD_FORKSERVER_SOCKET", os.path.join(tempfile.gettempdir(), "stataud-forkserver-" + str(os.getuid()) + ".sock"))
+
+# Imported once by the server, so that the renders forked from it start with them loaded
+PRELOAD = ["numpy", "scipy.special", "scipy.stats", "manim", "manim.__main__", "manim_voiceover"]
+
+class ForkServerError(Exception):
+    pass
+
+def versions():
+    return {name: package_version(name) for name in VERSIONED_PACKAGES}
+
+def connect(socket_path):
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_path)
+    except OSError:
+        connection.close()
+        raise
+    return connection
+
+def receive(stream, what):
+    line = stream.readline()
+    if not line:
+        raise ForkServerError("The fork server closed the connection before " + what)
+    reply = json.loads(line)
+    if not reply.get("ok"):
+        raise ForkServerError(reply.get("error", "Unknown error in the fork server"))
+    return reply
+
+def send(message, socket_path = SOCKET_PATH):
+    # One JSON request, answered by one JSON line
+    with connect(socket_path) as connection:
+        connection.sendall(json.dumps(message).encode() + b"\n")
+        with connection.makefile("rb") as stream:
+            return receive(stream, "replying")
+
+def ping(socket_path = SOCKET_PATH):
+    try:
+        return send({"op": "ping"}, socket_path)
+    except (OSError, ForkServerError, ValueError):
+        return None
+
+def ensure_server(socket_path = SOCKET_PATH, timeout = 120):
+    # Start the server in the background unless one with the installed manim is already listening
+    reply = ping(socket_path)
+    if reply is not None and reply.get("versions") == versions():
+        return
+    if reply is not None:
+        # The packages were upgraded since the server imported them
+        try:
+            send({"op": "stop"}, socket_path)
+        except (OSError, ForkServerError, ValueError):
+            pass
+        deadline = time.monotonic() + 10
+        while ping(socket_path) is not None and time.monotonic() < deadline:
+            time.sleep(0.1)
+    os.makedirs(os.path.join(CACHE_DIR, "logs"), exist_ok = True)
+    with open(os.path.join(CACHE_DIR, "logs", "forkserver.log"), "a") as log:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "stataud.forkserver", "--socket", socket_path],
+            cwd = ROOT,
+            stdin = subprocess.DEVNULL,
+            stdout = log,
+            stderr = subprocess.STDOUT,
+            start_new_session = True,
+        )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if ping(socket_path) is not None:
+            return
+        # A server that exits right away lost the start-up race against another one
+        if process.poll() is not None:
+            time.sleep(0.5)
+            if ping(socket_path) is None:
+                raise ForkServerError("The fork server exited with code " + str(process.returncode) + ", see " + log.name)
+        time.sleep(0.1)
+    raise ForkServerError("The fork server did not start within " + str(timeout) + " seconds")
+
+class ForkedRender:
+    # A manim run forked from the server, with the wait() and terminate() of subprocess.Popen
+    def __init__(self, command, cwd, env, log, socket_path = SOCKET_PATH):
+        self.connection = connect(socket_path)
+        self.stream = self.connection.makefile("rb")
+        self.returncode = None
+        request = {"op": "render", "command": command, "cwd": cwd, "env": dict(os.environ) if env is None else env, "log": log}
+        self.connection.sendall(json.dumps(request).encode() + b"\n")
+        self.pid = receive(self.stream, "starting the render")["pid"]
+
+    def wait(self):
+        if self.returncode is None:
+            try:
+                self.returncode = receive(self.stream, "the render finished")["returncode"]
+            except ForkServerError:
+                # The render died without reporting back, e.g. when it was killed
+                self.returncode = -1
+            finally:
+                self.stream.close()
+                self.connection.close()
+        return self.returncode
+
+    def terminate(self):
+        try:
+            os.kill(self.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+def render(request):
+    # Runs in the forked child: behave like "manim ..." started in request["cwd"]
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    os.chdir(request["cwd"])
+    os.environ.clear()
+    os.environ.update(request["env"])
+    # The helper modules are imported again from disk, the server may have an older copy
+    for name in [name for name in sys.modules if name == "stataud" or name.startswith("stataud.")]:
+        del sys.modules[name]
+    with open(request["log"], "a") as log:
+        os.dup2(log.fileno(), 1)
+        os.dup2(log.fileno(), 2)
+    sys.argv = request["command"]
+    from manim.__main__ import main
+
+    try:
+        main(args = request["command"][1:], prog_name = "manim")
+        return 0
+    except SystemExit as exit:
+        if exit.code is None:
+            return 0
+        return exit.code if isinstance(exit.code, int) else 1
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    finally:
+        # The child leaves with os._exit, so what the render recorded is written here instead of
+        # at exit. This is the copy of stataud.hooks that the scene imported
+        hooks = sys.modules.get("stataud.hooks")
+        if hooks is not None:
+            hooks.flush()
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+class Server(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    # Every render request is handled in a child forked from this process, which has already
+    # imported manim and the other heavy packages and never renders anything itself
+    max_children = 1024
+    block_on_close = False
+
+    def __init__(self, socket_path, idle_timeout):
+        self.idle_timeout = idle_timeout
+        self.last_request = time.monotonic()
+        self.stopping = False
+        # Render requests by connection, read before forking
+        self.requests = {}
+        socketserver.UnixStreamServer.__init__(self, socket_path, Handler)
+
+    def process_request(self, request, client_address):
+        # Pings and stops are answered here, only renders need a child
+        with request.makefile("rb") as stream:
+            line = stream.readline()
+        message = json.loads(line) if line else {}
+        if message.get("op") == "render":
+            self.last_request = time.monotonic()
+            self.requests[request] = message
+            try:
+                return super().process_request(request, client_address)
+            finally:
+                del self.requests[request]
+        if message.get("op") == "ping":
+            reply = {"ok": True, "pid": os.getpid(), "versions": self.versions, "renders": len(self.active_children or [])}
+        elif message.get("op") == "stop":
+            self.stopping = True
+            reply = {"ok": True}
+        else:
+            reply = {"ok": False, "error": "Unknown operation: " + str(message.get("op"))}
+        request.sendall(json.dumps(reply).encode() + b"\n")
+        self.shutdown_request(request)
+
+    def idle(self):
+        return not self.active_children and time.monotonic() - self.last_request > self.idle_timeout
+
+class Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        sys.stdout.flush()
+        sys.stderr.flush()
+        self.request.sendall(json.dumps({"ok": True, "pid": os.getpid()}).encode() + b"\n")
+        returncode = render(self.server.requests[self.request])
+        self.request.sendall(json.dumps({"ok": True, "returncode": returncode}).encode() + b"\n")
+
+def serve(socket_path = SOCKET_PATH, idle_timeout = 900):
+    # Only one server may bind the socket, concurrent starts are serialised with a lock file
+    with open(socket_path + ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if ping(socket_path) is not None:
+            print("A fork server is already listening on " + socket_path, flush = True)
+            return 0
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+        started = time.perf_counter()
+        for module in PRELOAD:
+            __import__(module)
+        print("Imported " + ", ".join(PRELOAD) + " in " + "{:.1f}".format(time.perf_counter() - started) + " s", flush = True)
+        server = Server(socket_path, idle_timeout)
+        server.versions = versions()
+    print("Listening on " + socket_path, flush = True)
+    # Remove the socket on a normal kill as well
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    # Single-threaded on purpose: forking a process with other threads running is unsafe
+    server.timeout = 5
+    try:
+        while not server.stopping:
+            server.handle_request()
+            server.collect_children()
+            if server.idle():
+                print("Idle for " + str(idle_timeout) + " seconds, shutting down", flush = True)
+                break
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+    return 0
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Import manim and the other render dependencies once and fork a render process from them for every scene.")
+    parser.add_argument("--socket", default = SOCKET_PATH, help = "path of the Unix socket to listen on")
+    parser.add_argument("--idle-timeout", type = float, default = 900, help = "seconds without renders before the server exits")
+    args = parser.parse_args(argv)
+    return serve(args.socket, args.idle_timeout)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+import re
+
+from manim import MathTex, VGroup
+
+from stataud.glyphs import CHARACTERS, format_value, get_atlas
+
+# Commands that typeset a fixed number of glyphs
+SYMBOLS = {"theta": 1, "alpha": 1, "beta": 1, "lambda": 1, "mu": 1, "sigma": 1, "pi": 1, "leq": 1, "geq": 1, "neq": 1, "approx": 1, "cdot": 1, "times": 1, "infty": 1, "ldots": 3, "cdots": 3}
+# Commands that only add space
+SPACING = {",", ";", ":", "!", " ", "quad", "qquad"}
+# Big operators, whose limits are typeset above and below them in display style
+OPERATORS = {"sum", "prod"}
+
+def tokenize(template, names):
+    tokens = []
+    pattern = r"<(" + "|".join(re.escape(name) for name in names) + r")>" if names else r"(?!)()"
+    for match in re.finditer(pattern + r"|\\([A-Za-z]+|.)|(.)", template, re.S):
+        slot, command, char = match.groups()
+        if slot is not None:
+            tokens.append(("slot", slot))
+        elif command is not None:
+            tokens.append(("command", command))
+        elif not char.isspace():
+            tokens.append(("char", char))
+    return tokens
+
+class GlyphOrder:
+    # Works out which glyph of the compiled formula belongs to which slot. Glyphs come out of
+    # LaTeX in the order they are typeset, which is the reading order except for binomials,
+    # whose closing parenthesis follows the lower argument, and limits of big operators,
+    # where the upper limit comes before the operator
+    def __init__(self, tokens, values):
+        self.tokens = tokens
+        self.values = values
+        self.position = 0
+        self.occurrences = []
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def next(self):
+        token = self.peek()
+        if token is None:
+            raise ValueError("Formula ends unexpectedly")
+        self.position += 1
+        return token
+
+    def sequence(self, closing = False):
+        glyphs = []
+        while self.peek() is not None:
+            if self.peek() == ("char", "}"):
+                if not closing:
+                    raise ValueError("Unbalanced braces in formula")
+                self.position += 1
+                return glyphs
+            glyphs.extend(self.scripted())
+        if closing:
+            raise ValueError("Unbalanced braces in formula")
+        return glyphs
+
+    def scripted(self):
+        token = self.next()
+        nucleus = self.atom(token)
+        scripts = {"_": [], "^": []}
+        while self.peek() in [("char", "_"), ("char", "^")]:
+            kind = self.next()[1]
+            scripts[kind] = self.atom(self.next())
+        if token[0] == "command" and token[1] in OPERATORS:
+            return scripts["^"] + nucleus + scripts["_"]
+        return nucleus + scripts["^"] + scripts["_"]
+
+    def atom(self, token):
+        kind, value = token
+        if kind == "slot":
+            occurrence = len(self.occurrences)
+            self.occurrences.append(value)
+            return [occurrence] * count_glyphs(self.values[value])
+        if kind == "char":
+            if value == "{":
+                return self.sequence(closing = True)
+            if value in "&~":
+                return []
+            return [None]
+        if value in SYMBOLS:
+            return [None] * SYMBOLS[value]
+        if value in SPACING:
+            return []
+        if value in OPERATORS:
+            return [None]
+        if value == "binom":
+            return [None] + self.atom(self.next()) + self.atom(self.next()) + [None]
+        if value == "frac":
+            return self.atom(self.next()) + [None] + self.atom(self.next())
+        if value in ["text", "mathrm"]:
+            return self.atom(self.next())
+        raise ValueError("\\" + value + " is not supported in a SlotFormula")
+
+def count_glyphs(tex):
+    return len(GlyphOrder(tokenize(tex, []), {}).sequence())
+
+def is_number(text):
+    return all(char in CHARACTERS for char in text) and any(char.isdigit() for char in text)
+
+def slot(formula, name):
+    # Glyphs of all occurrences of a slot in a formula made by SlotFormula.build
+    return VGroup(*[formula[0][i] for i in formula.slot_indices[name]])
+
+class SlotFormula:
+    # MathTex template with named slots written as <name>, e.g. "<p>(X = <k>) = \\binom{<n>}{<k>}".
+    # The formula is compiled once per layout of its slots (which values are symbols and how many
+    # digits the numbers have); other numbers with the same layout are written from the glyph atlas
+    def __init__(self, template, colors = {}, values = {}, font_size = 48, **kwargs):
+        self.template = template
+        self.names = list(dict.fromkeys(re.findall(r"<(\w+)>", template)))
+        self.colors = colors
+        self.values = values
+        self.font_size = font_size
+        self.kwargs = kwargs
+        self.layouts = {}
+
+    def strings(self, values):
+        values = dict(self.values, **values)
+        return {name: format_value(values.get(name, name)) for name in self.names}
+
+    def layout_key(self, strings):
+        return tuple(re.sub(r"\d", "0", strings[name]) if is_number(strings[name]) else (strings[name],) for name in self.names)
+
+    def compile(self, strings):
+        tex = re.sub(r"<(\w+)>", lambda match: strings[match.group(1)] if match.group(1) in strings else match.group(0), self.template)
+        formula = MathTex(tex, font_size = self.font_size, **self.kwargs)
+        # Digits on the baseline and in superscripts are typeset at different sizes
+        atlases = [get_atlas(self.font_size, MathTex), get_atlas(self.font_size, MathTex, "{}^{%s}")]
+        order = GlyphOrder(tokenize(self.template, self.names), strings)
+        glyphs = order.sequence()
+        if len(glyphs) != len(formula[0]):
+            raise ValueError("Expected " + str(len(glyphs)) + " glyphs but LaTeX typeset " + str(len(formula[0])) + " for " + tex)
+
+        formula.slot_indices = {name: [] for name in self.names}
+        # Box and atlas of every digit in the numeric slots, so that other digits can be put in their place
+        boxes = []
+        for occurrence, name in enumerate(order.occurrences):
+            indices = [i for i, glyph in enumerate(glyphs) if glyph == occurrence]
+            formula.slot_indices[name].extend(indices)
+            text = strings[name]
+            if not is_number(text):
+                continue
+            reference = next(i for i, char in zip(indices, text) if char.isdigit())
+            char = text[indices.index(reference)]
+            atlas = min(atlases, key = lambda atlas: abs(formula[0][reference].height / atlas.glyphs[char].height - 1))
+            scale = formula[0][reference].height / atlas.glyphs[char].height
+            for position, (i, char) in enumerate(zip(indices, text)):
+                glyph = formula[0][i]
+                boxes.append((name, position, i, atlas, glyph.get_left()[0] - atlas.offset[char] * scale, glyph.get_bottom()[1] - atlas.drop[char] * scale, scale))
+        return formula, boxes
+
+    def build(self, color = True, **values):
+        strings = self.strings(values)
+        key = self.layout_key(strings)
+        if key not in self.layouts:
+            self.layouts[key] = self.compile(strings)
+        compiled, boxes = self.layouts[key]
+
+        formula = compiled.copy()
+        for name, position, i, atlas, x, baseline, scale in boxes:
+            atlas.place(formula[0][i], strings[name][position], x, baseline, scale)
+        if color:
+            for name, slot_color in self.colors.items():
+                slot(formula, name).set_color(slot_color)
+        return formula
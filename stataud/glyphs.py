@@ -0,0 +1,156 @@
+import re
+from itertools import zip_longest
+
+import numpy as np
+from manim import RIGHT, Tex, VectorizedPoint, VGroup, VMobject
+
+# Characters that can be swapped into a label without compiling LaTeX again
+CHARACTERS = "0123456789."
+
+class GlyphAtlas:
+    # Every character compiled once, together with its advance width and the offset of its ink
+    # from the start of its box, so that numbers can be typeset by placing copies of the glyphs
+    def __init__(self, font_size = 48, tex_class = Tex, wrapper = "%s"):
+        # Each character is doubled: the distance between the two copies is its advance width
+        mobject = tex_class(wrapper % "".join(char * 2 for char in CHARACTERS), font_size = font_size)
+        glyphs = mobject[0]
+        x = glyphs[0].get_left()[0]
+        bottom = glyphs[0].get_bottom()[1]
+        self.glyphs = {}
+        self.corner = {}
+        self.advance = {}
+        self.offset = {}
+        self.drop = {}
+        for i, char in enumerate(CHARACTERS):
+            first, second = glyphs[2 * i], glyphs[2 * i + 1]
+            self.glyphs[char] = first
+            self.corner[char] = np.array([first.get_left()[0], first.get_bottom()[1], 0])
+            self.advance[char] = second.get_left()[0] - first.get_left()[0]
+            self.offset[char] = first.get_left()[0] - x
+            self.drop[char] = first.get_bottom()[1] - bottom
+            x += 2 * self.advance[char]
+
+    def check(self, text):
+        for char in text:
+            if char not in self.glyphs:
+                raise ValueError("'" + char + "' in '" + text + "' cannot be typeset from the glyph atlas")
+
+    def width(self, text, scale = 1):
+        return sum(self.advance[char] for char in text) * scale
+
+    def place(self, glyph, char, x, baseline, scale = 1):
+        # Copy the outline of an atlas glyph into an existing mobject, with its box starting at x
+        source = self.glyphs[char]
+        target = np.array([x + self.offset[char] * scale, baseline + self.drop[char] * scale, 0])
+        glyph.points = (source.points - self.corner[char]) * scale + target
+        return self.advance[char] * scale
+
+ATLASES = {}
+
+def get_atlas(font_size = 48, tex_class = Tex, wrapper = "%s"):
+    key = (font_size, tex_class, wrapper)
+    if key not in ATLASES:
+        ATLASES[key] = GlyphAtlas(font_size, tex_class, wrapper)
+    return ATLASES[key]
+
+class GlyphString(VGroup):
+    # A fixed number of glyph mobjects whose outlines are replaced when the text changes
+    def __init__(self, atlas, length, style = None):
+        super().__init__(*[VMobject() for _ in range(length)])
+        if style is not None:
+            for glyph in self.submobjects:
+                glyph.match_style(style)
+        self.atlas = atlas
+
+    def write(self, text, x, baseline, scale = 1):
+        if len(text) > len(self.submobjects):
+            raise ValueError("'" + text + "' is longer than the " + str(len(self.submobjects)) + " glyphs reserved for it")
+        self.atlas.check(text)
+        start = x
+        for glyph, char in zip_longest(self.submobjects, text):
+            if char is None:
+                glyph.points = np.zeros((0, 3))
+            else:
+                x += self.atlas.place(glyph, char, x, baseline, scale)
+        return x - start
+
+class SlotLayout:
+    def __init__(self, name, mobject, x = 0, baseline = 0, scale = 1, width = 0):
+        self.name = name
+        self.mobject = mobject
+        self.x = x
+        self.baseline = baseline
+        self.scale = scale
+        self.width = width
+        self.shifted = 0
+
+def format_value(value):
+    return value if isinstance(value, str) else str(value)
+
+class TexCounter(VGroup):
+    # Tex label with numeric slots, e.g. TexCounter("$n$ = {n}", {"n": 0}). The template is
+    # compiled once; set_values swaps pre-rendered digit glyphs into the slots and moves the
+    # text after them, so changing a number needs no LaTeX run and creates no new mobjects
+    def __init__(self, template, values, font_size = 48, max_length = 8, tex_class = Tex, **kwargs):
+        super().__init__()
+        pieces = re.split(r"\{(" + "|".join(re.escape(name) for name in values) + r")\}", template)
+        strings = []
+        names = []
+        for i, piece in enumerate(pieces):
+            if i % 2:
+                strings.append(format_value(values[piece]))
+                names.append(piece)
+            elif piece:
+                strings.append(piece)
+                names.append(None)
+        compiled = tex_class(*strings, font_size = font_size, **kwargs)
+        atlas = get_atlas(font_size, tex_class)
+
+        # Two invisible points record where the label is and how much it has been scaled
+        center = compiled.get_center()
+        self.origin = VectorizedPoint(center)
+        self.unit = VectorizedPoint(center + 0.01 * RIGHT)
+        self.add(self.origin, self.unit)
+
+        self.values = dict(values)
+        self.parts = []
+        self.slots = {}
+        self.layout = []
+        for name, string, part in zip(names, strings, compiled):
+            if name is None:
+                self.parts.append(part)
+                self.layout.append(SlotLayout(None, part))
+                self.add(part)
+                continue
+            atlas.check(string)
+            first = part[0]
+            # Size of the digits in the compiled label relative to the atlas
+            reference = next((i for i, char in enumerate(string) if char.isdigit()), 0)
+            scale = part[reference].height / atlas.glyphs[string[reference]].height
+            x = first.get_left()[0] - atlas.offset[string[0]] * scale
+            baseline = first.get_bottom()[1] - atlas.drop[string[0]] * scale
+            slot = GlyphString(atlas, max_length, style = first)
+            slot.write(string, x, baseline, scale)
+            self.layout.append(SlotLayout(name, slot, x - center[0], baseline - center[1], scale, atlas.width(string, scale)))
+            self.slots.setdefault(name, []).append(slot)
+            self.add(slot)
+
+    def slot(self, name):
+        return VGroup(*self.slots[name])
+
+    def set_values(self, **values):
+        self.values.update(values)
+        center = self.get_center()
+        origin = self.origin.get_center()
+        scale = (self.unit.get_center()[0] - origin[0]) / 0.01
+        # Shift of everything after the slots whose width changed, in units of the original label
+        delta = 0
+        for item in self.layout:
+            if item.name is None:
+                item.mobject.shift((delta - item.shifted) * scale * RIGHT)
+                item.shifted = delta
+                continue
+            width = item.mobject.write(format_value(self.values[item.name]), origin[0] + (item.x + delta) * scale, origin[1] + item.baseline * scale, item.scale * scale)
+            delta += width / scale - item.width
+        self.move_to(center)
+        return self
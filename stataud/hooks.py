@@ -0,0 +1,21 @@
+import atexit
+import traceback
+
+# Functions that write what a render recorded, such as its benchmark report or profile, also when
+# the render fails. A render started as its own process runs them at exit. A render forked from
+# the fork server leaves with os._exit, which skips atexit, so the server calls flush() instead
+functions = []
+
+def register(function):
+    if not functions:
+        atexit.register(flush)
+    functions.append(function)
+
+def flush():
+    # Run every registered function once, one that fails does not keep the others from running
+    while functions:
+        function = functions.pop(0)
+        try:
+            function()
+        except Exception:
+            traceback.print_exc()
@@ -0,0 +1,264 @@
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from stataud import checkpoint, concat, forkserver
+from stataud.cache import SceneCache
+from stataud.tts import client
+
+# Quality flags accepted by manim and the folder manim renders them to
+QUALITIES = {
+    "l": ("-ql", "480p15"),
+    "m": ("-qm", "720p30"),
+    "h": ("-qh", "1080p60"),
+    "p": ("-qp", "1440p60"),
+    "k": ("-qk", "2160p60"),
+}
+
+# Scene files are named [scene number]_SceneName.py
+SCENE_PATTERN = re.compile(r"^(\d+)_(\w+)\.py$")
+
+class RenderError(Exception):
+    pass
+
+def report(message):
+    # Single write so that messages from parallel renders do not interleave
+    sys.stdout.write(message + "\n")
+    sys.stdout.flush()
+
+class SceneFile:
+    def __init__(self, directory, filename):
+        self.directory = directory
+        self.filename = filename
+        number, name = SCENE_PATTERN.match(filename).groups()
+        self.number = int(number)
+        self.name = name
+        self.file_root = os.path.splitext(filename)[0]
+
+    def media_dir(self):
+        return os.path.join(self.directory, "media")
+
+    def output(self, quality):
+        # Path where manim writes the rendered scene for this quality
+        folder = QUALITIES[quality][1]
+        return os.path.join(self.media_dir(), "videos", self.file_root, folder, self.name + ".mp4")
+
+    def log(self):
+        return os.path.join(self.directory, "media", "logs", self.file_root + ".log")
+
+    def matches(self, token):
+        if token.isdigit():
+            return int(token) == self.number
+        return token in (self.name, self.file_root, self.filename)
+
+def find_scenes(directory):
+    # Collect all scene files, ordered by their numeric prefix
+    scenes = [SceneFile(directory, filename) for filename in os.listdir(directory) if SCENE_PATTERN.match(filename)]
+    scenes.sort(key = lambda scene: scene.number)
+    return scenes
+
+def select_scenes(scenes, only):
+    if not only:
+        return scenes
+    unknown = [token for token in only if not any(scene.matches(token) for scene in scenes)]
+    if unknown:
+        raise RenderError("Unknown scene(s): " + ", ".join(unknown))
+    return [scene for scene in scenes if any(scene.matches(token) for token in only)]
+
+class Renderer:
+    def __init__(self, quality, jobs, cache = None, fork = False):
+        self.quality = quality
+        self.jobs = jobs
+        self.cache = cache
+        # Fork the renders from the fork server instead of starting a new manim process for each
+        self.fork = fork
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()
+        self.processes = set()
+
+    def command(self, scene):
+        return ["manim", QUALITIES[self.quality][0], scene.filename, "--disable_caching"]
+
+    def environment(self, scene):
+        # Environment of the manim process, None to inherit this one
+        return None
+
+    def start(self, scene, log, checkpoints = None):
+        command = self.command(scene)
+        environment = self.environment(scene)
+        if checkpoints is not None:
+            # The render writes checkpoints to this folder and resumes from the last one in it
+            environment = dict(environment or os.environ, STATAUD_CHECKPOINT = checkpoints)
+            resume = checkpoint.load(checkpoints)
+            if resume is not None:
+                command = command + ["-n", str(resume["plays"])]
+        if self.fork:
+            return forkserver.ForkedRender(command, scene.directory, environment, log.name)
+        return subprocess.Popen(command, cwd = scene.directory, env = environment, stdout = log, stderr = subprocess.STDOUT)
+
+    def cache_key(self, scene):
+        return self.cache.key(os.path.join(scene.directory, scene.filename), self.quality)
+
+    def checkpoint_dir(self, scene):
+        # Folder of the checkpoints of the scene, None to render it without checkpoints
+        return checkpoint.directory(os.path.join(scene.directory, scene.filename), self.quality, scene.media_dir())
+
+    def cached(self, scene):
+        # Stored video of the scene when nothing that affects it has changed
+        if self.cache is None:
+            return None
+        return self.cache.get(self.cache_key(scene))
+
+    def render(self, scene):
+        if self.stopped.is_set():
+            raise RenderError(scene.filename + " was cancelled")
+        key = None
+        if self.cache is not None:
+            # Reuse the stored video when nothing that affects this scene has changed
+            key = self.cache_key(scene)
+            cached = self.cache.get(key)
+            if cached is not None:
+                report("Using cached " + scene.filename)
+                return cached
+        output = scene.output(self.quality)
+        # Remove the previous output so that a failed render can never be concatenated
+        if os.path.exists(output):
+            os.remove(output)
+        checkpoints = self.checkpoint_dir(scene)
+        resume = None if checkpoints is None else checkpoint.load(checkpoints)
+        if resume is not None:
+            report("Resuming " + scene.filename + " from play " + str(resume["plays"]))
+        returncode = self.run(scene, checkpoints)
+        if returncode != 0 and resume is not None and checkpoint.load(checkpoints) is None and not self.stopped.is_set():
+            # The render removes a checkpoint that the scene no longer matches
+            report("Rendering " + scene.filename + " from the start, it did not match its checkpoint")
+            returncode = self.run(scene, checkpoints)
+        if self.stopped.is_set():
+            raise RenderError(scene.filename + " was cancelled")
+        if returncode != 0:
+            raise RenderError(scene.filename + " failed with exit code " + str(returncode) + ", see " + scene.log())
+        if not os.path.exists(output):
+            raise RenderError(scene.filename + " did not produce " + output)
+        if checkpoints is not None:
+            shutil.rmtree(checkpoints, ignore_errors = True)
+        if key is not None:
+            return self.cache.put(key, output, scene = scene.filename, quality = self.quality)
+        return output
+
+    def run(self, scene, checkpoints = None):
+        os.makedirs(os.path.dirname(scene.log()), exist_ok = True)
+        with open(scene.log(), "w") as log:
+            process = self.start(scene, log, checkpoints)
+            with self.lock:
+                self.processes.add(process)
+            try:
+                return process.wait()
+            finally:
+                with self.lock:
+                    self.processes.discard(process)
+
+    def stop(self):
+        # Fail fast: terminate every render that is still running
+        self.stopped.set()
+        with self.lock:
+            for process in self.processes:
+                process.terminate()
+
+    def render_all(self, scenes, finished = None):
+        # finished(scene, path) is called in this thread as soon as a scene is rendered
+        outputs = {}
+        with ThreadPoolExecutor(max_workers = self.jobs) as executor:
+            futures = {executor.submit(self.render, scene): scene for scene in scenes}
+            try:
+                for future in as_completed(futures):
+                    scene = futures[future]
+                    outputs[scene] = future.result()
+                    report("Finished " + scene.filename)
+                    if finished is not None:
+                        finished(scene, outputs[scene])
+            except BaseException:
+                self.stop()
+                for future in futures:
+                    future.cancel()
+                raise
+        # Keep the numeric prefix ordering for the concatenation
+        return [outputs[scene] for scene in scenes]
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description = "Render all scenes in this folder and concatenate them into a single video.")
+    parser.add_argument("-j", "--jobs", type = int, default = os.cpu_count() or 1, help = "number of scenes rendered at the same time")
+    parser.add_argument("--only", nargs = "+", metavar = "SCENE", help = "render only these scenes, given by number (02), name (UniformPrior) or file name")
+    parser.add_argument("-q", "--quality", choices = sorted(QUALITIES), default = "h", help = "manim render quality (default: h, 1080p60)")
+    parser.add_argument("--progressive", action = "store_true", help = "write a preview video first and swap in each scene as soon as it is rendered in the final quality")
+    parser.add_argument("--preview-quality", choices = sorted(QUALITIES), default = "l", help = "render quality of the preview with --progressive (default: l, 480p15)")
+    parser.add_argument("--no-cache", action = "store_true", help = "render every scene, even if a cached video exists")
+    parser.add_argument("--no-prefetch", action = "store_true", help = "synthesize voiceovers while rendering instead of before")
+    parser.add_argument("--no-warmup", action = "store_true", help = "compile LaTeX and Text strings while rendering instead of before")
+    parser.add_argument("--no-forkserver", action = "store_true", help = "start a new manim process for every scene instead of forking it from the fork server")
+    parser.add_argument("--concat", choices = sorted(concat.METHODS), default = "copy", help = "copy the streams without re-encoding (default), encode them again with ffmpeg or re-encode with moviepy")
+    parser.add_argument("--encoder", choices = sorted(concat.PRESETS), default = "h264", help = "encoder of --concat encode (default: h264)")
+    parser.add_argument("--crf", type = int, help = "constant rate factor of --concat encode, lower is better (default: 20 for h264, 24 for h265, 32 for av1)")
+    parser.add_argument("--bitrate", help = "target video bitrate of --concat encode instead of a constant rate factor, e.g. 8M")
+    parser.add_argument("--threads", type = int, help = "threads of each encoder process of --concat encode (default: the CPU cores shared by the processes)")
+    parser.add_argument("--narration", action = "store_true", help = "replace the audio of the video by one narration track built from all scenes, loudness-normalized and encoded once")
+    parser.add_argument("--loudness", type = float, default = -16.0, help = "integrated loudness of --narration in LUFS (default: -16)")
+    parser.add_argument("-o", "--output", default = "Video.mp4", help = "name of the concatenated video")
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    return args
+
+def assemble(paths, output, args):
+    # Write the video with the concatenation method and encoder settings of the command line.
+    # With --concat encode, up to --jobs scenes are encoded at the same time
+    if args.concat == "encode":
+        concat.concatenate_encode(paths, output, args.encoder, args.crf, args.bitrate, args.threads, args.jobs)
+    else:
+        concat.METHODS[args.concat](paths, output)
+    if args.narration:
+        from stataud import narration
+
+        narration.replace_audio(paths, output, args.loudness)
+
+def main(directory, argv = None):
+    args = parse_args(argv)
+    try:
+        scenes = select_scenes(find_scenes(directory), args.only)
+        if not scenes:
+            raise RenderError("No scene files found in " + directory)
+        cache = None if args.no_cache else SceneCache()
+        renderer = Renderer(args.quality, args.jobs, cache, fork = not args.no_forkserver)
+        renderers = [renderer]
+        if args.progressive and args.preview_quality != args.quality:
+            preview = Renderer(args.preview_quality, args.jobs, cache, fork = not args.no_forkserver)
+            renderers.append(preview)
+        pending = [scene for scene in scenes if any(each.cached(scene) is None for each in renderers)]
+        if pending and not args.no_prefetch:
+            # Synthesize all voiceovers first so that no render waits on text-to-speech
+            from stataud.tts.prefetch import prefetch
+
+            prefetch(directory, [scene.filename for scene in pending], args.jobs)
+        if pending and not args.no_warmup:
+            # Compile the literal LaTeX and Text strings once instead of in every render that uses them
+            from stataud.texcache import warm_up
+
+            warm_up([os.path.join(directory, scene.filename) for scene in pending], args.jobs)
+        if pending and not args.no_forkserver:
+            forkserver.ensure_server()
+        if len(renderers) > 1:
+            from stataud import progressive
+
+            finish = None if args.concat == "copy" and not args.narration else lambda paths, output: assemble(paths, output, args)
+            progressive.render(preview, renderer, scenes, os.path.join(directory, args.output), finish)
+        else:
+            paths = renderer.render_all(scenes)
+            assemble(paths, os.path.join(directory, args.output), args)
+    except (RenderError, concat.ConcatError, client.DaemonError, forkserver.ForkServerError) as error:
+        print("Error: " + str(error), file = sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,122 @@
+import os
+import subprocess
+import tempfile
+from collections import Counter
+
+import numpy as np
+from scipy import signal
+
+from stataud.concat import ConcatError, inspect, run
+
+# Integrated loudness that the narration is normalized to, in LUFS, and the highest sample peak
+# it may reach, in dBFS
+TARGET_LOUDNESS = -16.0
+PEAK_LIMIT = -1.0
+
+# Short fades at the joins of the scenes, so that a scene that ends or starts mid-waveform
+# does not click, in seconds
+JOIN_FADE = 0.002
+
+def decode(path, rate, channels):
+    # Audio of a file as float32 samples of shape (samples, channels)
+    command = ["ffmpeg", "-v", "error", "-i", path, "-map", "0:a:0", "-f", "f32le", "-ar", str(rate), "-ac", str(channels), "-"]
+    try:
+        result = subprocess.run(command, stdout = subprocess.PIPE, stderr = subprocess.PIPE)
+    except FileNotFoundError:
+        raise ConcatError("ffmpeg was not found, make sure that ffmpeg is installed")
+    if result.returncode != 0:
+        raise ConcatError("ffmpeg failed to decode the audio of " + path + ":\n" + result.stderr.decode(errors = "replace")[-2000:])
+    return np.frombuffer(result.stdout, dtype = np.float32).reshape(-1, channels)
+
+def build_track(paths, descriptions, rate, channels):
+    # The audio of all scenes in one array. Every scene gets exactly as many samples as its
+    # duration in the concatenated video, counted from the start of the video so that rounding
+    # never adds up, with silence for scenes without sound. descriptions are the inspect()
+    # results of the paths
+    ends = np.round(np.cumsum([duration for _, duration in descriptions]) * rate).astype(int)
+    track = np.zeros((ends[-1] if len(ends) else 0, channels), dtype = np.float32)
+    fade = np.sin(np.linspace(0, np.pi / 2, max(int(JOIN_FADE * rate), 1), dtype = np.float32))[:, None] ** 2
+    start = 0
+    for path, ((_, audio), _), end in zip(paths, descriptions, ends):
+        if audio is not None:
+            # A copy, the decoded buffer is read-only
+            samples = decode(path, rate, channels)[:end - start].copy()
+            if len(samples) > 2 * len(fade):
+                samples[:len(fade)] *= fade
+                samples[-len(fade):] *= fade[::-1]
+            track[start:start + len(samples)] = samples
+        start = end
+    return track
+
+def k_weighting(rate):
+    # The two filters of ITU-R BS.1770: a high shelf for the head and a high pass, as biquads
+    # for any sample rate
+    w0 = 2 * np.pi * 1500 / rate
+    gain = 10 ** (4 / 40)
+    alpha = np.sin(w0) / (2 / np.sqrt(2))
+    root = 2 * np.sqrt(gain) * alpha
+    shelf = (
+        [gain * ((gain + 1) + (gain - 1) * np.cos(w0) + root), -2 * gain * ((gain - 1) + (gain + 1) * np.cos(w0)), gain * ((gain + 1) + (gain - 1) * np.cos(w0) - root)],
+        [(gain + 1) - (gain - 1) * np.cos(w0) + root, 2 * ((gain - 1) - (gain + 1) * np.cos(w0)), (gain + 1) - (gain - 1) * np.cos(w0) - root],
+    )
+    w0 = 2 * np.pi * 38 / rate
+    alpha = np.sin(w0) / (2 * 0.5)
+    high_pass = (
+        [(1 + np.cos(w0)) / 2, -(1 + np.cos(w0)), (1 + np.cos(w0)) / 2],
+        [1 + alpha, -2 * np.cos(w0), 1 - alpha],
+    )
+    return [shelf, high_pass]
+
+def integrated_loudness(track, rate):
+    # Gated loudness of ITU-R BS.1770 in LUFS: 400 ms blocks with 75% overlap, an absolute gate
+    # at -70 LUFS and a relative gate 10 LU below the loudness of the blocks that pass it
+    weighted = track.astype(np.float64)
+    for b, a in k_weighting(rate):
+        weighted = signal.lfilter(b, a, weighted, axis = 0)
+    block = int(0.4 * rate)
+    hop = int(0.1 * rate)
+    if len(weighted) < block:
+        return -np.inf
+    energy = np.concatenate([np.zeros(1), np.cumsum(np.sum(weighted ** 2, axis = 1))])
+    starts = np.arange(0, len(weighted) - block + 1, hop)
+    power = (energy[starts + block] - energy[starts]) / block
+    with np.errstate(divide = "ignore"):
+        loudness = -0.691 + 10 * np.log10(power)
+    gated = power[loudness > -70]
+    if len(gated) == 0:
+        return -np.inf
+    relative = -0.691 + 10 * np.log10(np.mean(gated)) - 10
+    gated = power[(loudness > -70) & (loudness > relative)]
+    return -0.691 + 10 * np.log10(np.mean(gated))
+
+def normalize(track, rate, target = TARGET_LOUDNESS, peak_limit = PEAK_LIMIT):
+    # Scale the track to the target loudness, but never beyond the peak limit
+    loudness = integrated_loudness(track, rate)
+    if not np.isfinite(loudness):
+        return track, 1.0
+    gain = 10 ** ((target - loudness) / 20)
+    peak = np.max(np.abs(track))
+    if peak > 0:
+        gain = min(gain, 10 ** (peak_limit / 20) / peak)
+    return track * np.float32(gain), gain
+
+def mux(video, track, rate, output):
+    # Copy the video stream of the video and encode the track as its only audio stream
+    channels = track.shape[1]
+    directory = os.path.dirname(os.path.abspath(output))
+    with tempfile.TemporaryDirectory(dir = directory) as workdir:
+        raw = os.path.join(workdir, "narration.f32")
+        track.astype("<f4").tofile(raw)
+        temporary = os.path.join(workdir, "output.mp4")
+        run(["ffmpeg", "-y", "-v", "error", "-i", video, "-f", "f32le", "-ar", str(rate), "-ac", str(channels), "-i", raw, "-map", "0:v:0", "-map", "1:a:0", "-c:v", "copy", "-c:a", "aac", "-b:a", "192k", "-movflags", "+faststart", temporary])
+        os.replace(temporary, output)
+
+def replace_audio(paths, output, target = TARGET_LOUDNESS):
+    # Build the narration of the scenes in one go and put it under the concatenated video
+    descriptions = [inspect(path) for path in paths]
+    layouts = [audio for (_, audio), _ in descriptions if audio is not None]
+    _, rate, channels, _ = Counter(layouts).most_common(1)[0][0] if layouts else (None, 48000, 2, None)
+    track = build_track(paths, descriptions, rate, channels)
+    track, gain = normalize(track, rate, target)
+    mux(output, track, rate, output)
+    print("Muxed a narration track of " + "{:.1f}".format(len(track) / rate) + " s into " + os.path.basename(output) + ", gain " + "{:+.1f}".format(20 * np.log10(gain)) + " dB")
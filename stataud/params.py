@@ -0,0 +1,60 @@
+import hashlib
+import json
+import os
+import tomllib
+
+from stataud import ROOT
+
+# Default parameters of the scenes, one table per scene class
+DEFAULTS = os.path.join(ROOT, "params.toml")
+
+def read(path):
+    with open(path, "rb") as file:
+        return tomllib.load(file)
+
+def load_all(path = None):
+    # The defaults, with the tables of the file in STATAUD_PARAMS (or path) laid over them
+    params = read(DEFAULTS)
+    path = path or os.environ.get("STATAUD_PARAMS")
+    if not path:
+        return params
+    for scene, overrides in read(path).items():
+        if scene not in params:
+            raise ValueError(path + ": no scene " + repr(scene) + " has parameters, choose from " + ", ".join(sorted(params)))
+        unknown = sorted(set(overrides) - set(params[scene]))
+        if unknown:
+            raise ValueError(path + ": unknown parameter(s) of " + scene + ": " + ", ".join(unknown))
+        params[scene] = dict(params[scene], **overrides)
+    return params
+
+def load(scene, path = None):
+    return load_all(path)[scene]
+
+def parameter_hash(scene, params):
+    # Short name for a scene rendered with these parameters
+    description = json.dumps({"scene": scene, "params": params}, sort_keys = True)
+    return hashlib.sha256(description.encode()).hexdigest()[:12]
+
+def toml_value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        return json.dumps(value)
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(toml_value(item) for item in value) + "]"
+    raise TypeError("Cannot write " + repr(value) + " as a parameter")
+
+def dump(params, path):
+    # Write {scene: {name: value}} in the layout of params.toml
+    with open(path, "w") as file:
+        for scene, values in params.items():
+            file.write("[" + scene + "]\n")
+            for name, value in values.items():
+                file.write(name + " = " + toml_value(value) + "\n")
+            file.write("\n")
+
+def percent(value):
+    # 0.03 -> "3", as the number in "3 percent"
+    return "{:g}".format(round(value * 100, 6))
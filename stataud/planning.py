@@ -0,0 +1,71 @@
+import numpy as np
+from scipy import special, stats
+
+# Distributions of the number of misstatements in a sample
+DISTRIBUTIONS = ["binomial", "poisson", "hypergeometric"]
+
+# Sample sizes are looked for up to this size when the population size is not given
+MAX_SIZE = 10 ** 7
+
+def population_misstatements(theta, N):
+    # Number of misstated items in a population of N items with misstatement rate theta, rounded
+    # up; the small margin keeps e.g. 0.05 * 500 = 25.000000000000004 from becoming 26
+    return np.ceil(np.asarray(theta, dtype = float) * N - 1e-9)
+
+def cumulative(n, k, theta, distribution = "binomial", N = None):
+    # Probability of at most k misstatements in a sample of n items, P(X <= k)
+    if distribution == "binomial":
+        return stats.binom.cdf(k, n, theta)
+    if distribution == "poisson":
+        return stats.poisson.cdf(k, np.asarray(n) * theta)
+    if distribution == "hypergeometric":
+        if N is None:
+            raise ValueError("The hypergeometric distribution needs the population size N")
+        return stats.hypergeom.cdf(k, N, population_misstatements(theta, N), n)
+    raise ValueError("Unknown distribution " + repr(distribution) + ", choose from " + ", ".join(DISTRIBUTIONS))
+
+def smallest(sufficient, lower, limit):
+    # Smallest n above lower (an insufficient size) for which sufficient(n) holds, assuming that
+    # larger sizes stay sufficient. The answer is bracketed by doubling the step above lower and
+    # then found by bisection, using a few dozen evaluations instead of one per candidate size
+    step = np.ones_like(lower)
+    upper = np.minimum(lower + step, limit)
+    done = sufficient(upper)
+    while not done.all():
+        if (upper[~done] >= limit[~done]).any():
+            raise ValueError("No sample size up to " + str(limit[~done].min()) + " is sufficient")
+        lower = np.where(done, lower, upper)
+        step = step * 2
+        upper = np.where(done, upper, np.minimum(lower + step, limit))
+        done = sufficient(upper)
+
+    while (upper - lower > 1).any():
+        middle = (lower + upper) // 2
+        enough = sufficient(middle)
+        upper = np.where(enough, middle, upper)
+        lower = np.where(enough, lower, middle)
+    return int(upper) if upper.ndim == 0 else upper
+
+def sample_size(theta, k = 0, alpha = 0.05, distribution = "binomial", N = None):
+    # Smallest sample size n with P(X <= k) < alpha. All arguments may be arrays, which are
+    # solved together
+    theta, k, alpha, population = np.broadcast_arrays(np.asarray(theta, dtype = float), np.asarray(k, dtype = int), np.asarray(alpha, dtype = float), np.asarray(MAX_SIZE if N is None else N, dtype = int))
+    if distribution == "hypergeometric" and N is None:
+        raise ValueError("The hypergeometric distribution needs the population size N")
+    limit = population if distribution == "hypergeometric" else np.full(theta.shape, MAX_SIZE)
+    def sufficient(n):
+        return cumulative(n, k, theta, distribution, population) < alpha
+
+    # A sample of 0 items contains at most k misstatements for certain, so it is never sufficient
+    return smallest(sufficient, np.zeros(theta.shape, dtype = int), limit)
+
+def bayesian_sample_size(materiality, k = 0, confidence = 0.95, prior_a = 1, prior_b = 1):
+    # Smallest sample size n for which the upper bound of the beta(prior_a + k, prior_b + n - k)
+    # posterior at the given confidence lies below the materiality, when k of the n items are
+    # misstated. All arguments may be arrays, e.g. to compare several priors at once
+    materiality, k, confidence, prior_a, prior_b = np.broadcast_arrays(np.asarray(materiality, dtype = float), np.asarray(k, dtype = int), np.asarray(confidence, dtype = float), np.asarray(prior_a, dtype = float), np.asarray(prior_b, dtype = float))
+    def sufficient(n):
+        return special.betaincinv(prior_a + k, prior_b + n - k, confidence) < materiality
+
+    # The sample contains the k misstatements, so it has at least k items
+    return smallest(sufficient, k - 1, np.full(k.shape, MAX_SIZE))
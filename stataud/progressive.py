@@ -0,0 +1,43 @@
+import os
+
+from stataud import concat
+from stataud.montage import report
+
+class ProgressiveVideo:
+    # The concatenated video, made of the final render of each scene that has one and the preview
+    # render of the others. Once the first final render exists, the previews are transcoded to its
+    # resolution, frame rate and codec, which concatenate_copy does only once per preview
+    def __init__(self, scenes, output):
+        self.scenes = scenes
+        self.output = output
+        self.paths = {}
+        self.upgraded = set()
+        self.reference = None
+
+    def assemble(self):
+        # concatenate_copy writes to a temporary file first, so the video is never half written
+        concat.concatenate_copy([self.paths[scene] for scene in self.scenes], self.output, self.reference)
+
+    def upgrade(self, scene, path):
+        self.paths[scene] = path
+        self.upgraded.add(scene)
+        if self.reference is None:
+            self.reference = path
+        self.assemble()
+        report("Swapped " + scene.filename + " into " + os.path.relpath(self.output) + " (" + str(len(self.upgraded)) + " of " + str(len(self.scenes)) + " scenes in final quality)")
+
+def render(preview, final, scenes, output, finish = None):
+    # Render and concatenate all scenes in preview quality first, then render them again in final
+    # quality and swap each one in as soon as it is finished, so that the output is a complete
+    # video from the first minutes on and only gets better. finish(paths, output) writes the
+    # final video from the final renders, e.g. encoded again, instead of the copied streams
+    video = ProgressiveVideo(scenes, output)
+    for scene, path in zip(scenes, preview.render_all(scenes)):
+        video.paths[scene] = path
+    video.assemble()
+    report("Wrote preview " + os.path.relpath(output) + ", rendering the scenes in final quality now")
+
+    paths = final.render_all(scenes, finished = video.upgrade)
+    if finish is not None:
+        finish(paths, output)
+    return output
@@ -0,0 +1,61 @@
+from stataud.distributions import CountDistribution
+from stataud.params import percent
+from stataud.planning import sample_size
+
+# Voiceover texts of the scenes that say their parameters out loud. A scene takes them from
+# script(scene, params) as narration["key"], and the voiceover prefetch calls the same function
+# with the same parameters, so these texts are synthesized before rendering like literal ones
+
+def binomial(params):
+    n_start, theta, low_theta, alpha = params["n"], params["theta"], params["low_theta"], params["alpha"]
+    n_zero, n_one, n_rate = sample_size([theta, theta, low_theta], k = [0, 1, 0], alpha = alpha)
+    binomial = CountDistribution("binomial", n_start, theta)
+    return {
+        "example": "For example, the probability of discovering 0 misstatements in a sample of " + str(n_start) + " items, assuming a true misstatement rate of " + percent(theta) + " percent, is around " + str(round(binomial.pmf(n_start, theta)[0] * 100, 1)) + " percent.",
+        "increase": "You have seen earlier that these probabilities depend on the sample size. To illustrate this dependency, I will <bookmark mark='A'/>increase the sample size from " + str(n_start) + " to " + str(n_zero) + ".",
+        "zero": "You can see that if the true misstatement rate is " + percent(theta) + " percent, the probability of discovering <bookmark mark='A'/>0 misstatements in a sample of " + str(n_zero) + " items is equal to " + str(round(binomial.pmf(n_zero, theta)[0] * 100, 1)) + " percent.",
+        "risk": "For example, planning a sample with " + percent(1 - alpha) + " percent confidence means that the sampling risk is " + percent(alpha) + " percent. Since the probability of observing no misstatements is lower than this sampling risk, a sample size of " + str(n_zero) + " is sufficient, but only if you tolerate no misstatements in the sample.",
+        "tolerate": "However, when you tolerate <bookmark mark='A'/>1 misstatement in the sample you need to consider the probability of finding 0 misstatements, or <bookmark mark='B'/>1 misstatement. This cumulative probability is higher than the sampling risk of " + percent(alpha) + " percent, which means that a sample size of " + str(n_zero) + " is insufficient.",
+        "increase_one": "To bring this cumulative probability below " + percent(alpha) + " percent, we will need to increase the sample size further. Let's do that <bookmark mark='A'/>now. Pay attention to what effect this has on the probabilities.",
+        "sufficient_one": "Only at a sample size of " + str(n_one) + " the cumulative probability is " + str(round(binomial.cdf(n_one, theta)[1] * 100, 1)) + " percent, which is lower than the sampling risk. This means that a sample size of " + str(n_one) + " is sufficient when tolerating 1 misstatement in the sample and assuming a true misstatement rate of " + percent(theta) + " percent.",
+        "lower_rate": "Watch what happends to the probabilities if I gradually lower the value of the true misstatement <bookmark mark='A'/>rate from " + percent(theta) + " percent to " + percent(low_theta) + " percent.",
+        "higher": "As you can see, the probability of 0 misstatements in a sample of " + str(n_one) + " items assuming a true misstatement rate of " + percent(low_theta) + " percent is once again <bookmark mark='A'/>higher than the sampling risk.",
+        "increase_rate": "To bring this probability below " + percent(alpha) + " percent, <bookmark mark='A'/>we will once more need to increase the sample size.",
+        "sufficient_rate": "Now you see that you need a sample size of " + str(n_rate) + " to bring the probability of 0 misstatements below the sampling risk. This means that a sample size of " + str(n_rate) + " is sufficient when tolerating 0 misstatements in the sample and assuming a true misstatement rate of " + percent(low_theta) + " percent.",
+    }
+
+def other(params):
+    theta, alpha, population = params["theta"], params["alpha"], params["N"]
+    n_binom = sample_size(theta, alpha = alpha, distribution = "binomial")
+    n_pois = sample_size(theta, alpha = alpha, distribution = "poisson")
+    n_hyper = sample_size(theta, alpha = alpha, distribution = "hypergeometric", N = population)
+    return {
+        "binomial": "For comparison, the barplot on the left visualizes the binomial probabilities for a sample of " + str(n_binom) + " items assuming a true misstatement rate of " + percent(theta) + " percent.",
+        "risk": "The probability of 0 misstatements is lower than the sampling risk of " + percent(alpha) + " percent, which means that this sample size is sufficient.",
+        "poisson": "This means that the Poisson distribution requires a slightly larger sample size to reduce this probability below " + percent(alpha) + " percent. <bookmark mark='A'/>In this case, a sufficient sample size is " + str(n_pois) + " items, an increase of " + str(n_pois - n_binom) + ".",
+        "population": "Lastly, we examine the hypergeometric distribution. <bookmark mark='A'/>On the right you see the probabilities for this distribution, which is used to take into account the population size. In this case, the population consists of <bookmark mark='B'/>" + str(population) + " items.",
+        "hypergeometric": "This means that the hypergeometric distribution requires a slightly smaller sample size. <bookmark mark='A'/>In this case, a sufficient sample size is " + str(n_hyper) + " items, a reduction of " + str(n_binom - n_hyper) + " items. However, this reduction in sample size gets smaller when the population size increases.",
+    }
+
+def effect_of_prior(params):
+    (a_ul, b_ul), (a_ur, b_ur), (a_dl, b_dl), (a_dr, b_dr) = params["priors"]
+    prior_ul = "the uniform prior distribution" if (a_ul, b_ul) == (1, 1) else "the beta distribution with parameters " + str(a_ul) + " and " + str(b_ul)
+    return {
+        "top_left": "In the top left you see " + prior_ul + ".",
+        "top_right": "In the top right you see the beta distribution with parameters " + str(a_ur) + " and " + str(b_ur) + ".",
+        "bottom_left": "In the bottom left you see a third beta distribution. However, this one has parameters " + str(a_dl) + " and " + str(b_dl) + ".",
+        "bottom_right": "Finally, in the bottom right you see the beta distribution with parameters " + str(a_dr) + " and " + str(b_dr) + ".",
+        "lines": "I will again indicate the " + percent(params["confidence"]) + " percent upper bound and the performance materiality of " + percent(params["materiality"]) + " percent as separate lines.",
+        "sample": "Now, I will pretend as if a sample of " + str(params["n"]) + " items is observed sequentially.",
+    }
+
+# Scripts by scene class name, the tables of params.toml
+SCRIPTS = {
+    "Binomial": binomial,
+    "Other": other,
+    "EffectOfPrior": effect_of_prior,
+}
+
+def script(scene, params):
+    # params as returned by params.load(scene)
+    return SCRIPTS[scene](params)
@@ -0,0 +1,43 @@
+import math
+
+from manim import Animation, ValueTracker, VGroup, linear
+
+class Sweep(Animation):
+    # Moves a parameter from start to end during a single animation, e.g. the sample size from
+    # 157 to 299, and calls update(value) to change the given mobjects in place. With a step, the
+    # parameter takes the values start, start + step, ..., end for equal amounts of time and update
+    # is only called when the value changes; without a step it is called on every frame. A loop of
+    # many short plays thus becomes one play and one partial movie file
+    def __init__(self, update, start, end, *mobjects, step = None, rate_func = linear, **kwargs):
+        self.update_function = update
+        self.start = start
+        self.end = end
+        self.step = step
+        self.count = None if step is None else int(round((end - start) / step)) + 1
+        self.tracker = ValueTracker(start)
+        self.current = None
+        super().__init__(VGroup(*mobjects), rate_func = rate_func, **kwargs)
+
+    def create_starting_mobject(self):
+        # The mobjects are changed in place, so no copy is needed
+        return self.mobject
+
+    def begin(self):
+        self.current = None
+        super().begin()
+
+    def value(self, alpha):
+        if self.step is None:
+            return self.start + (self.end - self.start) * alpha
+        index = min(math.floor(alpha * self.count), self.count - 1)
+        if index == self.count - 1:
+            return self.end
+        # Computed from the index so that e.g. steps of 0.001 do not accumulate rounding errors
+        return self.start + index * self.step
+
+    def interpolate_mobject(self, alpha):
+        value = self.value(self.rate_func(alpha))
+        self.tracker.set_value(value)
+        if value != self.current:
+            self.current = value
+            self.update_function(value)
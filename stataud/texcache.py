@@ -0,0 +1,204 @@
+import argparse
+import ast
+import contextlib
+import fcntl
+import hashlib
+import os
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from stataud import CACHE_DIR
+from stataud.tts.prefetch import call_name, literal
+
+# Compiled LaTeX and rendered Text of all scenes in both videos
+TEX_DIR = os.path.join(CACHE_DIR, "tex")
+TEXT_DIR = os.path.join(CACHE_DIR, "text")
+
+# Number of lock files that LaTeX compilations are spread over
+LOCKS = 64
+
+# Keyword arguments that change the SVG file of a mobject, the others only style it afterwards
+SVG_ARGUMENTS = {
+    "Tex": ["tex_environment", "arg_separator"],
+    "MathTex": ["tex_environment", "arg_separator"],
+    "Text": ["font", "font_size", "slant", "weight", "line_spacing", "disable_ligatures", "color"],
+    "MarkupText": ["font", "font_size", "slant", "weight", "line_spacing", "disable_ligatures", "color"],
+}
+
+# Labels of stataud that compile their template and the digits of a glyph atlas, with the keyword
+# arguments that change what they compile
+GLYPH_ARGUMENTS = {
+    "TexCounter": ["font_size", "tex_class", "tex_environment", "arg_separator"],
+    "SlotFormula": ["values", "font_size", "tex_environment", "arg_separator"],
+}
+
+@contextlib.contextmanager
+def locked(path):
+    with open(path, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+def tex_lock(expression, environment, tex_template):
+    # Two renders compiling the same expression would write the same .tex, .dvi and .svg files
+    body = getattr(tex_template, "body", "")
+    digest = hashlib.sha256((str(environment) + "\n" + body + "\n" + expression).encode()).digest()
+    return os.path.join(TEX_DIR, "locks", str(zlib.crc32(digest) % LOCKS) + ".lock")
+
+def install():
+    # Point manim at the shared folders and make writing to them safe for parallel renders
+    from manim import config
+    from manim.mobject.text import tex_mobject, text_mobject
+
+    os.makedirs(os.path.join(TEX_DIR, "locks"), exist_ok = True)
+    os.makedirs(TEXT_DIR, exist_ok = True)
+    config.tex_dir = TEX_DIR
+    config.text_dir = TEXT_DIR
+    if os.environ.get("STATAUD_BENCHMARK"):
+        # Renders started by python3 -m stataud.benchmark record where their time goes
+        from stataud.benchmark import record
+
+        record(os.environ["STATAUD_BENCHMARK"])
+    if os.environ.get("STATAUD_PROFILE"):
+        # Flamegraph profile of the play calls, voiceovers and expensive mobjects of the scene
+        from stataud.flamegraph import PROFILE_DIR, record
+
+        profile = os.environ["STATAUD_PROFILE"]
+        record(PROFILE_DIR if profile == "1" else profile)
+    if os.environ.get("STATAUD_CHECKPOINT"):
+        # Checkpoints at the voiceover blocks, written and resumed from by the montage renders
+        from stataud.checkpoint import record
+
+        record(os.environ["STATAUD_CHECKPOINT"])
+    if getattr(tex_mobject.tex_to_svg_file, "shared", False):
+        return
+
+    tex_to_svg_file = tex_mobject.tex_to_svg_file
+    def shared_tex_to_svg_file(expression, environment = None, tex_template = None):
+        with locked(tex_lock(expression, environment, tex_template or config.tex_template)):
+            return tex_to_svg_file(expression, environment = environment, tex_template = tex_template)
+    shared_tex_to_svg_file.shared = True
+    tex_mobject.tex_to_svg_file = shared_tex_to_svg_file
+
+    for cls in [text_mobject.Text, text_mobject.MarkupText]:
+        text2svg = cls._text2svg
+        def shared_text2svg(self, *args, text2svg = text2svg, **kwargs):
+            with locked(os.path.join(TEXT_DIR, ".lock")):
+                return text2svg(self, *args, **kwargs)
+        cls._text2svg = shared_text2svg
+
+def keyword_value(node):
+    # Literal keyword value such as 40 or {"theta": "\\theta"}, or the name of a manim constant
+    # such as BLUE or of a LaTeX class such as MathTex
+    if isinstance(node, ast.Name) and (node.id.isupper() or node.id in SVG_ARGUMENTS):
+        return ("name", node.id)
+    try:
+        return ("constant", ast.literal_eval(node))
+    except (ValueError, TypeError, SyntaxError):
+        return None
+
+def keyword_arguments(node, names):
+    kwargs = {}
+    for keyword in node.keywords:
+        if keyword.arg in names and keyword_value(keyword.value) is not None:
+            kwargs[keyword.arg] = keyword_value(keyword.value)
+    return kwargs
+
+def glyph_mobjects(node):
+    # The glyph atlases of a TexCounter or SlotFormula call, and its template when that is
+    # compiled the same way in every render: a counter with literal values, or a formula with
+    # the symbols it shows before any numbers are put in
+    cls = call_name(node)
+    kwargs = keyword_arguments(node, GLYPH_ARGUMENTS[cls])
+    font_size = {"font_size": kwargs["font_size"]} if "font_size" in kwargs else {}
+    if cls == "TexCounter":
+        atlases = [dict(font_size, tex_class = kwargs.get("tex_class", ("name", "Tex")))]
+    else:
+        # Digits on the baseline and in superscripts are typeset at different sizes
+        atlases = [dict(font_size, tex_class = ("name", "MathTex"), wrapper = ("constant", wrapper)) for wrapper in ["%s", "{}^{%s}"]]
+    mobjects = [("GlyphAtlas", (), tuple(sorted(atlas.items()))) for atlas in atlases]
+    template = literal(node.args[0]) if node.args else None
+    if template is None:
+        return mobjects
+    if cls == "TexCounter":
+        values = keyword_value(node.args[1]) if len(node.args) > 1 else None
+        if values is None or values[0] != "constant":
+            return mobjects
+        return mobjects + [(cls, (template, values[1]), tuple(sorted(kwargs.items())))]
+    return mobjects + [(cls, (template,), tuple(sorted(kwargs.items())))]
+
+def literal_mobjects(path):
+    # Tex, MathTex and Text calls of a scene file whose strings are written out literally, and the
+    # LaTeX that its TexCounter and SlotFormula labels compile
+    with open(path, "rb") as file:
+        tree = ast.parse(file.read(), filename = path)
+    mobjects = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        cls = call_name(node)
+        if cls in GLYPH_ARGUMENTS:
+            mobjects.extend(glyph_mobjects(node))
+        if cls not in SVG_ARGUMENTS:
+            continue
+        strings = [literal(argument) for argument in node.args]
+        if not strings or None in strings:
+            continue
+        kwargs = keyword_arguments(node, SVG_ARGUMENTS[cls])
+        mobjects.append((cls, tuple(strings), tuple(sorted(kwargs.items()))))
+    return mobjects
+
+def compile_mobject(mobject):
+    import manim
+
+    cls, strings, kwargs = mobject
+    kwargs = {key: getattr(manim, value) if kind == "name" else value for key, (kind, value) in kwargs}
+    if cls == "GlyphAtlas":
+        from stataud.glyphs import get_atlas
+
+        get_atlas(**kwargs)
+    elif cls == "TexCounter":
+        from stataud.glyphs import TexCounter
+
+        TexCounter(*strings, **kwargs)
+    elif cls == "SlotFormula":
+        from stataud.formula import SlotFormula
+
+        SlotFormula(*strings, **kwargs).build(color = False)
+    else:
+        getattr(manim, cls)(*strings, **kwargs)
+
+def warm_up(paths, jobs = 1):
+    # Compile the literal strings of the scenes in a process pool, so that renders find them cached
+    mobjects = []
+    for path in paths:
+        mobjects.extend(mobject for mobject in literal_mobjects(path) if mobject not in mobjects)
+    failed = 0
+    with ProcessPoolExecutor(max_workers = jobs, initializer = install) as executor:
+        futures = {executor.submit(compile_mobject, mobject): mobject for mobject in mobjects}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as error:
+                # The render of the scene reports the same error with more context
+                failed += 1
+                print("Could not compile " + futures[future][0] + "(" + ", ".join(repr(string) for string in futures[future][1]) + "): " + str(error))
+    print("Compiled " + str(len(mobjects) - failed) + " LaTeX and Text string(s) ahead of rendering")
+    return len(mobjects) - failed
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Compile the literal LaTeX and Text strings of the scenes into the shared cache before rendering them.")
+    parser.add_argument("directories", nargs = "+", metavar = "directory", help = "video folder containing the scene files")
+    parser.add_argument("-j", "--jobs", type = int, default = os.cpu_count() or 1, help = "number of strings compiled at the same time")
+    args = parser.parse_args(argv)
+    from stataud.montage import find_scenes
+
+    paths = []
+    for directory in args.directories:
+        directory = os.path.abspath(directory)
+        paths.extend(os.path.join(directory, scene.filename) for scene in find_scenes(directory))
+    warm_up(paths, max(args.jobs, 1))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
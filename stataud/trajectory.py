@@ -0,0 +1,70 @@
+import numpy as np
+from scipy import special
+
+from stataud.curves import beta_pdf
+
+# x grid of the density arrays, the same grid that beta_curve plots on
+GRID = np.linspace(0, 1, 1001)
+
+def beta_quantile(p, a, b, start = None, tolerance = 1e-12, max_iterations = 100):
+    # Newton's method on the regularized incomplete beta function, kept inside a shrinking
+    # bracket; a good start (such as the bound of the previous step) converges in a few steps
+    lower, upper = 0.0, 1.0
+    x = a / (a + b) if start is None else min(max(start, tolerance), 1 - tolerance)
+    for _ in range(max_iterations):
+        error = special.betainc(a, b, x) - p
+        if abs(error) < tolerance or upper - lower < tolerance:
+            return x
+        if error > 0:
+            upper = x
+        else:
+            lower = x
+        slope = beta_pdf(x, a, b)
+        candidate = x - error / slope if slope > 0 else -1
+        x = candidate if lower < candidate < upper else (lower + upper) / 2
+    return special.betaincinv(a, b, p)
+
+class Step:
+    def __init__(self, trajectory, i):
+        self.n = trajectory.n[i]
+        self.k = trajectory.k[i]
+        self.alpha = trajectory.alpha[i]
+        self.beta = trajectory.beta[i]
+        self.x = trajectory.x
+        self.density = trajectory.density[i]
+        self.upper_bound = trajectory.upper_bound[i]
+        self.area = (0, self.upper_bound)
+
+class PosteriorTrajectory:
+    # Posterior of a beta prior after each of a sequence of (n, k) observations, computed up front
+    def __init__(self, prior_a, prior_b, observations, confidence = 0.95, x = GRID):
+        observations = np.asarray(observations, dtype = int).reshape(-1, 2)
+        self.n = observations[:, 0]
+        self.k = observations[:, 1]
+        self.alpha = prior_a + self.k
+        self.beta = prior_b + self.n - self.k
+        self.x = np.asarray(x, dtype = float)
+
+        # All densities in one broadcasted evaluation, one row per step
+        alpha, beta = self.alpha[:, None], self.beta[:, None]
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            log_density = special.xlogy(alpha - 1, self.x) + special.xlog1py(beta - 1, -self.x) - special.betaln(alpha, beta)
+        self.density = np.exp(log_density)
+
+        # Upper bounds, each quantile starting from the bound of the previous step
+        self.upper_bound = np.empty(len(observations))
+        bound = None
+        for i in range(len(observations)):
+            bound = beta_quantile(confidence, self.alpha[i], self.beta[i], start = bound)
+            self.upper_bound[i] = bound
+
+        self.index = {(n, k): i for i, (n, k) in enumerate(zip(self.n, self.k))}
+
+    def __len__(self):
+        return len(self.n)
+
+    def __getitem__(self, i):
+        return Step(self, i)
+
+    def step(self, n, k):
+        return self[self.index[(n, k)]]
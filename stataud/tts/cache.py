@@ -0,0 +1,152 @@
+import argparse
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+from stataud import CACHE_DIR
+
+# Size cap of the shared voiceover cache, can be changed with STATAUD_VOICEOVER_CACHE_MB
+MAX_SIZE_MB = float(os.environ.get("STATAUD_VOICEOVER_CACHE_MB", 2048))
+
+class AudioCache:
+    # Voiceover audio and word timings shared by both videos, with least recently used eviction
+    def __init__(self, directory = None, max_size_mb = None):
+        self.directory = directory or os.path.join(CACHE_DIR, "voiceovers")
+        self.max_bytes = int((MAX_SIZE_MB if max_size_mb is None else max_size_mb) * 1024 * 1024)
+        os.makedirs(self.directory, exist_ok = True)
+
+    def key(self, text, voice, transcription_model = None):
+        # Text, model, speaker and language decide the audio, the transcription model decides the timings
+        description = {"text": " ".join(text.split()), "voice": voice, "transcription_model": transcription_model}
+        return hashlib.sha256(json.dumps(description, sort_keys = True).encode()).hexdigest()
+
+    def audio_name(self, key):
+        return key + ".mp3"
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    @contextlib.contextmanager
+    def locked(self):
+        # Serialises index-wide operations between render processes
+        with open(os.path.join(self.directory, ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def contains(self, key):
+        return os.path.exists(self.entry_path(key)) and os.path.exists(os.path.join(self.directory, self.audio_name(key)))
+
+    def get(self, key):
+        try:
+            with open(self.entry_path(key)) as file:
+                entry = json.load(file)
+            # Mark the entry as recently used
+            os.utime(self.entry_path(key))
+            os.utime(os.path.join(self.directory, entry["original_audio"]))
+        except (OSError, ValueError):
+            self.record("misses")
+            return None
+        self.record("hits")
+        return entry
+
+    def write_atomic(self, path, data):
+        descriptor, temporary = tempfile.mkstemp(dir = self.directory, suffix = ".tmp")
+        try:
+            with os.fdopen(descriptor, "w") as file:
+                file.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+    def put(self, key, audio, entry):
+        # Move the synthesized audio in place first; the entry file marks the cache entry as complete
+        os.replace(audio, os.path.join(self.directory, self.audio_name(key)))
+        entry = dict(entry, original_audio = self.audio_name(key))
+        self.write_atomic(self.entry_path(key), json.dumps(entry))
+        self.evict()
+        return entry
+
+    def entries(self):
+        entries = []
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".json") or filename == "stats.json":
+                continue
+            key = filename[:-len(".json")]
+            paths = [self.entry_path(key), os.path.join(self.directory, self.audio_name(key))]
+            try:
+                size = sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+                used = os.path.getmtime(paths[0])
+            except OSError:
+                continue
+            entries.append((used, size, key))
+        return entries
+
+    def evict(self, max_bytes = None):
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        with self.locked():
+            entries = sorted(self.entries())
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            # Drop the least recently used entries until the cache fits again
+            for _, size, key in entries:
+                if total <= max_bytes:
+                    break
+                for path in [self.entry_path(key), os.path.join(self.directory, self.audio_name(key))]:
+                    if os.path.exists(path):
+                        os.remove(path)
+                total -= size
+                removed += 1
+        return removed
+
+    def record(self, counter):
+        with self.locked():
+            stats = self.read_stats()
+            stats[counter] = stats.get(counter, 0) + 1
+            self.write_atomic(os.path.join(self.directory, "stats.json"), json.dumps(stats))
+
+    def read_stats(self):
+        try:
+            with open(os.path.join(self.directory, "stats.json")) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def stats(self):
+        stats = self.read_stats()
+        hits, misses = stats.get("hits", 0), stats.get("misses", 0)
+        entries = self.entries()
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else None,
+            "entries": len(entries),
+            "size_mb": sum(size for _, size, _ in entries) / 1024 / 1024,
+            "max_size_mb": self.max_bytes / 1024 / 1024,
+        }
+
+    def clear(self):
+        self.evict(0)
+        with self.locked():
+            self.write_atomic(os.path.join(self.directory, "stats.json"), json.dumps({}))
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Inspect or trim the shared voiceover cache.")
+    parser.add_argument("--max-size", type = float, metavar = "MB", help = "evict least recently used voiceovers until the cache fits in this size")
+    parser.add_argument("--clear", action = "store_true", help = "remove all cached voiceovers and reset the statistics")
+    args = parser.parse_args(argv)
+    cache = AudioCache()
+    if args.clear:
+        cache.clear()
+    elif args.max_size is not None:
+        print("Evicted " + str(cache.evict(int(args.max_size * 1024 * 1024))) + " voiceover(s)")
+    print(json.dumps(cache.stats(), indent = 2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from stataud import CACHE_DIR, ROOT
+
+# Unix socket of the speech synthesis daemon, shared by all renders of this user
+SOCKET_PATH = os.environ.get("STATAUD_TTS_SOCKET", os.path.join(tempfile.gettempdir(), "stataud-tts-" + str(os.getuid()) + ".sock"))
+
+class DaemonError(Exception):
+    pass
+
+def send(message, socket_path = SOCKET_PATH):
+    # One JSON request per connection, answered by one JSON line
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall(json.dumps(message).encode() + b"\n")
+        with connection.makefile("rb") as stream:
+            line = stream.readline()
+    if not line:
+        raise DaemonError("The speech daemon closed the connection without a reply")
+    reply = json.loads(line)
+    if not reply.get("ok"):
+        raise DaemonError(reply.get("error", "Unknown error in the speech daemon"))
+    return reply
+
+def is_running(socket_path = SOCKET_PATH):
+    try:
+        send({"op": "ping"}, socket_path)
+    except (OSError, DaemonError, ValueError):
+        return False
+    return True
+
+def resize(socket_path = SOCKET_PATH, workers = 1):
+    # A daemon that is already running may have been started with fewer workers, for example by
+    # a render without prefetching. Ask it for more, it never gives up the workers it has
+    running = send({"op": "ping"}, socket_path).get("workers", 1)
+    if running >= workers:
+        return
+    try:
+        send({"op": "resize", "workers": workers}, socket_path)
+    except DaemonError:
+        print("The speech daemon runs " + str(running) + " worker(s) instead of " + str(workers) + ", stop it to start one with more", file = sys.stderr)
+
+def ensure_daemon(socket_path = SOCKET_PATH, workers = 1, timeout = 60):
+    # Start the daemon in the background unless one is already listening, with at least this
+    # many workers
+    if is_running(socket_path):
+        if workers > 1:
+            resize(socket_path, workers)
+        return
+    os.makedirs(os.path.join(CACHE_DIR, "logs"), exist_ok = True)
+    with open(os.path.join(CACHE_DIR, "logs", "tts-daemon.log"), "a") as log:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "stataud.tts.daemon", "--socket", socket_path, "--workers", str(workers)],
+            cwd = ROOT,
+            stdin = subprocess.DEVNULL,
+            stdout = log,
+            stderr = subprocess.STDOUT,
+            start_new_session = True,
+        )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if is_running(socket_path):
+            # Another daemon may have won the start-up race with fewer workers
+            if workers > 1:
+                resize(socket_path, workers)
+            return
+        # A daemon that exits right away lost the start-up race against another one
+        if process.poll() is not None and not is_running(socket_path):
+            time.sleep(0.5)
+            if not is_running(socket_path):
+                raise DaemonError("The speech daemon exited with code " + str(process.returncode) + ", see " + log.name)
+        time.sleep(0.1)
+    raise DaemonError("The speech daemon did not start within " + str(timeout) + " seconds")
+
+def synthesize(request, socket_path = SOCKET_PATH):
+    ensure_daemon(socket_path)
+    return send(dict(request, op = "synthesize"), socket_path)
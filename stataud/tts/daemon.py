@@ -0,0 +1,165 @@
+import argparse
+import fcntl
+import json
+import os
+import queue
+import signal
+import socketserver
+import sys
+import threading
+import time
+import traceback
+
+from stataud import CACHE_DIR
+from stataud.tts.client import SOCKET_PATH, is_running
+
+class Synthesizer:
+    # Keeps one speech service (and its Whisper model) loaded per voice
+    def __init__(self):
+        self.services = {}
+
+    def service(self, voice, transcription_model, transcription_kwargs):
+        key = json.dumps([voice, transcription_model, transcription_kwargs], sort_keys = True)
+        if key not in self.services:
+            from manim_voiceover.services.coqui import CoquiService
+
+            print("Loading " + voice["model_name"] + " (transcription model: " + str(transcription_model) + ")", flush = True)
+            self.services[key] = CoquiService(
+                cache_dir = os.path.join(CACHE_DIR, "tts"),
+                transcription_model = transcription_model,
+                transcription_kwargs = transcription_kwargs,
+                **voice
+            )
+        return self.services[key]
+
+    def synthesize(self, request):
+        from manim_voiceover.services.base import timestamps_to_word_boundaries
+
+        service = self.service(request["voice"], request.get("transcription_model"), request.get("transcription_kwargs", {}))
+        cache_dir = request["cache_dir"]
+        results = []
+        # A batch is synthesized in one go by the same loaded models
+        for item in request["items"]:
+            started = time.perf_counter()
+            result = service.generate_from_text(item["text"], cache_dir = cache_dir, path = item.get("path"))
+            synthesized = time.perf_counter()
+            reply = {"original_audio": result["original_audio"]}
+            if "word_boundaries" in result:
+                reply["word_boundaries"] = result["word_boundaries"]
+                reply["transcribed_text"] = result.get("transcribed_text")
+            elif service._whisper_model is not None:
+                # Word timings for the bookmarks, as VoiceoverScene would compute them itself
+                audio = os.path.join(cache_dir, result["original_audio"])
+                transcription = service._whisper_model.transcribe(audio, **service.transcription_kwargs)
+                reply["word_boundaries"] = timestamps_to_word_boundaries(transcription.segments_to_dicts())
+                reply["transcribed_text"] = transcription.text
+            reply["timings"] = {"synthesis": synthesized - started, "alignment": time.perf_counter() - synthesized}
+            results.append(reply)
+        return {"results": results}
+
+class Daemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, idle_timeout):
+        self.jobs = queue.Queue()
+        self.workers = 0
+        self.busy = 0
+        self.busy_lock = threading.Lock()
+        self.idle_timeout = idle_timeout
+        self.last_request = time.monotonic()
+        socketserver.UnixStreamServer.__init__(self, socket_path, Handler)
+
+    def submit(self, request):
+        # Requests from concurrent renders wait in line for the loaded models
+        job = {"request": request, "done": threading.Event()}
+        self.jobs.put(job)
+        job["done"].wait()
+        return job["reply"]
+
+    def grow(self, workers):
+        # Start workers until there are this many, the models of running workers stay loaded
+        with self.busy_lock:
+            added = max(workers - self.workers, 0)
+            self.workers += added
+        for _ in range(added):
+            threading.Thread(target = self.work, daemon = True).start()
+        if added:
+            print("Running " + str(self.workers) + " worker(s)", flush = True)
+        return self.workers
+
+    def work(self):
+        # Every worker loads its own copy of the models
+        synthesizer = Synthesizer()
+        while True:
+            job = self.jobs.get()
+            with self.busy_lock:
+                self.busy += 1
+            try:
+                reply = dict(synthesizer.synthesize(job["request"]), ok = True)
+            except Exception:
+                reply = {"ok": False, "error": traceback.format_exc()}
+            with self.busy_lock:
+                self.busy -= 1
+            self.last_request = time.monotonic()
+            job["reply"] = reply
+            job["done"].set()
+
+    def watch(self):
+        # Shut down after a period without requests so the models do not stay in memory forever
+        while True:
+            time.sleep(5)
+            if self.jobs.empty() and not self.busy and time.monotonic() - self.last_request > self.idle_timeout:
+                print("Idle for " + str(self.idle_timeout) + " seconds, shutting down", flush = True)
+                self.shutdown()
+                return
+
+class Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        self.server.last_request = time.monotonic()
+        request = json.loads(line)
+        if request.get("op") == "ping":
+            reply = {"ok": True, "pid": os.getpid(), "workers": self.server.workers}
+        elif request.get("op") == "resize":
+            reply = {"ok": True, "workers": self.server.grow(int(request["workers"]))}
+        elif request.get("op") == "synthesize":
+            reply = self.server.submit(request)
+        else:
+            reply = {"ok": False, "error": "Unknown operation: " + str(request.get("op"))}
+        self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+def serve(socket_path = SOCKET_PATH, idle_timeout = 900, workers = 1):
+    # Only one daemon may bind the socket, concurrent starts are serialised with a lock file
+    with open(socket_path + ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if is_running(socket_path):
+            print("A speech daemon is already listening on " + socket_path, flush = True)
+            return 0
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = Daemon(socket_path, idle_timeout)
+    print("Listening on " + socket_path, flush = True)
+    # Remove the socket on a normal kill as well
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    server.grow(workers)
+    threading.Thread(target = server.watch, daemon = True).start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+    return 0
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Keep the text-to-speech and transcription models loaded for all scene renders.")
+    parser.add_argument("--socket", default = SOCKET_PATH, help = "path of the Unix socket to listen on")
+    parser.add_argument("--idle-timeout", type = float, default = 900, help = "seconds without requests before the daemon exits")
+    parser.add_argument("--workers", type = int, default = 1, help = "number of requests synthesized at the same time, each with its own copy of the models")
+    args = parser.parse_args(argv)
+    return serve(args.socket, args.idle_timeout, max(args.workers, 1))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+import argparse
+import ast
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from stataud.tts import client
+
+def literal(node):
+    # Value of a string expression that can be known without running the scene
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left, right = literal(node.left), literal(node.right)
+        if left is not None and right is not None:
+            return left + right
+    if isinstance(node, ast.JoinedStr) and all(isinstance(value, ast.Constant) for value in node.values):
+        return "".join(value.value for value in node.values)
+    return None
+
+def call_name(node):
+    if isinstance(node.func, ast.Attribute):
+        return node.func.attr
+    if isinstance(node.func, ast.Name):
+        return node.func.id
+    return None
+
+def scripted(node):
+    # Key of a narration["key"] text, which the scene takes from stataud/scripts.py
+    if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name) and node.value.id == "narration":
+        if isinstance(node.slice, ast.Constant) and isinstance(node.slice.value, str):
+            return node.slice.value
+    return None
+
+def voiceovers(path, params_files = (None,)):
+    # The speech service arguments and every self.voiceover(...) text of a scene file that can be
+    # known without running it: literal texts, and scripted texts for each of the parameter files
+    # the scene is rendered with (None for the defaults with STATAUD_PARAMS, as in the render)
+    with open(path, "rb") as file:
+        tree = ast.parse(file.read(), filename = path)
+    service = {}
+    texts = []
+    dynamic = []
+    keys = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        if call_name(node) == "DaemonService":
+            service = {keyword.arg: keyword.value.value for keyword in node.keywords if isinstance(keyword.value, ast.Constant)}
+        elif call_name(node) == "voiceover":
+            arguments = node.args[:1] + [keyword.value for keyword in node.keywords if keyword.arg == "text"]
+            if not arguments:
+                continue
+            text = literal(arguments[0])
+            key = scripted(arguments[0])
+            if text is not None:
+                # VoiceoverScene collapses whitespace before synthesizing
+                texts.append(" ".join(text.split()))
+            elif key is not None:
+                keys.append((node.lineno, key))
+            else:
+                dynamic.append(node.lineno)
+    if keys:
+        from stataud.params import load
+        from stataud.scripts import script
+
+        # Scene files are named [scene number]_SceneName.py
+        scene = os.path.splitext(os.path.basename(path))[0].split("_", 1)[-1]
+        for params_file in params_files:
+            narration = script(scene, load(scene, params_file))
+            for line, key in keys:
+                if key in narration:
+                    texts.append(" ".join(narration[key].split()))
+                elif line not in dynamic:
+                    dynamic.append(line)
+    return service, texts, dynamic
+
+def batches(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def prefetch(directory, filenames, jobs = 1, batch_size = 4, params_files = None):
+    # Synthesize all voiceovers of the scenes into the shared cache that DaemonService reads during the render.
+    # params_files maps a file name to the parameter files its scene is rendered with, by default only
+    # the defaults with STATAUD_PARAMS laid over them
+    from stataud.tts.service import DaemonService
+
+    groups = {}
+    for filename in filenames:
+        files = (params_files or {}).get(filename, (None,))
+        arguments, texts, dynamic = voiceovers(os.path.join(directory, filename), files)
+        for line in dynamic:
+            print(filename + ":" + str(line) + ": voiceover text is computed while rendering and cannot be prefetched")
+        group = groups.setdefault(json.dumps(arguments, sort_keys = True), [])
+        group.extend(text for text in texts if text not in group)
+
+    client.ensure_daemon(workers = jobs)
+    synthesized = 0
+    with ThreadPoolExecutor(max_workers = jobs) as executor:
+        futures = []
+        for arguments, texts in groups.items():
+            service = DaemonService(**json.loads(arguments))
+            missing = [text for text in texts if not service.is_cached(text)]
+            for batch in batches(missing, batch_size):
+                futures.append(executor.submit(service.generate_batch, batch))
+        for future in as_completed(futures):
+            synthesized += len(future.result())
+    print("Synthesized " + str(synthesized) + " voiceover(s) ahead of rendering")
+    return synthesized
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Synthesize the voiceovers of all scenes in a video folder before rendering them.")
+    parser.add_argument("directory", help = "video folder containing the scene files")
+    parser.add_argument("-j", "--jobs", type = int, default = 1, help = "number of batches synthesized at the same time")
+    parser.add_argument("--batch-size", type = int, default = 4, help = "number of voiceovers sent to the speech daemon per request")
+    args = parser.parse_args(argv)
+    from stataud.montage import find_scenes
+
+    directory = os.path.abspath(args.directory)
+    prefetch(directory, [scene.filename for scene in find_scenes(directory)], max(args.jobs, 1), max(args.batch_size, 1))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
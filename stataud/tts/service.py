@@ -0,0 +1,69 @@
+import os
+import uuid
+
+from manim_voiceover.services.base import SpeechService
+
+from stataud.tts import client
+from stataud.tts.cache import AudioCache
+
+# Arguments that select the voice and are passed on to CoquiService in the daemon
+VOICE_ARGUMENTS = ["config_path", "speaker_idx", "speaker_wav", "language"]
+
+class DaemonService(SpeechService):
+    # Drop-in replacement for CoquiService that synthesizes through the shared speech daemon
+    def __init__(self, model_name = "tts_models/multilingual/multi-dataset/xtts_v2", transcription_model = None, transcription_kwargs = {}, socket_path = client.SOCKET_PATH, cache_dir = None, max_cache_size_mb = None, **kwargs):
+        self.voice = {"model_name": model_name}
+        for argument in VOICE_ARGUMENTS:
+            if argument in kwargs:
+                self.voice[argument] = kwargs.pop(argument)
+        if kwargs.get("global_speed", 1) != 1:
+            raise ValueError("DaemonService does not support global_speed")
+        self.daemon_transcription_model = transcription_model
+        self.daemon_transcription_kwargs = transcription_kwargs
+        self.socket_path = socket_path
+        # Audio of both videos lives in one shared cache instead of media/voiceovers
+        self.audio_cache = AudioCache(cache_dir, max_cache_size_mb)
+        # Transcription runs in the daemon, so no Whisper model is loaded in the render process
+        SpeechService.__init__(self, cache_dir = self.audio_cache.directory, **kwargs)
+
+    def key(self, text):
+        return self.audio_cache.key(text, self.voice, self.daemon_transcription_model)
+
+    def is_cached(self, text):
+        return self.audio_cache.contains(self.key(text))
+
+    def generate_batch(self, texts):
+        # Synthesize several texts in a single request, skipping the ones that are already cached
+        results = [self.audio_cache.get(self.key(text)) for text in texts]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+
+        paths = ["tmp-" + uuid.uuid4().hex + ".mp3" for _ in missing]
+        reply = client.synthesize({
+            "voice": self.voice,
+            "transcription_model": self.daemon_transcription_model,
+            "transcription_kwargs": self.daemon_transcription_kwargs,
+            "cache_dir": os.path.abspath(self.audio_cache.directory),
+            "items": [{"text": texts[i], "path": path} for i, path in zip(missing, paths)],
+        }, self.socket_path)
+
+        for i, synthesized in zip(missing, reply["results"]):
+            entry = {"input_text": texts[i]}
+            if "word_boundaries" in synthesized:
+                entry["word_boundaries"] = synthesized["word_boundaries"]
+                entry["transcribed_text"] = synthesized["transcribed_text"]
+            audio = os.path.join(self.audio_cache.directory, synthesized["original_audio"])
+            results[i] = self.audio_cache.put(self.key(texts[i]), audio, entry)
+        return results
+
+    def generate_from_text(self, text, cache_dir = None, path = None, **kwargs):
+        return self.generate_batch([text])[0]
+
+    def _wrap_generate_from_text(self, text, path = None, **kwargs):
+        # As in SpeechService, but without the per-folder cache.json, which is not safe for parallel renders
+        text = " ".join(text.split())
+        dict_ = self.generate_from_text(text, path = path, **kwargs)
+        dict_["final_audio"] = dict_["original_audio"]
+        self.audio_callback(dict_["original_audio"], dict_, **kwargs)
+        return dict_
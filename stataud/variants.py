@@ -0,0 +1,131 @@
+import argparse
+import itertools
+import os
+import shutil
+import sys
+
+from stataud import ROOT, forkserver
+from stataud.cache import SceneCache
+from stataud.montage import QUALITIES, Renderer, RenderError, SceneFile, find_scenes, report
+from stataud.params import dump, load_all, parameter_hash, read
+from stataud.tts import client
+
+# Video folders whose scenes can be rendered as variants
+VIDEO_DIRS = ["BayesianInferenceAuditSampling", "FrequentistPlanningAuditSampling"]
+
+class Variant(SceneFile):
+    # A scene rendered with its own parameters. Each variant has its own media folder, so that
+    # variants of the same scene file can be rendered at the same time
+    def __init__(self, scene, params, output_dir):
+        super().__init__(scene.directory, scene.filename)
+        self.params = params
+        self.label = self.name + "-" + parameter_hash(self.name, params)
+        self.work_dir = os.path.join(output_dir, "work", self.label)
+        self.params_file = os.path.join(self.work_dir, "params.toml")
+        self.video = os.path.join(output_dir, self.label + ".mp4")
+
+    def media_dir(self):
+        return os.path.join(self.work_dir, "media")
+
+    def log(self):
+        return os.path.join(self.work_dir, "render.log")
+
+    def write_params(self):
+        os.makedirs(self.work_dir, exist_ok = True)
+        dump({self.name: self.params}, self.params_file)
+
+class VariantRenderer(Renderer):
+    def command(self, scene):
+        return super().command(scene) + ["--media_dir", scene.media_dir()]
+
+    def environment(self, scene):
+        return dict(os.environ, STATAUD_PARAMS = scene.params_file)
+
+    def cache_key(self, scene):
+        return self.cache.key(os.path.join(scene.directory, scene.filename), self.quality, scene.params_file)
+
+def scene_files():
+    # Scene files of both videos by scene class name
+    return {scene.name: scene for directory in VIDEO_DIRS for scene in find_scenes(os.path.join(ROOT, directory))}
+
+def expand(grid):
+    # {scene: {name: value or list of values}} -> (scene, parameters) for every combination of the
+    # values. A parameter whose value is itself a list, such as priors, is given as a list of lists
+    defaults = load_all(path = None)
+    combinations = []
+    for scene, axes in grid.items():
+        if scene not in defaults:
+            raise RenderError("No scene " + repr(scene) + " has parameters, choose from " + ", ".join(sorted(defaults)))
+        unknown = sorted(set(axes) - set(defaults[scene]))
+        if unknown:
+            raise RenderError("Unknown parameter(s) of " + scene + ": " + ", ".join(unknown))
+        names = list(axes)
+        values = [value if isinstance(value, list) else [value] for value in axes.values()]
+        for combination in itertools.product(*values):
+            combinations.append((scene, dict(defaults[scene], **dict(zip(names, combination)))))
+    return combinations
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description = "Render every combination of the scene parameters in a grid file, named by the hash of their parameters.")
+    parser.add_argument("grid", help = "TOML file with a table per scene, e.g. [Binomial] theta = [0.02, 0.03]")
+    parser.add_argument("-j", "--jobs", type = int, default = os.cpu_count() or 1, help = "number of variants rendered at the same time")
+    parser.add_argument("-q", "--quality", choices = sorted(QUALITIES), default = "h", help = "manim render quality (default: h, 1080p60)")
+    parser.add_argument("-o", "--output-dir", default = "variants", help = "folder for the rendered variants (default: variants)")
+    parser.add_argument("--no-cache", action = "store_true", help = "render every variant, even if a cached video exists")
+    parser.add_argument("--no-prefetch", action = "store_true", help = "synthesize voiceovers while rendering instead of before")
+    parser.add_argument("--no-warmup", action = "store_true", help = "compile LaTeX and Text strings while rendering instead of before")
+    parser.add_argument("--no-forkserver", action = "store_true", help = "start a new manim process for every variant instead of forking it from the fork server")
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    return args
+
+def main(argv = None):
+    args = parse_args(argv)
+    output_dir = os.path.abspath(args.output_dir)
+    try:
+        scenes = scene_files()
+        variants = {}
+        for scene, params in expand(read(args.grid)):
+            variant = Variant(scenes[scene], params, output_dir)
+            variants.setdefault(variant.label, variant)
+        # A variant that was rendered before keeps its name, so it is reused as it is
+        missing = [variant for variant in variants.values() if not os.path.exists(variant.video)]
+        for variant in variants.values():
+            if variant not in missing:
+                report("Reusing " + os.path.relpath(variant.video))
+            else:
+                variant.write_params()
+
+        renderer = VariantRenderer(args.quality, args.jobs, None if args.no_cache else SceneCache(), fork = not args.no_forkserver)
+        pending = [variant for variant in missing if renderer.cached(variant) is None]
+        # Literal voiceovers and strings are the same in every variant of a scene file, the
+        # scripted voiceovers are synthesized for the parameters of each variant
+        files = {}
+        for variant in pending:
+            params_files = files.setdefault(variant.directory, {}).setdefault(variant.filename, [])
+            params_files.append(variant.params_file)
+        if files and not args.no_prefetch:
+            from stataud.tts.prefetch import prefetch
+
+            for directory, params_files in files.items():
+                prefetch(directory, list(params_files), args.jobs, params_files = params_files)
+        if files and not args.no_warmup:
+            from stataud.texcache import warm_up
+
+            warm_up([os.path.join(directory, filename) for directory, filenames in files.items() for filename in filenames], args.jobs)
+
+        if pending and not args.no_forkserver:
+            forkserver.ensure_server()
+        for variant, path in zip(missing, renderer.render_all(missing)):
+            shutil.copyfile(path, variant.video)
+            shutil.copyfile(variant.params_file, os.path.join(output_dir, variant.label + ".toml"))
+            shutil.rmtree(variant.work_dir)
+            report("Wrote " + os.path.relpath(variant.video))
+    except (RenderError, client.DaemonError, forkserver.ForkServerError, ValueError, OSError) as error:
+        print("Error: " + str(error), file = sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
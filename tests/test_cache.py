@@ -0,0 +1,76 @@
+import os
+import shutil
+
+from stataud import ROOT, cache
+from stataud.cache import SceneCache, local_sources
+
+def scene_tree(tmp_path):
+    (tmp_path / "helper.py").write_text("VALUE = 1\n")
+    (tmp_path / "unrelated.py").write_text("VALUE = 1\n")
+    scene = tmp_path / "01_Scene.py"
+    scene.write_text("from helper import VALUE\n")
+    return str(scene)
+
+def test_key_is_stable(tmp_path):
+    scene = scene_tree(tmp_path)
+    cache = SceneCache(str(tmp_path / "cache"))
+    assert cache.key(scene, "h") == cache.key(scene, "h")
+    assert cache.key(scene, "h") != cache.key(scene, "l")
+
+def test_key_follows_imported_helpers(tmp_path):
+    scene = scene_tree(tmp_path)
+    cache = SceneCache(str(tmp_path / "cache"))
+    key = cache.key(scene, "h")
+    (tmp_path / "unrelated.py").write_text("VALUE = 2\n")
+    assert cache.key(scene, "h") == key
+    (tmp_path / "helper.py").write_text("VALUE = 2\n")
+    assert cache.key(scene, "h") != key
+
+def test_key_includes_tts_model(tmp_path):
+    scene = scene_tree(tmp_path)
+    cache = SceneCache(str(tmp_path / "cache"))
+    key = cache.key(scene, "h")
+    (tmp_path / "helper.py").write_text("VALUE = 1\nSERVICE = dict(model_name = \"tts_models/en/vctk/vits\")\n")
+    changed = cache.key(scene, "h")
+    (tmp_path / "helper.py").write_text("VALUE = 1\nSERVICE = dict(model_name = \"tts_models/en/ljspeech/vits\")\n")
+    assert len({key, changed, cache.key(scene, "h")}) == 3
+
+def test_put_and_get(tmp_path):
+    cache = SceneCache(str(tmp_path / "cache"))
+    video = tmp_path / "Scene.mp4"
+    video.write_bytes(b"video")
+    assert cache.get("key") is None
+    stored = cache.put("key", str(video), scene = "01_Scene.py", quality = "h")
+    assert cache.get("key") == stored
+    with open(stored, "rb") as file:
+        assert file.read() == b"video"
+
+def test_key_ignores_imports_inside_functions(tmp_path):
+    (tmp_path / "tool.py").write_text("VALUE = 1\n")
+    scene = scene_tree(tmp_path)
+    with open(scene, "a") as file:
+        file.write("def render():\n    import tool\n")
+    cache = SceneCache(str(tmp_path / "cache"))
+    key = cache.key(scene, "h")
+    (tmp_path / "tool.py").write_text("VALUE = 2\n")
+    assert cache.key(scene, "h") == key
+
+def test_editing_the_tooling_keeps_scene_keys(tmp_path, monkeypatch):
+    # A copy of the package and a scene that uses most of it, so that its files can be edited
+    shutil.copytree(os.path.join(ROOT, "stataud"), str(tmp_path / "stataud"), ignore = shutil.ignore_patterns("__pycache__"))
+    (tmp_path / "video").mkdir()
+    scene = str(tmp_path / "video" / "01_Binomial.py")
+    shutil.copyfile(os.path.join(ROOT, "FrequentistPlanningAuditSampling", "01_Binomial.py"), scene)
+    monkeypatch.setattr(cache, "ROOT", str(tmp_path))
+    scenes = SceneCache(str(tmp_path / "cache"))
+    key = scenes.key(scene, "h")
+    assert str(tmp_path / "stataud" / "concat.py") not in local_sources(scene)
+
+    for module in ["concat.py", "montage.py", "benchmark.py", "checkpoint.py"]:
+        with open(str(tmp_path / "stataud" / module), "a") as file:
+            file.write("\n# Edited\n")
+    assert scenes.key(scene, "h") == key
+
+    with open(str(tmp_path / "stataud" / "formula.py"), "a") as file:
+        file.write("\n# Edited\n")
+    assert scenes.key(scene, "h") != key
@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from stataud.checkpoint import CheckpointMismatch, Checkpoints, load
+
+class Mobject:
+    def __init__(self, x):
+        self.points = np.array([[x, 0.0, 0.0]])
+
+    def get_family(self):
+        return [self]
+
+class Writer:
+    # add_sound as recorded by checkpoint.record
+    def __init__(self, renderer, checkpoints):
+        self.renderer = renderer
+        self.checkpoints = checkpoints
+        self.sounds = []
+
+    def add_sound(self, sound_file, time = None, gain = None, **kwargs):
+        self.checkpoints.sounds.append([sound_file, time, gain, kwargs])
+        self.sounds.append((sound_file, time))
+
+class Renderer:
+    def __init__(self, checkpoints):
+        self.time = 0.0
+        self.skip_animations = False
+        self.file_writer = Writer(self, checkpoints)
+
+class Scene:
+    def __init__(self, checkpoints):
+        self.renderer = Renderer(checkpoints)
+        self.mobjects = []
+
+def render(path, crash_at = None, skip = 0, shift = 0):
+    # Three voiceover blocks of three plays, rendered as manim -n [skip] would: skipped plays
+    # move the time on by their run time and play no sound, rendered ones by whole frames
+    checkpoints = Checkpoints(path)
+    scene = Scene(checkpoints)
+    play = 0
+    for block in range(3):
+        checkpoints.voiceover(scene)
+        if play >= skip:
+            scene.renderer.file_writer.add_sound("block" + str(block) + ".wav", scene.renderer.time)
+        for _ in range(3):
+            if play == crash_at:
+                return None
+            if play < skip:
+                scene.renderer.time += 1.0
+            checkpoints.add_partial_movie_file(scene.renderer.file_writer, None, lambda writer, hash_animation: None)
+            if play >= skip:
+                scene.renderer.time += 1.0 + 1 / 15
+            play += 1
+        scene.mobjects.append(Mobject(block + shift))
+    return scene
+
+def test_resumed_render_matches_a_full_render(tmp_path):
+    reference = render(str(tmp_path / "reference"))
+    path = str(tmp_path / "checkpoint")
+    assert render(path, crash_at = 7) is None
+    checkpoint = load(path)
+    assert (checkpoint["block"], checkpoint["plays"]) == (2, 6)
+
+    resumed = render(path, skip = checkpoint["plays"])
+    assert resumed.renderer.file_writer.sounds == reference.renderer.file_writer.sounds
+    assert resumed.renderer.time == pytest.approx(reference.renderer.time)
+
+def test_changed_scene_starts_over(tmp_path):
+    path = str(tmp_path / "checkpoint")
+    render(path, crash_at = 4)
+    with pytest.raises(CheckpointMismatch):
+        render(path, skip = load(path)["plays"], shift = 1)
+    assert not os.path.exists(path)
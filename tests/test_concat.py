@@ -0,0 +1,124 @@
+import json
+import os
+
+import pytest
+
+from stataud import concat
+
+def read(path):
+    with open(path) as file:
+        return file.read()
+
+def write(path, content):
+    with open(path, "w") as file:
+        file.write(content)
+
+class Tools:
+    # ffprobe and ffmpeg for scene files whose first line is the width of their video
+    def __init__(self):
+        self.calls = []
+        # Files whose pixel format ffprobe does not report
+        self.unknown = set()
+
+    def run(self, command):
+        if command[0] == "ffprobe":
+            self.calls.append(("ffprobe", command[-1]))
+            width = int(read(command[-1]).split("\n", 1)[0])
+            video = {"codec_type": "video", "codec_name": "h264", "width": width, "height": width * 9 // 16, "pix_fmt": "yuv420p", "r_frame_rate": "30/1", "time_base": "1/15360"}
+            if command[-1] in self.unknown:
+                del video["pix_fmt"]
+            return json.dumps({"streams": [video], "format": {"duration": "2.0"}})
+        source = command[command.index("-i") + 1]
+        if "concat" in command:
+            self.calls.append(("join", command[-1]))
+            files = [line[len("file '"):-1] for line in read(source).splitlines()]
+            write(command[-1], "".join(read(file) for file in files))
+        else:
+            assert None not in command
+            self.calls.append(("transcode", source))
+            width = command[command.index("-vf") + 1].split("=")[1].split(":")[0]
+            write(command[-1], width + "\n" + read(source).split("\n", 1)[1])
+        return ""
+
+    def count(self, kind):
+        return len([call for call in self.calls if call[0] == kind])
+
+@pytest.fixture
+def tools(monkeypatch):
+    tools = Tools()
+    monkeypatch.setattr(concat, "run", tools.run)
+    return tools
+
+def scene(directory, name, width, body):
+    path = os.path.join(str(directory), name + ".mp4")
+    write(path, str(width) + "\n" + body + "\n")
+    return path
+
+def test_unchanged_video_is_not_written_again(tmp_path, tools, capsys):
+    paths = [scene(tmp_path, "a", 1920, "one"), scene(tmp_path, "b", 1920, "two")]
+    output = str(tmp_path / "Video.mp4")
+    concat.concatenate_copy(paths, output)
+    assert read(output) == "1920\none\n1920\ntwo\n"
+    tools.calls.clear()
+    concat.concatenate_copy(paths, output)
+    assert tools.calls == []
+    assert "Video.mp4 is up to date" in capsys.readouterr().out
+
+def test_only_changed_scenes_are_probed(tmp_path, tools):
+    paths = [scene(tmp_path, name, 1920, name) for name in "abc"]
+    output = str(tmp_path / "Video.mp4")
+    concat.concatenate_copy(paths, output)
+    tools.calls.clear()
+    scene(tmp_path, "b", 1920, "b changed")
+    concat.concatenate_copy(paths, output)
+    assert tools.calls == [("ffprobe", paths[1]), ("join", tools.calls[-1][1])]
+    assert read(output) == "1920\na\n1920\nb changed\n1920\nc\n"
+
+def test_mismatching_scene_is_transcoded_once(tmp_path, tools):
+    paths = [scene(tmp_path, "a", 1920, "a"), scene(tmp_path, "b", 1920, "b"), scene(tmp_path, "c", 854, "c")]
+    output = str(tmp_path / "Video.mp4")
+    concat.concatenate_copy(paths, output)
+    assert read(output) == "1920\na\n1920\nb\n1920\nc\n"
+    assert tools.count("transcode") == 1
+    scene(tmp_path, "a", 1920, "a changed")
+    concat.concatenate_copy(paths, output)
+    assert tools.count("transcode") == 1
+    assert read(output) == "1920\na changed\n1920\nb\n1920\nc\n"
+
+def test_edited_video_is_written_again(tmp_path, tools):
+    paths = [scene(tmp_path, "a", 1920, "a"), scene(tmp_path, "b", 1920, "b")]
+    output = str(tmp_path / "Video.mp4")
+    concat.concatenate_copy(paths, output)
+    write(output, "edited by hand")
+    concat.concatenate_copy(paths, output)
+    assert read(output) == "1920\na\n1920\nb\n"
+    assert tools.count("join") == 2
+
+def test_videos_share_transcoded_scenes(tmp_path, tools):
+    paths = [scene(tmp_path, "a", 1920, "a"), scene(tmp_path, "b", 854, "b")]
+    video = str(tmp_path / "Video.mp4")
+    preview = str(tmp_path / "Preview.mp4")
+    concat.concatenate_copy(paths, video)
+    concat.concatenate_copy(paths, preview)
+    assert tools.count("transcode") == 1
+    segments = os.listdir(str(tmp_path / "media" / "montage" / "segments"))
+    assert len(segments) == 1
+
+    # The preview no longer uses the transcoded scene, but the video still does
+    concat.concatenate_copy(paths[:1], preview)
+    assert os.listdir(str(tmp_path / "media" / "montage" / "segments")) == segments
+    scene(tmp_path, "a", 1920, "a changed")
+    concat.concatenate_copy(paths, video)
+    assert tools.count("transcode") == 1
+    assert read(video) == "1920\na changed\n1920\nb\n"
+
+    concat.concatenate_copy(paths[:1], video)
+    assert os.listdir(str(tmp_path / "media" / "montage" / "segments")) == []
+
+def test_scene_without_pixel_format_is_transcoded(tmp_path, tools):
+    paths = [scene(tmp_path, "a", 1920, "a"), scene(tmp_path, "b", 1920, "b"), scene(tmp_path, "c", 1920, "c")]
+    tools.unknown.update(paths[:2])
+    output = str(tmp_path / "Video.mp4")
+    concat.concatenate_copy(paths, output)
+    assert [call[1] for call in tools.calls if call[0] == "transcode"] == paths[:2]
+    assert read(output) == "1920\na\n1920\nb\n1920\nc\n"
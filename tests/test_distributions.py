@@ -0,0 +1,42 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+stats = pytest.importorskip("scipy.stats")
+
+from stataud.distributions import CountDistribution
+from stataud.planning import population_misstatements
+
+# Population size of the hypergeometric distribution
+N = 500
+
+def reference(distribution, n, theta, size):
+    j = np.arange(size)
+    if distribution == "binomial":
+        return stats.binom.pmf(j, n, theta)
+    if distribution == "poisson":
+        return stats.poisson.pmf(j, n * theta)
+    return stats.hypergeom.pmf(j, N, population_misstatements(theta, N), n)
+
+@pytest.mark.parametrize("distribution", ["binomial", "poisson", "hypergeometric"])
+def test_moves_match_scipy(distribution):
+    counts = CountDistribution(distribution, 50, 0.05, size = 6, N = N)
+    # Single steps up and down, a jump that is computed directly and changes of theta
+    for n, theta in [(51, 0.05), (60, 0.05), (59, 0.05), (300, 0.05), (300, 0.08), (280, 0.02), (280, 0.021)]:
+        np.testing.assert_allclose(counts.pmf(n, theta), reference(distribution, n, theta, 6), rtol = 1e-9, atol = 1e-300)
+
+def test_cdf():
+    counts = CountDistribution("binomial", 93, 0.05, size = 3)
+    np.testing.assert_allclose(counts.cdf(), stats.binom.cdf(np.arange(3), 93, 0.05), rtol = 1e-12)
+    assert counts.cdf()[1] < 0.05 < counts.cdf(92)[1]
+
+def test_zero_probabilities_become_positive():
+    # P(X = 3) is zero for a sample of 2 items and must not stay zero once n grows
+    counts = CountDistribution("binomial", 2, 0.1, size = 4)
+    assert counts.pmf()[3] == 0
+    np.testing.assert_allclose(counts.pmf(4), stats.binom.pmf(np.arange(4), 4, 0.1), rtol = 1e-12)
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        CountDistribution("normal", 10, 0.1)
+    with pytest.raises(ValueError):
+        CountDistribution("hypergeometric", 10, 0.1)
@@ -0,0 +1,51 @@
+import shutil
+
+import pytest
+
+pytest.importorskip("manim")
+
+from stataud.formula import GlyphOrder, SlotFormula, count_glyphs, tokenize
+
+needs_latex = pytest.mark.skipif(shutil.which("latex") is None, reason = "LaTeX is not installed")
+
+def glyph_order(template, values):
+    # Slot occurrence of every glyph LaTeX typesets for the template, None for the fixed ones
+    order = GlyphOrder(tokenize(template, list(values)), values)
+    return order.sequence(), order.occurrences
+
+def test_slots_in_reading_order():
+    glyphs, occurrences = glyph_order("P(X = <k>) = <n>", {"k": "2", "n": "100"})
+    assert glyphs == [None, None, None, None, 0, None, None, 1, 1, 1]
+    assert occurrences == ["k", "n"]
+
+def test_binomial_closes_after_its_lower_argument():
+    glyphs, occurrences = glyph_order("P(X = <k>) = \\binom{<n>}{<k>}", {"k": "2", "n": "100"})
+    assert glyphs == [None, None, None, None, 0, None, None, None, 1, 1, 1, 2, None]
+    assert occurrences == ["k", "n", "k"]
+
+def test_upper_limit_comes_before_the_operator():
+    glyphs, _ = glyph_order("\\sum_{i = 0}^{<k>} x", {"k": "12"})
+    assert glyphs == [0, 0, None, None, None, None, None]
+
+def test_count_glyphs():
+    assert count_glyphs("\\frac{12}{3}") == 4
+    assert count_glyphs("\\theta^{2}") == 2
+    assert count_glyphs("\\text{ab} \\, \\cdots") == 5
+    with pytest.raises(ValueError):
+        count_glyphs("\\sqrt{2}")
+
+def test_layout_depends_on_the_number_of_digits():
+    formula = SlotFormula("<p>(X = <k>) = <n>", values = {"p": "P"})
+    layout = formula.layout_key(formula.strings({"k": 2, "n": 100}))
+    assert formula.layout_key(formula.strings({"k": 7, "n": 250})) == layout
+    assert formula.layout_key(formula.strings({"k": 7, "n": 99})) != layout
+    assert formula.layout_key(formula.strings({"k": 7, "n": "N"})) != layout
+
+@needs_latex
+def test_build_reuses_the_compiled_layout():
+    formula = SlotFormula("P(X = <k>) = \\binom{<n>}{<k>}")
+    first = formula.build(k = 1, n = 59)
+    second = formula.build(k = 2, n = 93)
+    assert len(formula.layouts) == 1
+    assert second.slot_indices == {"k": [4, 11], "n": [8, 9]}
+    assert len(second[0]) == len(first[0])
@@ -0,0 +1,27 @@
+import shutil
+
+import pytest
+
+pytest.importorskip("manim")
+
+from stataud.glyphs import TexCounter, get_atlas
+
+pytestmark = pytest.mark.skipif(shutil.which("latex") is None, reason = "LaTeX is not installed")
+
+def test_atlas_widths():
+    atlas = get_atlas()
+    assert atlas.width("10") == pytest.approx(atlas.advance["1"] + atlas.advance["0"])
+    assert atlas.width("10", 2) == pytest.approx(2 * atlas.width("10"))
+    with pytest.raises(ValueError):
+        atlas.check("1a")
+
+def test_counter_writes_into_the_same_glyphs():
+    counter = TexCounter("$n$ = {n}, $k$ = {k}", {"n": 5, "k": 0})
+    glyphs = list(counter.slot("n"))
+    width = counter.width
+    counter.set_values(n = 12345)
+    assert list(counter.slot("n")) == glyphs
+    assert counter.width > width
+    assert counter.values == {"n": 12345, "k": 0}
+    with pytest.raises(ValueError):
+        counter.set_values(n = 123456789)
@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from stataud.cache import SceneCache
+from stataud.montage import Renderer, RenderError, find_scenes, select_scenes
+
+@pytest.fixture
+def directory(tmp_path):
+    for filename in ["10_Summary.py", "02_Other.py", "01_Binomial.py", "_montage.py", "notes.txt"]:
+        (tmp_path / filename).write_text("")
+    return str(tmp_path)
+
+def test_scenes_are_ordered_by_number(directory):
+    assert [scene.filename for scene in find_scenes(directory)] == ["01_Binomial.py", "02_Other.py", "10_Summary.py"]
+
+def test_select_by_number_name_and_file_name(directory):
+    scenes = find_scenes(directory)
+    selected = select_scenes(scenes, ["10", "Other", "01_Binomial.py"])
+    assert [scene.name for scene in selected] == ["Binomial", "Other", "Summary"]
+    assert select_scenes(scenes, None) == scenes
+
+def test_unknown_scene(directory):
+    with pytest.raises(RenderError, match = "Unknown scene\\(s\\): Missing"):
+        select_scenes(find_scenes(directory), ["Other", "Missing"])
+
+def test_output_and_log_paths(directory):
+    scene = find_scenes(directory)[0]
+    assert scene.output("l").endswith("media/videos/01_Binomial/480p15/Binomial.mp4")
+    assert scene.log().endswith("media/logs/01_Binomial.log")
+
+def test_cached_video(directory, tmp_path):
+    scene = find_scenes(directory)[0]
+    assert Renderer("h", 1).cached(scene) is None
+    cache = SceneCache(str(tmp_path / "cache"))
+    renderer = Renderer("h", 1, cache)
+    assert renderer.cached(scene) is None
+    video = tmp_path / "Binomial.mp4"
+    video.write_bytes(b"video")
+    stored = cache.put(cache.key(os.path.join(scene.directory, scene.filename), "h"), str(video))
+    assert renderer.cached(scene) == stored
+    assert Renderer("l", 1, cache).cached(scene) is None
+
+def test_checkpoints_do_not_depend_on_the_cache(directory, tmp_path):
+    scene = find_scenes(directory)[0]
+    checkpoints = Renderer("h", 1).checkpoint_dir(scene)
+    assert Renderer("h", 1, SceneCache(str(tmp_path / "cache"))).checkpoint_dir(scene) == checkpoints
+    assert Renderer("l", 1).checkpoint_dir(scene) != checkpoints
+    # A run that renders into another media folder, such as a variant, has checkpoints of its own
+    scene.media_dir = lambda: str(tmp_path / "variant" / "media")
+    assert Renderer("h", 1).checkpoint_dir(scene) != checkpoints
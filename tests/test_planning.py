@@ -0,0 +1,51 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+stats = pytest.importorskip("scipy.stats")
+
+from stataud.planning import bayesian_sample_size, population_misstatements, sample_size
+
+def brute_force(alpha, cdf):
+    n = 1
+    while cdf(n) >= alpha:
+        n += 1
+    return n
+
+def test_critical_sample_sizes():
+    # The sample sizes of the video: 5% tolerable misstatement rate and 5% sampling risk
+    assert sample_size(0.05) == 59
+    assert sample_size(0.05, k = 1) == 93
+    assert list(sample_size(0.03, k = [0, 1, 2])) == [99, 157, 208]
+
+@pytest.mark.parametrize("theta, k, alpha", [(0.02, 0, 0.05), (0.05, 3, 0.1), (0.1, 1, 0.01)])
+def test_binomial_matches_brute_force(theta, k, alpha):
+    assert sample_size(theta, k, alpha) == brute_force(alpha, lambda n: stats.binom.cdf(k, n, theta))
+
+def test_poisson_and_hypergeometric():
+    assert sample_size(0.05, distribution = "poisson") == 60
+    assert sample_size(0.05, distribution = "hypergeometric", N = 400) == brute_force(0.05, lambda n: stats.hypergeom.cdf(0, 400, 20, n))
+    with pytest.raises(ValueError):
+        sample_size(0.05, distribution = "hypergeometric")
+    with pytest.raises(ValueError):
+        sample_size(0.05, distribution = "normal")
+
+def test_population_misstatements_round_up():
+    assert population_misstatements(0.05, 500) == 25
+    assert population_misstatements(0.051, 500) == 26
+
+def test_bayesian_sample_size():
+    special = pytest.importorskip("scipy.special")
+    def sufficient(n, k, a, b):
+        return special.betaincinv(a + k, b + n - k, 0.95) < 0.05
+
+    for k, a, b in [(0, 1, 1), (1, 1, 1), (0, 1, 20), (2, 3, 40)]:
+        n = k
+        while not sufficient(n, k, a, b):
+            n += 1
+        assert bayesian_sample_size(0.05, k, 0.95, a, b) == n
+
+def test_bayesian_sample_sizes_of_several_priors():
+    sizes = bayesian_sample_size(0.05, prior_a = [1, 1, 2], prior_b = [1, 20, 20])
+    assert list(sizes) == [bayesian_sample_size(0.05, prior_a = a, prior_b = b) for a, b in [(1, 1), (1, 20), (2, 20)]]
+    # An informed prior needs fewer samples
+    assert sizes[1] < sizes[0]
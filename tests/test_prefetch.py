@@ -0,0 +1,45 @@
+import ast
+import os
+
+import pytest
+
+pytest.importorskip("scipy.stats")
+
+from stataud import ROOT
+from stataud.params import dump, load
+from stataud.scripts import script
+from stataud.tts.prefetch import call_name, voiceovers
+
+# Scene files whose voiceovers say their parameters
+SCENES = [
+    ("FrequentistPlanningAuditSampling/01_Binomial.py", "Binomial"),
+    ("FrequentistPlanningAuditSampling/02_Other.py", "Other"),
+    ("BayesianInferenceAuditSampling/03_EffectOfPrior.py", "EffectOfPrior"),
+]
+
+@pytest.fixture(autouse = True)
+def defaults(monkeypatch):
+    monkeypatch.delenv("STATAUD_PARAMS", raising = False)
+
+def voiceover_calls(path):
+    with open(path, "rb") as file:
+        tree = ast.parse(file.read())
+    return [node for node in ast.walk(tree) if isinstance(node, ast.Call) and call_name(node) == "voiceover"]
+
+@pytest.mark.parametrize("filename, scene", SCENES)
+def test_every_voiceover_is_prefetched(filename, scene):
+    path = os.path.join(ROOT, filename)
+    service, texts, dynamic = voiceovers(path)
+    assert dynamic == []
+    assert len(texts) == len(voiceover_calls(path))
+    assert set(script(scene, load(scene)).values()) <= set(texts)
+
+def test_variant_voiceovers_use_its_parameters(tmp_path):
+    path = os.path.join(ROOT, SCENES[0][0])
+    params_file = str(tmp_path / "params.toml")
+    dump({"Binomial": {"theta": 0.02}}, params_file)
+    service, texts, dynamic = voiceovers(path, [params_file])
+    assert script("Binomial", load("Binomial", params_file))["example"] in texts
+    assert script("Binomial", load("Binomial"))["example"] not in texts
+    service, both, dynamic = voiceovers(path, [None, params_file])
+    assert set(texts) < set(both)
@@ -0,0 +1,23 @@
+import os
+
+from stataud import ROOT
+from stataud.texcache import literal_mobjects
+
+def mobjects(filename, cls):
+    return [mobject for mobject in literal_mobjects(os.path.join(ROOT, filename)) if mobject[0] == cls]
+
+def test_slot_formula_templates_and_atlases_are_warmed_up():
+    filename = "FrequentistPlanningAuditSampling/01_Binomial.py"
+    templates = [strings[0] for cls, strings, kwargs in mobjects(filename, "SlotFormula")]
+    assert len(templates) == 3
+    assert all(template.startswith("<p>(X ") for template in templates)
+    wrappers = {dict(kwargs)["wrapper"][1] for cls, strings, kwargs in mobjects(filename, "GlyphAtlas")}
+    assert wrappers == {"%s", "{}^{%s}"}
+
+def test_counters_with_literal_values_are_warmed_up():
+    filename = "BayesianInferenceAuditSampling/02_UniformPrior.py"
+    counters = [strings for cls, strings, kwargs in mobjects(filename, "TexCounter")]
+    assert ("beta($\\alpha$ = {a}, $\\beta$ = {b})", {"a": 1, "b": 1}) in counters
+    # The upper bound is computed, so only the digits of its counter can be compiled ahead
+    assert not any(template.startswith("$\\theta_{95}$") for template, values in counters)
+    assert {dict(kwargs)["font_size"][1] for cls, strings, kwargs in mobjects(filename, "GlyphAtlas")} == {35, 40}